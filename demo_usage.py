@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 
 # Import the package modules
 from src.idd_mad.models.sir import run_sir_model, run_seir_model
+from src.idd_mad.models.backends import available_backends, check_backend_conformance
 from src.idd_mad.visualization.plotting import create_epidemiology_figure
 from src.idd_mad.utils.calculations import ModelCalculator
 from src.idd_mad.apps import run_app, list_apps
@@ -102,6 +103,15 @@ def demo_calculator():
     print(f"Peak infection in SEIR: {seir_data['model_df']['I'].max():.3f}")
 
 
+def demo_backends():
+    """Check that every available compute backend gives the same results."""
+    print("\n=== Compute Backends Demo ===")
+    
+    print(f"Available backends: {available_backends()}")
+    for name, difference in check_backend_conformance().items():
+        print(f"Backend '{name}' matches the reference (max difference {difference:.1e})")
+
+
 def demo_apps():
     """Demonstrate the available Shiny apps."""
     print("\n=== Available Shiny Apps ===")
@@ -128,6 +138,7 @@ def main():
         sir_result, seir_result = demo_model_usage()
         demo_visualization()
         demo_calculator()
+        demo_backends()
         demo_apps()
         
         print("\n=== Demo completed successfully! ===")
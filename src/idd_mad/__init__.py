@@ -10,9 +10,10 @@ from . import visualization
 from . import ui
 from . import utils
 from . import apps
+from . import inference
 
 # Configure matplotlib defaults
 from .visualization.colors import configure_matplotlib_defaults
 configure_matplotlib_defaults()
 
-__all__ = ['models', 'visualization', 'ui', 'utils', 'apps']
\ No newline at end of file
+__all__ = ['models', 'visualization', 'ui', 'utils', 'apps', 'inference']
\ No newline at end of file
@@ -16,6 +16,7 @@ def create_server(input, output, session):
         'beta': 1, 
         'gamma': 1,
         'sigma': 1,
+        'omega': 0,
         'aa': 70
     })
     
@@ -34,7 +35,7 @@ def create_server(input, output, session):
             return model_parameter_set("SIR", param_values.get(), "comp")
     
     # Create sync functions for all possible parameters
-    all_params = ['i_0', 'beta', 'gamma', 'sigma', 'aa']
+    all_params = ['i_0', 'beta', 'gamma', 'sigma', 'omega', 'aa']
     create_parameter_sync_functions(input, all_params, "comp")
     
     # Plot rendering
@@ -50,6 +51,7 @@ def create_server(input, output, session):
         beta = input.comp_beta() if input.comp_beta() is not None else 1
         gamma = input.comp_gamma() if input.comp_gamma() is not None else 1
         sigma = input.comp_sigma() if input.comp_sigma() is not None else 1
+        omega = input.comp_omega() if input.comp_omega() is not None else 0
         aa = input.comp_aa() if input.comp_aa() is not None else 70
         
         # Calculate model data
@@ -59,12 +61,13 @@ def create_server(input, output, session):
             beta=beta,
             gamma=gamma,
             sigma=sigma,
-            average_age=aa
+            average_age=aa,
+            omega=omega
         )
         
         # Create and return the figure
         return create_epidemiology_figure(
-            df=data['model_df'],
+            df=data['result'],
             model_type=data['model_type'],
             title=data['title1']
         )
@@ -14,10 +14,11 @@ def create_app_ui():
         'beta': 1,
         'gamma': 1,
         'sigma': 1,
+        'omega': 0,
         'aa': 70
     }
     
-    model_options = ["SIR", "SEIR", "SEIRS"]
+    model_options = ["SIR", "SIRS", "SEIR", "SEIRS"]
     
     return ui.page_fixed(
         ui.tags.head(ui.tags.style(get_component_css())),
@@ -16,6 +16,7 @@ def create_server(input, output, session):
         'beta': 1, 
         'gamma': 1,
         'sigma': 1,
+        'omega': 0,
         'aa': 70
     })
     
@@ -133,6 +134,22 @@ def create_server(input, output, session):
         except:
             pass
             
+    @reactive.effect
+    def sync_p2_omega():
+        try:
+            if hasattr(input, 'p2_omega') and input.p2_omega() is not None:
+                ui.update_numeric("p2_omega_num", value=input.p2_omega())
+        except:
+            pass
+
+    @reactive.effect  
+    def sync_p2_omega_num():
+        try:
+            if hasattr(input, 'p2_omega_num') and input.p2_omega_num() is not None:
+                ui.update_slider("p2_omega", value=input.p2_omega_num())
+        except:
+            pass
+            
     @reactive.effect
     def sync_p2_aa():
         try:
@@ -168,6 +185,10 @@ def create_server(input, output, session):
             if hasattr(input, 'p2_sigma') and input.p2_sigma() is not None and current['sigma'] != input.p2_sigma():
                 current['sigma'] = input.p2_sigma()
                 updated = True
+            if (hasattr(input, 'p2_omega') and input.p2_omega() is not None
+                    and current['omega'] != input.p2_omega()):
+                current['omega'] = input.p2_omega()
+                updated = True
             if hasattr(input, 'p2_aa') and input.p2_aa() is not None and current['aa'] != input.p2_aa():
                 current['aa'] = input.p2_aa()
                 updated = True
@@ -193,6 +214,8 @@ def create_server(input, output, session):
                 ui.update_slider("p2_gamma", value=current['gamma'])
                 if model_type.upper() in ['SEIR', 'SEIRS']:
                     ui.update_slider("p2_sigma", value=current['sigma'])
+                if model_type.upper() in ['SIRS', 'SEIRS']:
+                    ui.update_slider("p2_omega", value=current['omega'])
                 if model_type.upper() == 'SEIRS':
                     ui.update_slider("p2_aa", value=current['aa'])
             except:
@@ -228,7 +251,7 @@ def create_server(input, output, session):
         
         # Create and return the figure
         return create_epidemiology_figure(
-            df=data['model_df'],
+            df=data['result'],
             model_type=data['model_type'],
             title=data['title1']
         )
@@ -267,6 +290,9 @@ def create_server(input, output, session):
             beta = input.p2_beta() if hasattr(input, 'p2_beta') and input.p2_beta() is not None else current_params['beta']
             gamma = input.p2_gamma() if hasattr(input, 'p2_gamma') and input.p2_gamma() is not None else current_params['gamma']
             sigma = input.p2_sigma() if hasattr(input, 'p2_sigma') and input.p2_sigma() is not None else current_params['sigma']
+            omega = current_params['omega']
+            if hasattr(input, 'p2_omega') and input.p2_omega() is not None:
+                omega = input.p2_omega()
             aa = input.p2_aa() if hasattr(input, 'p2_aa') and input.p2_aa() is not None else current_params['aa']
         except:
             # Fall back to stored parameter values
@@ -274,6 +300,7 @@ def create_server(input, output, session):
             beta = current_params['beta']
             gamma = current_params['gamma']
             sigma = current_params['sigma']
+            omega = current_params['omega']
             aa = current_params['aa']
         
         # Update global parameters with current Page 2 values
@@ -282,6 +309,7 @@ def create_server(input, output, session):
             'beta': beta,
             'gamma': gamma,
             'sigma': sigma,
+            'omega': omega,
             'aa': aa
         })
         param_values.set(current_params)
@@ -293,12 +321,13 @@ def create_server(input, output, session):
             beta=beta,
             gamma=gamma,
             sigma=sigma,
-            average_age=aa
+            average_age=aa,
+            omega=omega
         )
         
         # Create and return the figure
         return create_epidemiology_figure(
-            df=data['model_df'],
+            df=data['result'],
             model_type=data['model_type'],
             title=data['title1']
         )
@@ -32,7 +32,7 @@ def create_page2_ui():
             ui.input_selectize(
                 "dropdown2_1", 
                 "Select Model Structure",
-                choices=["SIR", "SEIR", "SEIRS"],
+                choices=["SIR", "SIRS", "SEIR", "SEIRS"],
                 selected="SIR"
             ),
             ui.br(),
@@ -40,7 +40,7 @@ def create_server(input, output, session):
         
         # Create and return the figure
         return create_epidemiology_figure(
-            df=data['model_df'],
+            df=data['result'],
             model_type=data['model_type'],
             title=data['title1']
         )
@@ -0,0 +1,46 @@
+"""Statistical inference for the epidemiological models."""
+
+from .likelihood import (
+    OBSERVATION_MODELS,
+    RHO_GRID,
+    log_factorial,
+    log_gamma,
+    binomial_loglik,
+    poisson_loglik,
+    negative_binomial_loglik,
+    observation_loglik,
+    pointwise_loglik,
+    observation_windows,
+)
+from .objective import IncidenceLikelihood
+from .fit import FitResult, fit
+from .mcmc import MCMCResult, sample
+from .abc import ABCResult, abc_smc
+from .particle import ParticleFilterResult, particle_filter, systematic_resample
+from .diagnostics import autocorrelation_time, effective_sample_size, gelman_rubin
+
+__all__ = [
+    "OBSERVATION_MODELS",
+    "RHO_GRID",
+    "log_factorial",
+    "log_gamma",
+    "binomial_loglik",
+    "poisson_loglik",
+    "negative_binomial_loglik",
+    "observation_loglik",
+    "pointwise_loglik",
+    "observation_windows",
+    "IncidenceLikelihood",
+    "FitResult",
+    "fit",
+    "MCMCResult",
+    "ABCResult",
+    "abc_smc",
+    "ParticleFilterResult",
+    "particle_filter",
+    "systematic_resample",
+    "sample",
+    "autocorrelation_time",
+    "effective_sample_size",
+    "gelman_rubin",
+]
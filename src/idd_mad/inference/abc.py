@@ -0,0 +1,369 @@
+"""Approximate Bayesian computation on the chain-binomial models."""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from ..models.rng import RandomStreams, SeedLike
+from ..models.spec import ModelSpec, get_model_spec
+from ..models.stochastic import ChainBinomialModel
+from .likelihood import observation_windows
+
+
+@dataclass(frozen=True)
+class ABCResult:
+    """
+    Particle populations of an ABC-SMC run.
+
+    Args:
+        names: Names of the estimated parameters
+        populations: One DataFrame per generation with a column per
+            parameter plus 'weight' and 'distance'
+        history: One row per generation with its tolerance, acceptance
+            rate, simulations, fraction of simulation steps actually run and
+            effective sample size
+    """
+
+    names: Tuple[str, ...]
+    populations: List[pd.DataFrame]
+    history: pd.DataFrame
+
+    @property
+    def posterior(self) -> pd.DataFrame:
+        """Weighted particles of the last generation."""
+        return self.populations[-1]
+
+    @property
+    def n_simulations(self) -> int:
+        """Total number of simulated particles."""
+        return int(self.history["simulations"].sum())
+
+    def mean(self) -> pd.Series:
+        """Weighted posterior mean of each parameter."""
+        posterior = self.posterior
+        return posterior[list(self.names)].mul(posterior["weight"], axis=0).sum()
+
+
+def _simulate_distances(
+    spec: ModelSpec,
+    parameters: Dict[str, np.ndarray],
+    population: float,
+    dt: float,
+    statistic: str,
+    observed: np.ndarray,
+    window_steps: Tuple[np.ndarray, np.ndarray],
+    tolerance: float,
+    seed: np.random.SeedSequence,
+) -> Tuple[np.ndarray, int]:
+    """
+    Distances of one block of particles, stopping each particle early once
+    its partial distance exceeds the tolerance.
+
+    Returns:
+        Distances (``inf`` for rejected particles) and the number of
+        particle-steps simulated
+    """
+    parameters = dict(parameters)
+    initial_infected = parameters.pop("initial_infected")
+    # Reporting only thins 'newC', for which abc_smc requires rho
+    rho = parameters.pop("rho", 1.0)
+    model = ChainBinomialModel(
+        spec, parameters, population, rho=rho, dt=dt, stochastic=True
+    )
+    flow = None if statistic == "newC" else model.model.flow_names.index(statistic)
+    rng = np.random.Generator(np.random.PCG64(seed))
+
+    n_particles = len(initial_infected)
+    state = model.initial_state(initial_infected, n_particles)
+    alive = np.arange(n_particles)
+    squared = np.zeros(n_particles)
+    counts = np.zeros(n_particles, dtype=np.int64)
+    threshold = tolerance**2
+    particle_steps = 0
+
+    starts, ends = window_steps
+    observation = 0
+    for step in range(1, ends[-1] + 1):
+        state, flows, reported = model.step(state, rng, (step - 1) * dt, alive)
+        particle_steps += len(alive)
+        if step > starts[observation]:
+            counts += reported if flow is None else flows[flow]
+        if step != ends[observation]:
+            continue
+
+        squared[alive] += (counts - observed[observation]) ** 2
+        counts[:] = 0
+        observation += 1
+        keep = squared[alive] <= threshold
+        if not keep.all():
+            alive, state, counts = alive[keep], state[:, keep], counts[keep]
+            if len(alive) == 0:
+                break
+
+    distances = np.full(n_particles, np.inf)
+    distances[alive] = np.sqrt(squared[alive])
+    return distances, particle_steps
+
+
+def _simulate_batch(
+    simulation: tuple,
+    points: np.ndarray,
+    tolerance: float,
+    seed: np.random.SeedSequence,
+    block_size: int,
+    executor: Optional[Executor],
+    n_workers: int,
+) -> Tuple[np.ndarray, int]:
+    """Distances of a batch of proposals, simulated in blocks with their own streams."""
+    spec, fixed, names, population, dt, statistic, observed, window_steps = simulation
+    streams = RandomStreams(seed, block_size)
+    jobs = []
+    for block in range(streams.n_blocks(len(points))):
+        rows = streams.block_slice(block, len(points))
+        values = {**fixed, **dict(zip(names, points[rows].T))}
+        values = {
+            name: np.broadcast_to(
+                np.asarray(value, dtype=float), (rows.stop - rows.start,)
+            )
+            for name, value in values.items()
+        }
+        jobs.append(
+            (
+                spec,
+                values,
+                population,
+                dt,
+                statistic,
+                observed,
+                window_steps,
+                tolerance,
+                streams.seed_for(block),
+            )
+        )
+    if not jobs:
+        return np.empty(0), 0
+
+    if executor is not None and len(jobs) > 1:
+        chunksize = -(-len(jobs) // n_workers)
+        parts = list(
+            executor.map(_simulate_distances, *zip(*jobs), chunksize=chunksize)
+        )
+    else:
+        parts = [_simulate_distances(*job) for job in jobs]
+    return np.concatenate([part[0] for part in parts]), sum(part[1] for part in parts)
+
+
+def _kernel_weights(
+    particles: np.ndarray,
+    previous: np.ndarray,
+    previous_weights: np.ndarray,
+    covariance: np.ndarray,
+    chunk_size: int = 1024,
+) -> np.ndarray:
+    """Importance weights under a uniform prior and a Gaussian perturbation kernel."""
+    cholesky = np.linalg.cholesky(covariance)
+    scaled_previous = np.linalg.solve(cholesky, previous.T).T
+    scaled = np.linalg.solve(cholesky, particles.T).T
+    weights = np.empty(len(particles))
+    for start in range(0, len(particles), chunk_size):
+        block = scaled[start : start + chunk_size]
+        distances = ((block[:, None, :] - scaled_previous[None, :, :]) ** 2).sum(axis=2)
+        weights[start : start + chunk_size] = 1.0 / (
+            np.exp(-0.5 * distances) @ previous_weights
+        )
+    return weights / weights.sum()
+
+
+def abc_smc(
+    model_type: Union[str, ModelSpec],
+    observed: Sequence[float],
+    observation_times: Sequence[float],
+    bounds: Mapping[str, Tuple[float, float]],
+    population: float,
+    fixed: Optional[Mapping[str, float]] = None,
+    statistic: str = "newC",
+    n_particles: int = 1000,
+    max_generations: int = 10,
+    quantile: float = 0.5,
+    final_tolerance: float = 0.0,
+    min_acceptance: float = 0.01,
+    batch_size: Optional[int] = None,
+    dt: float = 1.0,
+    seed: SeedLike = None,
+    n_workers: int = 1,
+    block_size: int = 256,
+    observation_period: Optional[float] = None,
+) -> ABCResult:
+    """
+    Estimate parameters of a chain-binomial model by ABC-SMC.
+
+    The distance between a simulation and the data is the Euclidean distance
+    between simulated and observed counts of ``statistic``, each summed over
+    the ``observation_period`` that ends at its observation time (see
+    ``observation_windows``). Generation 0 samples the uniform priors
+    given by ``bounds``. Each later generation sets its tolerance to the
+    ``quantile`` of the previous generation's distances, perturbs resampled
+    particles with a Gaussian kernel (twice the weighted covariance), and
+    keeps proposals within the tolerance until it has ``n_particles``.
+
+    Proposals are simulated in batches through ``ChainBinomialModel.step``,
+    split into blocks with their own random streams and spread over a
+    process pool when ``n_workers > 1``; results do not depend on the
+    number of workers. A particle stops being simulated as soon as its
+    partial distance exceeds the tolerance.
+
+    The run ends after ``max_generations``, once the tolerance reaches
+    ``final_tolerance``, or when the acceptance rate drops below
+    ``min_acceptance``; a generation abandoned for low acceptance is not
+    returned.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIR') or a ModelSpec
+        observed: Observed counts at each observation time
+        observation_times: Times of the observations (multiples of dt)
+        bounds: (lower, upper) prior bounds of each estimated parameter;
+            'initial_infected' and 'rho' may be estimated too
+        population: Population size N
+        fixed: Values of the parameters that are not estimated
+        statistic: 'newC' for reported cases or the name of a flow
+        n_particles: Particles per generation
+        max_generations: Maximum number of generations
+        quantile: Quantile of the previous distances used as the next tolerance
+        final_tolerance: Tolerance at which to stop
+        min_acceptance: Acceptance rate below which to stop
+        batch_size: Proposals simulated per batch (n_particles if None)
+        dt: Time step
+        seed: Seed for the sampler and simulations
+        n_workers: Number of worker processes
+        block_size: Particles per simulation block and random stream
+        observation_period: Width of the window each observation covers
+            (the smallest spacing of ``observation_times`` if None)
+
+    Returns:
+        ABCResult with the particle population of every generation
+    """
+    spec = get_model_spec(model_type)
+    names = tuple(bounds)
+    known = spec.parameters + ("mu", "initial_infected", "rho")
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown parameters for model '{spec.name}': {unknown}")
+    fixed = dict(fixed or {})
+    required = spec.parameters + ("initial_infected",)
+    if statistic == "newC":
+        required += ("rho",)
+    missing = [name for name in required if name not in names and name not in fixed]
+    if missing:
+        raise ValueError(f"Parameters must be estimated or fixed: {missing}")
+    if statistic != "newC" and statistic not in spec.compiled.flow_names:
+        raise ValueError(
+            f"Unknown statistic '{statistic}'. "
+            f"Use 'newC' or a flow of model '{spec.name}'."
+        )
+
+    lower = np.array([bounds[name][0] for name in names], dtype=float)
+    upper = np.array([bounds[name][1] for name in names], dtype=float)
+    if not (lower < upper).all():
+        raise ValueError("Each lower bound must be below its upper bound.")
+    observed = np.asarray(observed, dtype=float)
+    window_steps = observation_windows(observation_times, dt, observation_period)
+    if len(window_steps[1]) != len(observed):
+        raise ValueError("observed and observation_times must have the same length.")
+
+    batch_size = batch_size or n_particles
+    streams = RandomStreams(seed, block_size)
+    rng = streams.generator(0)
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    simulation = (spec, fixed, names, population, dt, statistic, observed, window_steps)
+
+    populations: List[pd.DataFrame] = []
+    history = []
+    try:
+        particles = weights = distances = covariance = None
+        tolerance = np.inf
+        for generation in range(max_generations):
+            if generation > 0:
+                tolerance = float(np.quantile(distances, quantile))
+                covariance = np.atleast_2d(2.0 * np.cov(particles.T, aweights=weights))
+                covariance += 1e-12 * np.diag((upper - lower) ** 2)
+            generation_streams = RandomStreams(
+                streams.seed_for(generation + 1), block_size
+            )
+
+            accepted_points, accepted_distances = [], []
+            n_accepted = n_simulated = particle_steps = 0
+            batch = 0
+            while n_accepted < n_particles:
+                if generation == 0:
+                    proposals = rng.uniform(lower, upper, size=(batch_size, len(names)))
+                else:
+                    parents = particles[
+                        rng.choice(n_particles, size=batch_size, p=weights)
+                    ]
+                    proposals = parents + rng.multivariate_normal(
+                        np.zeros(len(names)), covariance, size=batch_size
+                    )
+                    proposals = proposals[
+                        ((proposals > lower) & (proposals < upper)).all(axis=1)
+                    ]
+
+                batch_distances, steps = _simulate_batch(
+                    simulation,
+                    proposals,
+                    tolerance,
+                    generation_streams.seed_for(batch),
+                    block_size,
+                    executor,
+                    n_workers,
+                )
+                batch += 1
+                n_simulated += len(proposals)
+                particle_steps += steps
+                keep = batch_distances <= tolerance
+                accepted_points.append(proposals[keep])
+                accepted_distances.append(batch_distances[keep])
+                n_accepted += int(keep.sum())
+                if (
+                    n_accepted < n_particles
+                    and n_simulated * min_acceptance > n_particles
+                ):
+                    break
+
+            row = {
+                "generation": generation,
+                "tolerance": tolerance,
+                "acceptance": n_accepted / max(n_simulated, 1),
+                "simulations": n_simulated,
+                "step_fraction": particle_steps
+                / max(n_simulated * window_steps[1][-1], 1),
+                "ess": np.nan,
+            }
+            if n_accepted < n_particles:
+                # Abandoned for low acceptance
+                history.append(row)
+                break
+
+            new_particles = np.concatenate(accepted_points)[:n_particles]
+            if generation == 0:
+                weights = np.full(n_particles, 1.0 / n_particles)
+            else:
+                weights = _kernel_weights(new_particles, particles, weights, covariance)
+            particles = new_particles
+            distances = np.concatenate(accepted_distances)[:n_particles]
+
+            frame = pd.DataFrame(particles, columns=list(names))
+            frame["weight"] = weights
+            frame["distance"] = distances
+            populations.append(frame)
+            row["ess"] = 1.0 / np.sum(weights**2)
+            history.append(row)
+            if tolerance <= final_tolerance:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return ABCResult(
+        names=names, populations=populations, history=pd.DataFrame(history)
+    )
@@ -0,0 +1,71 @@
+"""Convergence diagnostics for ensembles of Markov chains."""
+
+import numpy as np
+
+
+def gelman_rubin(chain: np.ndarray) -> np.ndarray:
+    """
+    Split R-hat of each parameter.
+
+    Every chain is split into halves so that drifts within a chain also
+    inflate the statistic. Values close to 1 indicate convergence.
+
+    Args:
+        chain: Samples of shape (samples, chains, parameters)
+
+    Returns:
+        Array with one R-hat per parameter
+    """
+    n_samples = chain.shape[0] // 2
+    if n_samples < 2:
+        return np.full(chain.shape[2], np.nan)
+    halves = np.concatenate([chain[:n_samples], chain[-n_samples:]], axis=1)
+    within = halves.var(axis=0, ddof=1).mean(axis=0)
+    between = halves.mean(axis=0).var(axis=0, ddof=1)
+    pooled = (n_samples - 1) / n_samples * within + between
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(pooled / within)
+
+
+def autocorrelation_time(chain: np.ndarray, window: float = 5.0) -> np.ndarray:
+    """
+    Integrated autocorrelation time of each parameter.
+
+    The autocorrelation function is averaged over chains (computed with an
+    FFT) and summed up to the first lag ``M`` with ``M >= window * tau``.
+
+    Args:
+        chain: Samples of shape (samples, chains, parameters)
+        window: Sokal window constant
+
+    Returns:
+        Array with one autocorrelation time per parameter
+    """
+    n_samples = chain.shape[0]
+    if n_samples < 2:
+        return np.full(chain.shape[2], np.nan)
+    centred = chain - chain.mean(axis=0)
+    n_fft = 1 << (2 * n_samples - 1).bit_length()
+    spectrum = np.fft.rfft(centred, n=n_fft, axis=0)
+    acf = np.fft.irfft(spectrum * spectrum.conjugate(), n=n_fft, axis=0)[:n_samples]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acf = (acf / acf[0]).mean(axis=1)
+
+    taus = 2.0 * np.cumsum(acf, axis=0) - 1.0
+    lags = np.arange(n_samples)[:, None]
+    cut = np.argmax(lags >= window * taus, axis=0)
+    cut = np.where((lags >= window * taus).any(axis=0), cut, n_samples - 1)
+    return taus[cut, np.arange(chain.shape[2])]
+
+
+def effective_sample_size(chain: np.ndarray) -> np.ndarray:
+    """
+    Effective number of independent samples of each parameter.
+
+    Args:
+        chain: Samples of shape (samples, chains, parameters)
+
+    Returns:
+        Array with one effective sample size per parameter
+    """
+    return chain.shape[0] * chain.shape[1] / autocorrelation_time(chain)
@@ -0,0 +1,313 @@
+"""Maximum-likelihood fitting of model parameters to reported cases."""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+from ..models.rng import SeedLike
+from ..models.spec import ModelSpec
+from ..models.workspace import Workspace
+from .objective import IncidenceLikelihood
+
+
+@dataclass(frozen=True)
+class FitResult:
+    """
+    Outcome of a multistart maximum-likelihood fit.
+
+    Args:
+        parameters: Best estimates of the fitted parameters
+        log_likelihood: Log-likelihood at the best estimates
+        converged: Whether the start that found the best estimates converged
+        starts: One row per start with its final estimates, log-likelihood,
+            iterations, likelihood evaluations and convergence flag, sorted
+            from best to worst
+        n_evaluations: Total number of simulated parameter sets
+    """
+
+    parameters: Dict[str, float]
+    log_likelihood: float
+    converged: bool
+    starts: pd.DataFrame
+    n_evaluations: int
+
+    @property
+    def n_converged(self) -> int:
+        """Number of starts that converged."""
+        return int(self.starts["converged"].sum())
+
+    def n_agreeing(self, tolerance: float = 0.01) -> int:
+        """Number of starts within ``tolerance`` of the best log-likelihood."""
+        return int(
+            (self.starts["log_likelihood"] >= self.log_likelihood - tolerance).sum()
+        )
+
+
+class _BoundedObjective:
+    """Negative log-likelihood on an unbounded (logit-transformed) search space."""
+
+    def __init__(
+        self,
+        likelihood: IncidenceLikelihood,
+        names: Sequence[str],
+        lower: np.ndarray,
+        upper: np.ndarray,
+    ):
+        self.likelihood = likelihood
+        self.names = tuple(names)
+        self.lower = lower
+        self.upper = upper
+        self.workspace = Workspace()
+
+    def to_parameters(self, z: np.ndarray) -> np.ndarray:
+        return self.lower + (self.upper - self.lower) / (1.0 + np.exp(-z))
+
+    def to_search(self, x: np.ndarray) -> np.ndarray:
+        fraction = (x - self.lower) / (self.upper - self.lower)
+        return np.log(fraction / (1.0 - fraction))
+
+    def __call__(self, z: np.ndarray) -> np.ndarray:
+        """Evaluate a (points, parameters) batch."""
+        if len(z) == 0:
+            return np.empty(0)
+        x = self.to_parameters(z)
+        loglik = self.likelihood(dict(zip(self.names, x.T)), self.workspace)
+        return -loglik
+
+
+def _nelder_mead(
+    objective: _BoundedObjective,
+    starts: np.ndarray,
+    max_iterations: int,
+    tolerance: float,
+    step: float = 0.5,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Minimize ``objective`` from many starts with Nelder-Mead in lockstep.
+
+    Every iteration advances all unconverged simplices together: the
+    reflected points form one batch, expansions and contractions a second,
+    and shrink steps a third, so each batch is one ensemble simulation.
+
+    Returns:
+        Final search points, objective values, iterations, evaluations and
+        convergence flags, one entry per start
+    """
+    n_starts, n_dims = starts.shape
+    simplex = np.repeat(starts[:, None, :], n_dims + 1, axis=1)
+    simplex[:, 1:] += step * np.eye(n_dims)
+    values = objective(simplex.reshape(-1, n_dims)).reshape(n_starts, n_dims + 1)
+
+    iterations = np.zeros(n_starts, dtype=int)
+    evaluations = np.full(n_starts, n_dims + 1)
+    converged = np.zeros(n_starts, dtype=bool)
+    # Simplices with no finite vertex have nothing to follow
+    feasible = np.isfinite(values).any(axis=1)
+
+    for _ in range(max_iterations):
+        order = np.argsort(values, axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        simplex = np.take_along_axis(simplex, order[:, :, None], axis=1)
+
+        spread = np.abs(simplex[:, 1:] - simplex[:, :1]).max(axis=(1, 2))
+        with np.errstate(invalid="ignore"):
+            flat = values[:, -1] - values[:, 0] <= tolerance
+        converged = flat & (spread <= tolerance)
+        active = np.flatnonzero(~converged & feasible)
+        if len(active) == 0:
+            break
+        iterations[active] += 1
+
+        points = simplex[active]
+        best, second, worst = values[active, 0], values[active, -2], values[active, -1]
+        centroid = points[:, :-1].mean(axis=1)
+        direction = centroid - points[:, -1]
+
+        reflected = centroid + direction
+        f_reflected = objective(reflected)
+        evaluations[active] += 1
+
+        expand = f_reflected < best
+        outside = (f_reflected >= second) & (f_reflected < worst)
+        inside = ~expand & ~outside & ~(f_reflected < second)
+
+        trial = np.where(expand[:, None], centroid + 2.0 * direction, centroid)
+        trial[outside] += 0.5 * direction[outside]
+        trial[inside] -= 0.5 * direction[inside]
+        second_batch = expand | outside | inside
+        f_trial = np.full(len(active), np.inf)
+        f_trial[second_batch] = objective(trial[second_batch])
+        evaluations[active[second_batch]] += 1
+
+        new_point = reflected.copy()
+        new_value = f_reflected.copy()
+        take_trial = (expand & (f_trial < f_reflected)) | (
+            outside & (f_trial <= f_reflected)
+        )
+        take_trial |= inside & (f_trial < worst)
+        new_point[take_trial] = trial[take_trial]
+        new_value[take_trial] = f_trial[take_trial]
+        shrink = (outside | inside) & ~take_trial
+
+        keep = ~shrink
+        simplex[active[keep], -1] = new_point[keep]
+        values[active[keep], -1] = new_value[keep]
+
+        if shrink.any():
+            starts_to_shrink = active[shrink]
+            shrunk = simplex[starts_to_shrink, :1] + 0.5 * (
+                simplex[starts_to_shrink, 1:] - simplex[starts_to_shrink, :1]
+            )
+            simplex[starts_to_shrink, 1:] = shrunk
+            values[starts_to_shrink, 1:] = objective(
+                shrunk.reshape(-1, n_dims)
+            ).reshape(-1, n_dims)
+            evaluations[starts_to_shrink] += n_dims
+
+    best_vertex = np.argmin(values, axis=1)
+    points = simplex[np.arange(n_starts), best_vertex]
+    return (
+        points,
+        values[np.arange(n_starts), best_vertex],
+        iterations,
+        evaluations,
+        converged,
+    )
+
+
+def _fit_starts(
+    objective: _BoundedObjective,
+    starts: np.ndarray,
+    max_iterations: int,
+    tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    return _nelder_mead(
+        objective, objective.to_search(starts), max_iterations, tolerance
+    )
+
+
+def fit(
+    model_type: Union[str, ModelSpec],
+    observed: Sequence[float],
+    observation_times: Sequence[float],
+    bounds: Mapping[str, Tuple[float, float]],
+    population: float,
+    fixed: Optional[Mapping[str, float]] = None,
+    observation_model: str = "binomial",
+    n_starts: int = 32,
+    screening: int = 16,
+    max_iterations: int = 500,
+    tolerance: float = 1e-6,
+    dt: float = 0.1,
+    seed: SeedLike = None,
+    n_workers: int = 1,
+    backend: Optional[str] = None,
+    observation_period: Optional[float] = None,
+) -> FitResult:
+    """
+    Fit model parameters to reported counts by maximum likelihood.
+
+    The parameters named in ``bounds`` are estimated; everything else comes
+    from ``fixed``. Besides the model parameters, 'initial_infected', 'rho'
+    and (for the negative-binomial model) 'size' can be estimated or fixed.
+    Starts are the best points of a uniform sample within the bounds, and
+    each is refined by Nelder-Mead on a logit-transformed scale, so
+    estimates stay strictly inside the bounds. All starts advance in
+    lockstep and every batch of candidate points is simulated as one
+    ensemble. With ``n_workers > 1`` the starts are split over a process pool.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIR') or a ModelSpec
+        observed: Reported counts at each observation time
+        observation_times: Times of the observations
+        bounds: (lower, upper) bounds of each estimated parameter
+        population: Population size used to turn fractions into counts
+        fixed: Values of the parameters that are not estimated
+        observation_model: 'binomial', 'poisson' or 'negative_binomial'
+        n_starts: Number of starts
+        screening: Uniform candidates drawn per start; the ``n_starts``
+            candidates with the highest likelihood are used as starts
+        max_iterations: Maximum Nelder-Mead iterations per start
+        tolerance: Convergence tolerance on the log-likelihood spread and
+            the simplex size
+        dt: Time step of the simulations
+        seed: Seed for the random starts
+        n_workers: Number of worker processes
+        backend: Compute backend name (the global default if None)
+        observation_period: Width of the window each observation covers
+            (the smallest spacing of ``observation_times`` if None)
+
+    Returns:
+        FitResult with the best estimates and a per-start summary
+    """
+    names = tuple(bounds)
+    lower = np.array([bounds[name][0] for name in names], dtype=float)
+    upper = np.array([bounds[name][1] for name in names], dtype=float)
+    if not (lower < upper).all():
+        raise ValueError("Each lower bound must be below its upper bound.")
+
+    likelihood = IncidenceLikelihood(
+        model_type,
+        observed,
+        observation_times,
+        population,
+        fixed,
+        observation_model=observation_model,
+        dt=dt,
+        backend=backend,
+        observation_period=observation_period,
+    )
+    likelihood.check_parameters(names)
+    objective = _BoundedObjective(likelihood, names, lower, upper)
+
+    # Screen a larger uniform sample in one batch and start from its best
+    # points; with a binomial observation model most of the box has zero
+    # likelihood, where Nelder-Mead has nothing to follow
+    rng = np.random.default_rng(seed)
+    margin = 1e-3 * (upper - lower)
+    candidates = rng.uniform(
+        lower + margin, upper - margin, size=(screening * n_starts, len(names))
+    )
+    screened = -objective(objective.to_search(candidates))
+    starts = candidates[np.argsort(-screened, kind="stable")[:n_starts]]
+
+    if n_workers > 1 and n_starts > 1:
+        groups = np.array_split(starts, min(n_workers, n_starts))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            parts = list(
+                executor.map(
+                    _fit_starts,
+                    [objective] * len(groups),
+                    groups,
+                    [max_iterations] * len(groups),
+                    [tolerance] * len(groups),
+                )
+            )
+        points, values, iterations, evaluations, converged = (
+            np.concatenate(arrays) for arrays in zip(*parts)
+        )
+    else:
+        points, values, iterations, evaluations, converged = _fit_starts(
+            objective, starts, max_iterations, tolerance
+        )
+
+    estimates = objective.to_parameters(points)
+    starts_frame = pd.DataFrame(estimates, columns=list(names))
+    starts_frame.insert(0, "start", np.arange(n_starts))
+    starts_frame["log_likelihood"] = -values
+    starts_frame["iterations"] = iterations
+    starts_frame["evaluations"] = evaluations
+    starts_frame["converged"] = converged
+    starts_frame = starts_frame.sort_values(
+        "log_likelihood", ascending=False, ignore_index=True
+    )
+
+    best = starts_frame.iloc[0]
+    return FitResult(
+        parameters={name: float(best[name]) for name in names},
+        log_likelihood=float(best["log_likelihood"]),
+        converged=bool(best["converged"]),
+        starts=starts_frame,
+        n_evaluations=len(candidates) + int(evaluations.sum()),
+    )
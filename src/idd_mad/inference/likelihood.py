@@ -0,0 +1,334 @@
+"""Observation likelihoods for reported case counts."""
+
+import math
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+try:
+    from scipy.special import gammaln as _scipy_gammaln
+except ImportError:
+    _scipy_gammaln = None
+
+OBSERVATION_MODELS = ("binomial", "poisson", "negative_binomial")
+
+# Reporting probabilities searched by the R likelihood templates
+RHO_GRID = np.round(np.arange(0.01, 1.0, 0.01), 2)
+
+_HALF_LOG_TWO_PI = 0.5 * math.log(2 * math.pi)
+
+
+class _LogFactorialTable:
+    """Cached ``log(n!)`` for integers, grown geometrically on demand."""
+
+    def __init__(self, size: int = 1024):
+        self._table = np.zeros(1)
+        self._grow(size)
+
+    def _grow(self, size: int) -> None:
+        n = np.arange(len(self._table), size)
+        tail = self._table[-1] + np.cumsum(np.log(np.maximum(n, 1)))
+        self._table = np.concatenate([self._table, tail])
+
+    def __call__(self, n: np.ndarray) -> np.ndarray:
+        n = np.asarray(n, dtype=np.int64)
+        largest = int(n.max(initial=0))
+        if largest >= len(self._table):
+            self._grow(max(2 * len(self._table), largest + 1))
+        return self._table[n]
+
+
+_LOG_FACTORIAL = _LogFactorialTable()
+
+
+def observation_windows(
+    observation_times: Sequence[float],
+    dt: float,
+    observation_period: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Time steps bounding the reporting window of each observation.
+
+    Observation ``k`` counts the incidence over the ``observation_period``
+    that ends at ``observation_times[k]``, so every observation covers a
+    window of the same width. By default the period is the smallest spacing
+    between observation times (the first time for a single observation), so
+    weekly counts at weeks 1, 2, ... cover [0, 1], [1, 2], ...
+
+    Args:
+        observation_times: Increasing times of the observations
+        dt: Time step of the simulations
+        observation_period: Width of every reporting window
+
+    Returns:
+        Tuple of (start steps, end steps); observation ``k`` counts the
+        steps that end after ``starts[k] * dt`` and by ``ends[k] * dt``
+    """
+    times = np.asarray(observation_times, dtype=float)
+    if times.ndim != 1 or len(times) == 0:
+        raise ValueError("observation_times must be a non-empty 1-D array.")
+    ends = np.round(times / dt).astype(int)
+    if np.any(np.diff(ends) <= 0):
+        raise ValueError("observation_times must be increasing multiples of dt.")
+    if observation_period is None:
+        period = int(np.diff(ends).min()) if len(ends) > 1 else int(ends[0])
+    else:
+        period = int(np.round(observation_period / dt))
+    if period < 1:
+        raise ValueError("observation_period must be at least dt.")
+
+    starts = ends - period
+    if starts[0] < 0:
+        raise ValueError("The first observation window starts before time 0.")
+    if np.any(starts[1:] < ends[:-1]):
+        raise ValueError(
+            "Observation windows overlap; observation_period must not exceed "
+            "the spacing of observation_times."
+        )
+    return starts, ends
+
+
+def log_factorial(n: np.ndarray) -> np.ndarray:
+    """
+    Return ``log(n!)`` for non-negative integers from a cached table.
+
+    Args:
+        n: Non-negative integer array
+
+    Returns:
+        Float array shaped like ``n``
+    """
+    return _LOG_FACTORIAL(n)
+
+
+def _stirling_log_gamma(x: np.ndarray) -> np.ndarray:
+    """``log(Gamma(x))`` for positive x by Stirling's series after shifting by 7."""
+    shift = np.zeros_like(x)
+    for i in range(7):
+        shift += np.log(x + i)
+    z = x + 7.0
+    inverse = 1.0 / z
+    inverse_squared = inverse * inverse
+    series = inverse * (
+        1 / 12
+        - inverse_squared
+        * (1 / 360 - inverse_squared * (1 / 1260 - inverse_squared / 1680))
+    )
+    return (z - 0.5) * np.log(z) - z + _HALF_LOG_TWO_PI + series - shift
+
+
+def log_gamma(x: np.ndarray) -> np.ndarray:
+    """
+    Return ``log(Gamma(x))`` for positive x.
+
+    Integer arguments are looked up in the cached log-factorial table. Other
+    values use ``scipy.special.gammaln`` when scipy is installed and a
+    Stirling series otherwise (accurate to about 1e-11).
+
+    Args:
+        x: Positive array
+
+    Returns:
+        Float array shaped like ``x``
+    """
+    x = np.asarray(x, dtype=float)
+    integer = (x == np.round(x)) & (x >= 1) & (x < 2**20)
+    if integer.all():
+        return log_factorial(x.astype(np.int64) - 1)
+
+    result = _scipy_gammaln(x) if _scipy_gammaln is not None else _stirling_log_gamma(x)
+    if integer.any():
+        result = np.where(
+            integer, log_factorial(np.where(integer, x, 1).astype(np.int64) - 1), result
+        )
+    return result
+
+
+def _log_choose(n: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """``log(n choose k)``, or ``-inf`` where ``k > n``."""
+    n = np.asarray(n, dtype=float)
+    k = np.asarray(k, dtype=float)
+    valid = (k >= 0) & (k <= n)
+    safe_n = np.where(valid, n, 0.0)
+    safe_k = np.where(valid, k, 0.0)
+    value = (
+        log_gamma(safe_n + 1) - log_gamma(safe_k + 1) - log_gamma(safe_n - safe_k + 1)
+    )
+    return np.where(valid, value, -np.inf)
+
+
+def _xlogy(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """``x * log(y)`` with ``0 * log(0) = 0``."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(x == 0, 0.0, x * np.log(y))
+
+
+def binomial_loglik(
+    observed: np.ndarray, trials: np.ndarray, rho: np.ndarray
+) -> np.ndarray:
+    """
+    Pointwise binomial log-likelihood, ``log dbinom(observed, trials, rho)``.
+
+    Args:
+        observed: Reported counts
+        trials: Number of cases that could be reported (may be non-integer
+            for deterministic model output)
+        rho: Reporting probability
+
+    Returns:
+        Log-likelihood broadcast over all inputs
+    """
+    trials = np.asarray(trials, dtype=float)
+    return (
+        _log_choose(trials, observed)
+        + _xlogy(observed, rho)
+        + _xlogy(
+            trials - np.asarray(observed, dtype=float),
+            1.0 - np.asarray(rho, dtype=float),
+        )
+    )
+
+
+def poisson_loglik(observed: np.ndarray, mean: np.ndarray) -> np.ndarray:
+    """
+    Pointwise Poisson log-likelihood, ``log dpois(observed, mean)``.
+
+    Args:
+        observed: Reported counts
+        mean: Expected reported counts
+
+    Returns:
+        Log-likelihood broadcast over all inputs
+    """
+    return _xlogy(observed, mean) - mean - log_factorial(observed)
+
+
+def negative_binomial_loglik(
+    observed: np.ndarray, mean: np.ndarray, size: np.ndarray
+) -> np.ndarray:
+    """
+    Pointwise negative-binomial log-likelihood.
+
+    Matches R's ``log(dnbinom(observed, size, mu=mean))``.
+
+    The variance is ``mean + mean**2 / size``; large ``size`` approaches the
+    Poisson model.
+
+    Args:
+        observed: Reported counts
+        mean: Expected reported counts
+        size: Dispersion parameter
+
+    Returns:
+        Log-likelihood broadcast over all inputs
+    """
+    observed = np.asarray(observed, dtype=float)
+    mean = np.asarray(mean, dtype=float)
+    size = np.asarray(size, dtype=float)
+    return (
+        log_gamma(observed + size)
+        - log_gamma(size)
+        - log_factorial(observed.astype(np.int64))
+        + _xlogy(size, size / (size + mean))
+        + _xlogy(observed, mean / (size + mean))
+    )
+
+
+def observation_loglik(
+    observed: np.ndarray,
+    incidence: np.ndarray,
+    rho: np.ndarray = RHO_GRID,
+    model: str = "binomial",
+    size: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Total log-likelihood of reported counts for grids of rho and model runs.
+
+    This is ``get_ll`` from the R likelihood templates evaluated for every
+    combination of reporting probability and simulated incidence at once.
+    Counts are summed over the last axis (observation times). For the
+    binomial and Poisson models the rho dependence separates from the sum, so
+    the whole grid costs one pass over the data plus an outer product.
+
+    Args:
+        observed: Reported counts, shape (times,) or broadcastable to
+            ``incidence``
+        incidence: Modelled new infections at the observation times, shape
+            (..., times), e.g. (parameter sets, times)
+        rho: Reporting probabilities, scalar or 1-D grid
+        model: 'binomial', 'poisson' or 'negative_binomial'
+        size: Dispersion for the negative-binomial model
+
+    Returns:
+        Array of shape rho.shape + incidence.shape[:-1]
+    """
+    if model not in OBSERVATION_MODELS:
+        raise ValueError(
+            f"Unknown observation model '{model}'. "
+            f"Available models: {', '.join(OBSERVATION_MODELS)}"
+        )
+    observed = np.asarray(observed)
+    incidence = np.asarray(incidence, dtype=float)
+    rho = np.asarray(rho, dtype=float)
+    observed, incidence = np.broadcast_arrays(observed, incidence)
+    rho_axes = rho.reshape(rho.shape + (1,) * (incidence.ndim - 1))
+
+    total_observed = observed.sum(axis=-1)
+    if model == "binomial":
+        constant = _log_choose(incidence, observed).sum(axis=-1)
+        unobserved = incidence.sum(axis=-1) - total_observed
+        return (
+            constant
+            + _xlogy(total_observed, rho_axes)
+            + _xlogy(unobserved, 1.0 - rho_axes)
+        )
+
+    if model == "poisson":
+        constant = (_xlogy(observed, incidence) - log_factorial(observed)).sum(axis=-1)
+        return (
+            constant
+            + _xlogy(total_observed, rho_axes)
+            - rho_axes * incidence.sum(axis=-1)
+        )
+
+    rho = rho.reshape(rho.shape + (1,) * incidence.ndim)
+    return pointwise_loglik(observed, incidence, rho, model, size).sum(axis=-1)
+
+
+def pointwise_loglik(
+    observed: np.ndarray,
+    incidence: np.ndarray,
+    rho: np.ndarray,
+    model: str = "binomial",
+    size: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Log-likelihood of each reported count, broadcast over all inputs.
+
+    Unlike ``observation_loglik`` nothing is summed and ``rho`` is not
+    treated as a separate grid axis, so each incidence curve can carry its
+    own reporting probability.
+
+    Args:
+        observed: Reported counts
+        incidence: Modelled new infections
+        rho: Reporting probability
+        model: 'binomial', 'poisson' or 'negative_binomial'
+        size: Dispersion for the negative-binomial model
+
+    Returns:
+        Log-likelihood of every count
+    """
+    if model == "binomial":
+        return binomial_loglik(observed, incidence, rho)
+    if model == "poisson":
+        return poisson_loglik(observed, np.asarray(rho) * incidence)
+    if model == "negative_binomial":
+        if size is None:
+            raise ValueError("The negative-binomial model requires a size.")
+        return negative_binomial_loglik(observed, np.asarray(rho) * incidence, size)
+    raise ValueError(
+        f"Unknown observation model '{model}'. "
+        f"Available models: {', '.join(OBSERVATION_MODELS)}"
+    )
@@ -0,0 +1,366 @@
+"""Affine-invariant ensemble MCMC for model parameters."""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Mapping, Optional, Sequence, Tuple, Union
+from ..models.rng import SeedLike
+from ..models.spec import ModelSpec
+from ..models.workspace import Workspace
+from .diagnostics import effective_sample_size, gelman_rubin
+from .objective import IncidenceLikelihood
+
+
+@dataclass(frozen=True)
+class MCMCResult:
+    """
+    Samples from an ensemble MCMC run.
+
+    Args:
+        names: Names of the sampled parameters
+        chain: Stored samples of shape (samples, walkers, parameters)
+        log_likelihood: Log-likelihood of each stored sample
+        acceptance_fraction: Fraction of accepted proposals per walker
+        diagnostics: R-hat and effective sample size of each parameter,
+            one row per diagnostic report
+        n_evaluations: Total number of simulated parameter sets
+    """
+
+    names: Tuple[str, ...]
+    chain: np.ndarray
+    log_likelihood: np.ndarray
+    acceptance_fraction: np.ndarray
+    diagnostics: pd.DataFrame
+    n_evaluations: int
+
+    def samples(self, discard: int = 0) -> pd.DataFrame:
+        """
+        Stored samples of every walker as one DataFrame.
+
+        Args:
+            discard: Number of stored samples to drop from the start of
+                each walker as burn-in
+
+        Returns:
+            DataFrame with one column per parameter plus 'log_likelihood'
+        """
+        chain = self.chain[discard:]
+        frame = pd.DataFrame(
+            chain.reshape(-1, len(self.names)), columns=list(self.names)
+        )
+        frame["log_likelihood"] = self.log_likelihood[discard:].ravel()
+        return frame
+
+    def r_hat(self, discard: int = 0) -> pd.Series:
+        """Split R-hat of each parameter after discarding burn-in."""
+        return pd.Series(gelman_rubin(self.chain[discard:]), index=list(self.names))
+
+    def ess(self, discard: int = 0) -> pd.Series:
+        """Effective sample size of each parameter after discarding burn-in."""
+        return pd.Series(
+            effective_sample_size(self.chain[discard:]), index=list(self.names)
+        )
+
+
+def _log_likelihood(
+    likelihood: IncidenceLikelihood, names: Sequence[str], points: np.ndarray
+) -> np.ndarray:
+    """Log-likelihood of a (points, parameters) batch in a worker process."""
+    return likelihood(dict(zip(names, points.T)))
+
+
+class _Posterior:
+    """Log-posterior under uniform priors, evaluated in chunks over a pool."""
+
+    def __init__(
+        self,
+        likelihood: IncidenceLikelihood,
+        names: Sequence[str],
+        lower: np.ndarray,
+        upper: np.ndarray,
+        executor: Optional[Executor],
+        n_chunks: int,
+    ):
+        self.likelihood = likelihood
+        self.names = tuple(names)
+        self.lower = lower
+        self.upper = upper
+        self.executor = executor
+        self.n_chunks = n_chunks
+        self.workspace = Workspace()
+        self.n_evaluations = 0
+
+    def __call__(self, points: np.ndarray) -> np.ndarray:
+        log_posterior = np.full(len(points), -np.inf)
+        inside = ((points > self.lower) & (points < self.upper)).all(axis=1)
+        points = points[inside]
+        if len(points) == 0:
+            return log_posterior
+        self.n_evaluations += len(points)
+
+        if self.executor is not None and len(points) > 1:
+            chunks = np.array_split(points, min(self.n_chunks, len(points)))
+            parts = self.executor.map(
+                _log_likelihood,
+                [self.likelihood] * len(chunks),
+                [self.names] * len(chunks),
+                chunks,
+            )
+            log_posterior[inside] = np.concatenate(list(parts))
+        else:
+            log_posterior[inside] = self.likelihood(
+                dict(zip(self.names, points.T)), self.workspace
+            )
+        return log_posterior
+
+
+def _initial_walkers(
+    posterior: _Posterior,
+    initial: Optional[Mapping[str, float]],
+    n_walkers: int,
+    screening: int,
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Start in a small ball around ``initial``, or at the best of a uniform sample."""
+    lower, upper = posterior.lower, posterior.upper
+    if initial is not None:
+        centre = np.array([initial[name] for name in posterior.names], dtype=float)
+        position = centre + 1e-3 * (upper - lower) * rng.standard_normal(
+            (n_walkers, len(centre))
+        )
+        position = np.clip(
+            position, lower + 1e-9 * (upper - lower), upper - 1e-9 * (upper - lower)
+        )
+        log_posterior = posterior(position)
+    else:
+        candidates = rng.uniform(lower, upper, size=(screening * n_walkers, len(lower)))
+        scores = posterior(candidates)
+        best = np.argsort(-scores, kind="stable")[:n_walkers]
+        position, log_posterior = candidates[best], scores[best]
+    if not np.isfinite(log_posterior).all():
+        raise ValueError(
+            "Some walkers start where the likelihood is zero; pass initial values, "
+            "e.g. the parameters of a fit() result."
+        )
+    return position, log_posterior
+
+
+def _save_checkpoint(path: str, **arrays) -> None:
+    """Write a checkpoint atomically so an interrupted save never corrupts it."""
+    temporary = f"{path}.tmp.npz"
+    np.savez(temporary, **arrays)
+    os.replace(temporary, path)
+
+
+def sample(
+    model_type: Union[str, ModelSpec],
+    observed: Sequence[float],
+    observation_times: Sequence[float],
+    bounds: Mapping[str, Tuple[float, float]],
+    population: float,
+    fixed: Optional[Mapping[str, float]] = None,
+    observation_model: str = "binomial",
+    n_walkers: int = 32,
+    n_steps: int = 2000,
+    thin: int = 1,
+    stretch: float = 2.0,
+    initial: Optional[Mapping[str, float]] = None,
+    screening: int = 16,
+    report_every: int = 100,
+    checkpoint: Optional[str] = None,
+    resume: bool = False,
+    dt: float = 0.1,
+    seed: SeedLike = None,
+    n_workers: int = 1,
+    backend: Optional[str] = None,
+    observation_period: Optional[float] = None,
+) -> MCMCResult:
+    """
+    Sample the posterior of model parameters with the stretch-move ensemble sampler.
+
+    Priors are uniform within ``bounds``; other parameters come from
+    ``fixed`` as in ``fit``. Walkers are updated in two halves with the
+    affine-invariant stretch move of Goodman and Weare, and all proposals of
+    a half are simulated as one ensemble. With ``n_workers > 1`` each batch
+    is split into that many chunks evaluated on a process pool.
+
+    Every ``report_every`` iterations, R-hat and the effective sample size
+    of the second half of the stored samples are recorded and, with
+    ``checkpoint`` set, the chain and sampler state are saved to that .npz
+    file. ``resume=True`` continues from an existing checkpoint up to
+    ``n_steps`` total iterations, with results identical to an
+    uninterrupted run.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIR') or a ModelSpec
+        observed: Reported counts at each observation time
+        observation_times: Times of the observations
+        bounds: (lower, upper) prior bounds of each sampled parameter
+        population: Population size used to turn fractions into counts
+        fixed: Values of the parameters that are not sampled
+        observation_model: 'binomial', 'poisson' or 'negative_binomial'
+        n_walkers: Number of walkers (even, at least twice the number of
+            parameters)
+        n_steps: Number of iterations
+        thin: Store every ``thin``-th iteration
+        stretch: Scale ``a`` of the stretch move
+        initial: Centre of the starting ball of walkers (uniform screening
+            within the bounds if None)
+        screening: Uniform candidates drawn per walker when ``initial`` is None
+        report_every: Iterations between diagnostic reports and checkpoints
+        checkpoint: Path of the .npz checkpoint file
+        resume: Whether to continue from ``checkpoint``
+        dt: Time step of the simulations
+        seed: Seed for the sampler
+        n_workers: Number of worker processes
+        backend: Compute backend name (the global default if None)
+        observation_period: Width of the window each observation covers
+            (the smallest spacing of ``observation_times`` if None)
+
+    Returns:
+        MCMCResult with the stored chain and diagnostics
+    """
+    names = tuple(bounds)
+    n_dims = len(names)
+    if n_walkers % 2 or n_walkers < 2 * n_dims:
+        raise ValueError(f"n_walkers must be even and at least {2 * n_dims}.")
+    if resume and checkpoint is None:
+        raise ValueError("resume requires a checkpoint path.")
+    lower = np.array([bounds[name][0] for name in names], dtype=float)
+    upper = np.array([bounds[name][1] for name in names], dtype=float)
+    if not (lower < upper).all():
+        raise ValueError("Each lower bound must be below its upper bound.")
+
+    likelihood = IncidenceLikelihood(
+        model_type,
+        observed,
+        observation_times,
+        population,
+        fixed,
+        observation_model=observation_model,
+        dt=dt,
+        backend=backend,
+        observation_period=observation_period,
+    )
+    likelihood.check_parameters(names)
+
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    try:
+        posterior = _Posterior(likelihood, names, lower, upper, executor, n_workers)
+        n_stored = n_steps // thin
+        chain = np.empty((n_stored, n_walkers, n_dims))
+        chain_log_likelihood = np.empty((n_stored, n_walkers))
+        accepted = np.zeros(n_walkers, dtype=np.int64)
+        reports = []
+
+        if resume:
+            with np.load(checkpoint) as saved:
+                if tuple(saved["names"]) != names or saved["chain"].shape[1:] != (
+                    n_walkers,
+                    n_dims,
+                ):
+                    raise ValueError(
+                        "The checkpoint was written for different parameters "
+                        "or walkers."
+                    )
+                if int(saved["thin"]) != thin:
+                    raise ValueError(
+                        "The checkpoint was written with a different thin."
+                    )
+                start = int(saved["iteration"])
+                stored = min(len(saved["chain"]), n_stored)
+                chain[:stored] = saved["chain"][:stored]
+                chain_log_likelihood[:stored] = saved["log_likelihood"][:stored]
+                position = saved["position"].copy()
+                log_posterior = saved["position_log_likelihood"].copy()
+                accepted[:] = saved["accepted"]
+                posterior.n_evaluations = int(saved["n_evaluations"])
+                reports = [
+                    dict(zip(saved["report_columns"], row)) for row in saved["reports"]
+                ]
+                rng = np.random.default_rng()
+                rng.bit_generator.state = json.loads(str(saved["rng_state"]))
+        else:
+            start = 0
+            rng = np.random.default_rng(seed)
+            position, log_posterior = _initial_walkers(
+                posterior, initial, n_walkers, screening, rng
+            )
+
+        halves = np.split(np.arange(n_walkers), 2)
+        for iteration in range(start, n_steps):
+            for active, other in (halves, halves[::-1]):
+                # Stretch each walker towards or away from a random partner
+                z = ((stretch - 1.0) * rng.random(len(active)) + 1.0) ** 2 / stretch
+                partners = position[other[rng.integers(len(other), size=len(active))]]
+                proposal = partners + z[:, None] * (position[active] - partners)
+                proposal_log_posterior = posterior(proposal)
+
+                with np.errstate(invalid="ignore"):
+                    log_ratio = (
+                        (n_dims - 1) * np.log(z)
+                        + proposal_log_posterior
+                        - log_posterior[active]
+                    )
+                accept = np.log(rng.random(len(active))) < log_ratio
+                position[active[accept]] = proposal[accept]
+                log_posterior[active[accept]] = proposal_log_posterior[accept]
+                accepted[active[accept]] += 1
+
+            if (iteration + 1) % thin == 0:
+                row = (iteration + 1) // thin - 1
+                chain[row] = position
+                chain_log_likelihood[row] = log_posterior
+
+            if (iteration + 1) % report_every == 0 or iteration + 1 == n_steps:
+                stored = (iteration + 1) // thin
+                recent = chain[stored // 2 : stored]
+                report = {"iteration": iteration + 1}
+                report.update(
+                    {
+                        f"r_hat_{name}": value
+                        for name, value in zip(names, gelman_rubin(recent))
+                    }
+                )
+                report.update(
+                    {
+                        f"ess_{name}": value
+                        for name, value in zip(names, effective_sample_size(recent))
+                    }
+                )
+                report["acceptance"] = accepted.mean() / (iteration + 1)
+                reports.append(report)
+
+                if checkpoint is not None:
+                    _save_checkpoint(
+                        checkpoint,
+                        names=np.array(names),
+                        thin=thin,
+                        iteration=iteration + 1,
+                        chain=chain[:stored],
+                        log_likelihood=chain_log_likelihood[:stored],
+                        position=position,
+                        position_log_likelihood=log_posterior,
+                        accepted=accepted,
+                        n_evaluations=posterior.n_evaluations,
+                        report_columns=np.array(list(reports[0])),
+                        reports=np.array(
+                            [list(report.values()) for report in reports], dtype=float
+                        ),
+                        rng_state=json.dumps(rng.bit_generator.state),
+                    )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return MCMCResult(
+        names=names,
+        chain=chain,
+        log_likelihood=chain_log_likelihood,
+        acceptance_fraction=accepted / max(n_steps, 1),
+        diagnostics=pd.DataFrame(reports).astype({"iteration": int}),
+        n_evaluations=posterior.n_evaluations,
+    )
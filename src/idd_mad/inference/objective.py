@@ -0,0 +1,200 @@
+"""Likelihood of reported cases as a batched function of model parameters."""
+
+import numpy as np
+from typing import Mapping, Optional, Sequence, Union
+from ..models.ensemble import run_ensemble
+from ..models.spec import ArrayLike, ModelSpec, get_model_spec
+from ..models.workspace import Workspace
+from .likelihood import OBSERVATION_MODELS, observation_windows, pointwise_loglik
+
+# Parameters of the observation process rather than the transmission model
+OBSERVATION_PARAMETERS = ("initial_infected", "rho", "size")
+
+
+class IncidenceLikelihood:
+    """
+    Log-likelihood of reported counts for batches of parameter sets.
+
+    Each call simulates every parameter set as one member of a single
+    ``run_ensemble`` call, stores only the bounds of the reporting windows,
+    and scores the new infections within each window (times population)
+    against the reported counts. Every window is ``observation_period``
+    wide and ends at its observation time (see ``observation_windows``).
+    Parameter values that are not passed to the call are taken from
+    ``fixed``.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIR') or a ModelSpec
+        observed: Reported counts at each observation time
+        observation_times: Times of the observations
+        population: Population size used to turn fractions into counts
+        fixed: Values of parameters that are not estimated; besides the model
+            parameters this may hold 'initial_infected', 'rho' and 'size'
+        observation_model: 'binomial', 'poisson' or 'negative_binomial'
+        flow: Flow column that is observed
+        dt: Time step of the simulations
+        use_exponential_form: Whether to use exponential form for transitions
+        backend: Compute backend name (the global default if None)
+        observation_period: Width of the window each observation covers
+            (the smallest spacing of ``observation_times`` if None)
+    """
+
+    def __init__(
+        self,
+        model_type: Union[str, ModelSpec],
+        observed: Sequence[float],
+        observation_times: Sequence[float],
+        population: float,
+        fixed: Optional[Mapping[str, float]] = None,
+        observation_model: str = "binomial",
+        flow: str = "newI",
+        dt: float = 0.1,
+        use_exponential_form: bool = False,
+        backend: Optional[str] = None,
+        observation_period: Optional[float] = None,
+    ):
+        if observation_model not in OBSERVATION_MODELS:
+            raise ValueError(
+                f"Unknown observation model '{observation_model}'. "
+                f"Available models: {', '.join(OBSERVATION_MODELS)}"
+            )
+        self.spec = get_model_spec(model_type)
+        if flow not in self.spec.columns:
+            raise ValueError(f"Model '{self.spec.name}' has no column '{flow}'.")
+
+        self.observed = np.asarray(observed, dtype=float)
+        self.observation_times = np.asarray(observation_times, dtype=float)
+        if (
+            self.observed.shape != self.observation_times.shape
+            or self.observed.ndim != 1
+        ):
+            raise ValueError(
+                "observed and observation_times must be 1-D arrays of the same length."
+            )
+
+        # Flows are accumulated between stored rows, so storing the start of
+        # every window as well makes each observation the incidence within it
+        starts, ends = observation_windows(
+            self.observation_times, dt, observation_period
+        )
+        steps = np.unique(np.concatenate([starts, ends]))
+        self.output_times = steps * dt
+        self.rows = np.searchsorted(steps, ends)
+
+        self.population = population
+        self.fixed = dict(fixed or {})
+        self.observation_model = observation_model
+        self.flow = flow
+        self.dt = dt
+        self.use_exponential_form = use_exponential_form
+        self.backend = backend
+
+    @property
+    def parameter_names(self) -> tuple:
+        """Names of every parameter the likelihood depends on."""
+        names = self.spec.parameters + ("initial_infected", "rho")
+        if self.observation_model == "negative_binomial":
+            names += ("size",)
+        return names
+
+    def check_parameters(self, estimated: Sequence[str]) -> None:
+        """
+        Check that ``estimated`` plus ``fixed`` determine every parameter.
+
+        Args:
+            estimated: Names of the parameters that will be passed to calls
+        """
+        unknown = [
+            name for name in estimated if name not in self.parameter_names + ("mu",)
+        ]
+        if unknown:
+            raise ValueError(
+                f"Unknown parameters for model '{self.spec.name}': {unknown}"
+            )
+        missing = [
+            name
+            for name in self.parameter_names
+            if name not in estimated and name not in self.fixed
+        ]
+        if missing:
+            raise ValueError(f"Parameters must be estimated or fixed: {missing}")
+
+    def incidence(
+        self, values: Mapping[str, ArrayLike], workspace: Optional[Workspace] = None
+    ) -> np.ndarray:
+        """
+        Simulated counts at the observation times.
+
+        Args:
+            values: Parameter values, each a scalar or 1-D array
+            workspace: Buffers to reuse across repeated calls
+
+        Returns:
+            Array of shape (parameter sets, observation times)
+        """
+        parameters = {**self.fixed, **values}
+        initial_infected = parameters.pop("initial_infected")
+        for name in OBSERVATION_PARAMETERS:
+            parameters.pop(name, None)
+        result = run_ensemble(
+            self.spec,
+            initial_infected,
+            parameters,
+            dt=self.dt,
+            max_time=self.output_times[-1] + 2 * self.dt,
+            use_exponential_form=self.use_exponential_form,
+            output_times=self.output_times,
+            backend=self.backend,
+            workspace=workspace,
+        )
+        return result[self.flow][:, self.rows] * self.population
+
+    def __call__(
+        self, values: Mapping[str, ArrayLike], workspace: Optional[Workspace] = None
+    ) -> np.ndarray:
+        """
+        Log-likelihood of every parameter set.
+
+        Args:
+            values: Parameter values, each a scalar or 1-D array
+            workspace: Buffers to reuse across repeated calls
+
+        Returns:
+            1-D array with one log-likelihood per parameter set; ``-inf`` for
+            sets with invalid values
+        """
+        parameters = {**self.fixed, **values}
+        arrays = np.broadcast_arrays(
+            *[
+                np.atleast_1d(np.asarray(value, dtype=float))
+                for value in parameters.values()
+            ]
+        )
+        parameters = dict(zip(parameters.keys(), arrays))
+
+        rho = parameters["rho"]
+        size = parameters.get("size")
+        valid = (rho >= 0) & (rho <= 1) & (parameters["initial_infected"] > 0)
+        valid &= parameters["initial_infected"] < 1
+        for name in parameters:
+            if name not in OBSERVATION_PARAMETERS:
+                valid &= parameters[name] >= 0
+        if size is not None:
+            valid &= size > 0
+
+        loglik = np.full(len(rho), -np.inf)
+        if not valid.any():
+            return loglik
+        parameters = {name: array[valid] for name, array in parameters.items()}
+        incidence = self.incidence(parameters, workspace)
+        size = parameters["size"][:, None] if size is not None else None
+        with np.errstate(invalid="ignore"):
+            values = pointwise_loglik(
+                self.observed,
+                incidence,
+                parameters["rho"][:, None],
+                self.observation_model,
+                size,
+            ).sum(axis=-1)
+        loglik[valid] = np.where(np.isnan(values), -np.inf, values)
+        return loglik
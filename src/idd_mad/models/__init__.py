@@ -1,5 +1,71 @@
 """Epidemiological models module."""
 
-from .sir import run_sir_model, run_seir_model, cull_dataframe
+from .sir import (
+    simulate_model, run_model, run_sir_model, run_seir_model, cull_dataframe
+)
+from .ensemble import run_ensemble, run_sir_ensemble, run_seir_ensemble
+from .ode import dormand_prince, simulate_ode
+from .summary import EpidemicSummary, summarize_model, summarize_ensemble
+from .workspace import Workspace
+from .result import SimulationResult, StreamChunk
+from .stream import stream_model
+from .rng import CommonRandomNumbers, RandomStreams
+from .stochastic import ChainBinomialModel, run_chain_binomial
+from .gillespie import StochasticTrajectories, run_gillespie
+from .metapop import CouplingMatrix, run_metapopulation
+from .age import ContactMatrix, run_age_structured
+from .network import run_network
+from .agents import AgentPopulation, AgentBasedModel, run_agent_model
+from .multistrain import run_multistrain
+from .spec import Flow, ModelSpec, MODEL_REGISTRY, register_model, get_model_spec
+from .backends import (
+    Backend, BACKENDS, register_backend, get_backend, set_default_backend,
+    available_backends, check_backend_conformance
+)
 
-__all__ = ['run_sir_model', 'run_seir_model', 'cull_dataframe']
+__all__ = [
+    'simulate_model',
+    'run_model',
+    'run_sir_model',
+    'run_seir_model',
+    'cull_dataframe',
+    'run_ensemble',
+    'run_sir_ensemble',
+    'run_seir_ensemble',
+    'dormand_prince',
+    'simulate_ode',
+    'EpidemicSummary',
+    'summarize_model',
+    'summarize_ensemble',
+    'Flow',
+    'ModelSpec',
+    'MODEL_REGISTRY',
+    'register_model',
+    'get_model_spec',
+    'Workspace',
+    'SimulationResult',
+    'StreamChunk',
+    'stream_model',
+    'RandomStreams',
+    'CommonRandomNumbers',
+    'ChainBinomialModel',
+    'run_chain_binomial',
+    'StochasticTrajectories',
+    'run_gillespie',
+    'CouplingMatrix',
+    'run_metapopulation',
+    'ContactMatrix',
+    'run_age_structured',
+    'run_network',
+    'AgentPopulation',
+    'AgentBasedModel',
+    'run_agent_model',
+    'run_multistrain',
+    'Backend',
+    'BACKENDS',
+    'register_backend',
+    'get_backend',
+    'set_default_backend',
+    'available_backends',
+    'check_backend_conformance'
+]
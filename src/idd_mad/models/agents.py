@@ -0,0 +1,322 @@
+"""Agent-based SIR and SEIR simulation with agents stored as flat arrays."""
+
+import numpy as np
+import pandas as pd
+from typing import Mapping, Optional
+from .rng import SeedLike
+from .spec import ArrayLike, resolve_output_steps
+
+AGENT_MODELS = ("SIR", "SEIR")
+
+# Agent state codes
+SUSCEPTIBLE, EXPOSED, INFECTIOUS, RECOVERED = range(4)
+
+# Below this susceptible fraction, new infections are drawn from the list of
+# susceptible agents instead of by rejection from all agents
+_REJECTION_LIMIT = 0.05
+
+
+class AgentPopulation:
+    """
+    Agents of one population as a struct of arrays.
+
+    Every agent is one entry in each array: a uint8 state code, a float32
+    timer with the time left in the exposed or infectious state, and
+    optional float32 susceptibility and infectiousness multipliers. The
+    indices of exposed and infectious agents are also kept, so timers and
+    transmission are updated only for agents that are currently infected.
+
+    Args:
+        n_agents: Number of agents
+        susceptibility: Relative susceptibility of each agent (all 1 if None)
+        infectiousness: Relative infectiousness of each agent (all 1 if None)
+    """
+
+    def __init__(
+        self,
+        n_agents: int,
+        susceptibility: Optional[ArrayLike] = None,
+        infectiousness: Optional[ArrayLike] = None,
+    ):
+        self.n_agents = int(n_agents)
+        self.state = np.zeros(self.n_agents, dtype=np.uint8)
+        self.timer = np.zeros(self.n_agents, dtype=np.float32)
+        self.susceptibility = self._multiplier(susceptibility, "susceptibility")
+        self.infectiousness = self._multiplier(infectiousness, "infectiousness")
+        self.exposed = np.empty(0, dtype=np.int64)
+        self.infectious = np.empty(0, dtype=np.int64)
+        self.counts = np.array([self.n_agents, 0, 0, 0], dtype=np.int64)
+
+    def _multiplier(
+        self, values: Optional[ArrayLike], name: str
+    ) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != (self.n_agents,) or np.any(values < 0):
+            raise ValueError(f"{name} must hold one non-negative value per agent.")
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the per-agent arrays."""
+        arrays = (
+            self.state,
+            self.timer,
+            self.susceptibility,
+            self.infectiousness,
+            self.exposed,
+            self.infectious,
+        )
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def infectious_pressure(self) -> float:
+        """Total infectiousness of the infectious agents per agent."""
+        if self.infectiousness is None:
+            return len(self.infectious) / self.n_agents
+        return (
+            float(self.infectiousness[self.infectious].sum(dtype=np.float64))
+            / self.n_agents
+        )
+
+    def sample_susceptible(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Draw ``n`` distinct susceptible agents uniformly at random."""
+        n_susceptible = self.counts[SUSCEPTIBLE]
+        if n >= n_susceptible:
+            return np.flatnonzero(self.state == SUSCEPTIBLE)
+        if n_susceptible < _REJECTION_LIMIT * self.n_agents:
+            return rng.choice(
+                np.flatnonzero(self.state == SUSCEPTIBLE), size=n, replace=False
+            )
+
+        chosen = np.empty(0, dtype=np.int64)
+        while len(chosen) < n:
+            candidates = rng.integers(0, self.n_agents, size=2 * (n - len(chosen)) + 16)
+            candidates = candidates[self.state[candidates] == SUSCEPTIBLE]
+            chosen = np.union1d(chosen, candidates)
+        # union1d sorts, so drop a random subset rather than the tail
+        return rng.choice(chosen, size=n, replace=False) if len(chosen) > n else chosen
+
+
+class AgentBasedModel:
+    """
+    Well-mixed SIR or SEIR dynamics for an AgentPopulation.
+
+    Each step, susceptible agent ``i`` is infected with probability
+    ``1 - exp(-beta * s_i * P * dt)``, where ``s_i`` is its susceptibility
+    and ``P`` the total infectiousness of infectious agents divided by the
+    number of agents. Time spent exposed and infectious is gamma distributed
+    with means ``1 / sigma`` and ``1 / gamma`` and shape ``period_shape``
+    (1 gives the exponential periods of the compartmental models), and is
+    counted down by the agent's timer.
+
+    All transitions of a step are drawn together. New infections are drawn
+    as a binomial count followed by a sample of susceptible agents (thinned
+    by susceptibility when it varies), so a step costs time in the number
+    of infected agents rather than the population size.
+
+    Args:
+        model_type: 'SIR' or 'SEIR'
+        parameters: Dict with 'beta', 'gamma' and, for SEIR, 'sigma'
+        dt: Time step
+        period_shape: Shape of the gamma-distributed exposed and infectious periods
+    """
+
+    def __init__(
+        self,
+        model_type: str,
+        parameters: Mapping[str, float],
+        dt: float = 0.1,
+        period_shape: float = 1.0,
+    ):
+        if model_type not in AGENT_MODELS:
+            raise ValueError(
+                f"Unknown agent model '{model_type}'. "
+                f"Available models: {', '.join(AGENT_MODELS)}"
+            )
+        self.latent = model_type == "SEIR"
+        required = ("beta", "sigma", "gamma") if self.latent else ("beta", "gamma")
+        missing = [name for name in required if name not in parameters]
+        if missing:
+            raise ValueError(f"Missing parameters for model '{model_type}': {missing}")
+        if period_shape <= 0:
+            raise ValueError("period_shape must be positive.")
+
+        self.model_type = model_type
+        self.beta = float(parameters["beta"])
+        self.gamma = float(parameters["gamma"])
+        self.sigma = float(parameters["sigma"]) if self.latent else None
+        self.dt = dt
+        self.period_shape = period_shape
+        self.compartments = ("S", "E", "I", "R") if self.latent else ("S", "I", "R")
+        self.flow_names = ("newE", "newI", "newR") if self.latent else ("newI", "newR")
+
+    def durations(self, rate: float, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Draw ``n`` gamma-distributed periods with mean ``1 / rate``."""
+        shape = self.period_shape
+        return rng.gamma(shape, 1.0 / (rate * shape), size=n).astype(np.float32)
+
+    def seed(
+        self, population: AgentPopulation, n: int, rng: np.random.Generator
+    ) -> None:
+        """Make ``n`` random susceptible agents infectious."""
+        agents = np.sort(population.sample_susceptible(n, rng))
+        population.state[agents] = INFECTIOUS
+        population.timer[agents] = self.durations(self.gamma, len(agents), rng)
+        population.infectious = np.concatenate([population.infectious, agents])
+        population.counts[SUSCEPTIBLE] -= len(agents)
+        population.counts[INFECTIOUS] += len(agents)
+
+    def step(self, population: AgentPopulation, rng: np.random.Generator) -> np.ndarray:
+        """
+        Advance the population by one time step.
+
+        Args:
+            population: Agents to update in place
+            rng: Random number generator
+
+        Returns:
+            Number of agents moved by each flow (``flow_names``)
+        """
+        dt = self.dt
+        force = self.beta * population.infectious_pressure() * dt
+        susceptibility = population.susceptibility
+        top = 1.0 if susceptibility is None else float(susceptibility.max())
+        candidate_probability = -np.expm1(-force * top)
+        n_candidates = rng.binomial(
+            population.counts[SUSCEPTIBLE], candidate_probability
+        )
+        infected = population.sample_susceptible(n_candidates, rng)
+        if susceptibility is not None and len(infected):
+            accept = (
+                -np.expm1(-force * susceptibility[infected]) / candidate_probability
+            )
+            infected = infected[rng.random(len(infected)) < accept]
+
+        # Count down the timers of agents that were infected before this step
+        infectious = population.infectious
+        population.timer[infectious] -= dt
+        done = population.timer[infectious] <= 0
+        recovered, infectious = infectious[done], infectious[~done]
+        population.state[recovered] = RECOVERED
+
+        n_progressed = 0
+        if self.latent:
+            exposed = population.exposed
+            population.timer[exposed] -= dt
+            done = population.timer[exposed] <= 0
+            progressed, exposed = exposed[done], exposed[~done]
+            population.state[progressed] = INFECTIOUS
+            population.timer[progressed] = self.durations(
+                self.gamma, len(progressed), rng
+            )
+            infectious = np.concatenate([infectious, progressed])
+            n_progressed = len(progressed)
+
+            population.state[infected] = EXPOSED
+            population.timer[infected] = self.durations(self.sigma, len(infected), rng)
+            population.exposed = np.concatenate([exposed, infected])
+        else:
+            population.state[infected] = INFECTIOUS
+            population.timer[infected] = self.durations(self.gamma, len(infected), rng)
+            infectious = np.concatenate([infectious, infected])
+            # New infections pass straight through the (empty) exposed class
+            n_progressed = len(infected)
+        population.infectious = infectious
+
+        n_infected, n_recovered = len(infected), len(recovered)
+        population.counts += (
+            -n_infected,
+            n_infected - n_progressed,
+            n_progressed - n_recovered,
+            n_recovered,
+        )
+        if self.latent:
+            return np.array([n_infected, n_progressed, n_recovered])
+        return np.array([n_infected, n_recovered])
+
+
+def run_agent_model(
+    model_type: str,
+    initial_infected: float,
+    parameters: Mapping[str, float],
+    n_agents: int,
+    dt: float = 0.1,
+    max_time: float = 100.0,
+    output_interval: Optional[float] = None,
+    output_times: Optional[np.ndarray] = None,
+    period_shape: float = 1.0,
+    susceptibility: Optional[ArrayLike] = None,
+    infectiousness: Optional[ArrayLike] = None,
+    seed: SeedLike = None,
+) -> pd.DataFrame:
+    """
+    Run an agent-based SIR or SEIR simulation.
+
+    The result has the same columns as ``run_sir_model`` and
+    ``run_seir_model``, as fractions of the population, so it can be plotted
+    and compared directly with the compartmental models. Agents live in
+    compact arrays (see ``AgentPopulation``), so 10^6 agents take a few
+    megabytes, and each step only touches infected agents and the agents
+    they infect. The run stops early once no agent is exposed or infectious,
+    and the remaining rows repeat the final state.
+
+    Args:
+        model_type: 'SIR' or 'SEIR'
+        initial_infected: Initial fraction of agents infectious (0-1)
+        parameters: Dict with 'beta', 'gamma' and, for SEIR, 'sigma'
+        n_agents: Number of agents
+        dt: Time step
+        max_time: Maximum simulation time
+        output_interval: Time between stored rows (every step if None)
+        output_times: Times at which to store rows; overrides output_interval
+        period_shape: Shape of the gamma-distributed exposed and infectious
+            periods (1 for exponential periods)
+        susceptibility: Relative susceptibility of each agent
+        infectiousness: Relative infectiousness of each agent
+        seed: Seed or generator for the random draws
+
+    Returns:
+        DataFrame with columns: time, compartments, and one column per flow
+    """
+    model = AgentBasedModel(model_type, parameters, dt, period_shape)
+    population = AgentPopulation(n_agents, susceptibility, infectiousness)
+    rng = np.random.default_rng(seed)
+    model.seed(population, int(round(initial_infected * n_agents)), rng)
+
+    n_steps = int(max_time / dt)
+    output_steps = resolve_output_steps(dt, n_steps, output_interval, output_times)
+    if output_steps is None:
+        output_steps = np.arange(n_steps)
+
+    compartments = [("S", "E", "I", "R").index(name) for name in model.compartments]
+    n_compartments = len(compartments)
+    rows = np.zeros(
+        (len(output_steps), n_compartments + len(model.flow_names)), dtype=np.int64
+    )
+    pending = np.zeros(len(model.flow_names), dtype=np.int64)
+    n_out = 0
+    if output_steps[0] == 0:
+        rows[0, :n_compartments] = population.counts[compartments]
+        n_out = 1
+
+    for step in range(1, output_steps[-1] + 1):
+        if len(population.exposed) == 0 and len(population.infectious) == 0:
+            break
+        pending += model.step(population, rng)
+        if step == output_steps[n_out]:
+            rows[n_out, :n_compartments] = population.counts[compartments]
+            rows[n_out, n_compartments:] = pending
+            pending[:] = 0
+            n_out += 1
+
+    # After extinction the state stays put and nothing flows
+    rows[n_out:, :n_compartments] = population.counts[compartments]
+    if n_out < len(rows):
+        rows[n_out, n_compartments:] = pending
+
+    df = pd.DataFrame(
+        rows / n_agents, columns=list(model.compartments + model.flow_names)
+    )
+    df.insert(0, "time", output_steps * dt)
+    return df
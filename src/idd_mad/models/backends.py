@@ -0,0 +1,293 @@
+"""Compute backends that run the generated model kernels."""
+
+import numpy as np
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .spec import CompiledModel
+
+# Signature shared by all steppers: (out, n, t0, dt, state) -> new state, where
+# out has shape (n, columns, members) and state has shape (compartments, members)
+Stepper = Callable[[np.ndarray, int, float, float, np.ndarray], np.ndarray]
+
+
+class Backend:
+    """Base class for compute backends."""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        """Return whether the backend can be used in this environment."""
+        return True
+
+    def stepper(
+        self,
+        model: "CompiledModel",
+        use_exponential_form: bool,
+        vital: bool,
+        arguments: List[np.ndarray],
+    ) -> Stepper:
+        """
+        Build a stepper for one model variant and one set of parameters.
+
+        Args:
+            model: Compiled model
+            use_exponential_form: Whether to use exponential form for transitions
+            vital: Whether to include births and deaths
+            arguments: Parameter arrays of shape (members,), in kernel order
+
+        Returns:
+            Function that advances the state by ``n`` steps
+        """
+        raise NotImplementedError
+
+
+class NumpyBackend(Backend):
+    """
+    Reference backend that steps each member separately on Python floats.
+
+    This mirrors the original scalar simulation loop and is the baseline the
+    other backends are checked against.
+    """
+
+    name = "numpy"
+
+    def stepper(
+        self,
+        model: "CompiledModel",
+        use_exponential_form: bool,
+        vital: bool,
+        arguments: List[np.ndarray],
+    ) -> Stepper:
+        kernel = model.kernel(use_exponential_form, vital, scalar=True)
+        member_arguments = np.array(arguments, dtype=float).T.tolist()
+
+        def step(
+            out: np.ndarray, n: int, t0: float, dt: float, state: np.ndarray
+        ) -> np.ndarray:
+            new_state = np.empty_like(state)
+            for m, member in enumerate(member_arguments):
+                new_state[:, m] = kernel(
+                    out[:, :, m], n, t0, dt, *state[:, m].tolist(), *member
+                )
+            return new_state
+
+        return step
+
+
+class BatchBackend(Backend):
+    """
+    Vectorized backend that advances all members with one set of array
+    operations per step. Single runs use the scalar kernel, which is faster
+    than array operations on length-1 arrays.
+    """
+
+    name = "batch"
+
+    def stepper(
+        self,
+        model: "CompiledModel",
+        use_exponential_form: bool,
+        vital: bool,
+        arguments: List[np.ndarray],
+    ) -> Stepper:
+        if len(arguments[0]) == 1:
+            return NumpyBackend().stepper(model, use_exponential_form, vital, arguments)
+
+        kernel = model.kernel(use_exponential_form, vital, scalar=False)
+
+        def step(
+            out: np.ndarray, n: int, t0: float, dt: float, state: np.ndarray
+        ) -> np.ndarray:
+            return np.array(kernel(out, n, t0, dt, *state, *arguments))
+
+        return step
+
+
+class NumbaBackend(Backend):
+    """
+    JIT-compiled backend used when numba is installed.
+
+    The scalar kernel source is compiled with ``numba.njit`` together with a
+    loop over members, so whole chunks run without returning to Python.
+    """
+
+    name = "numba"
+
+    def is_available(self) -> bool:
+        try:
+            import numba  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _members_kernel(
+        self, model: "CompiledModel", use_exponential_form: bool, vital: bool
+    ) -> Callable[..., None]:
+        # Compiled functions are cached on the model next to its Python kernels
+        key = (self.name, use_exponential_form, vital)
+        if key not in model._kernels:
+            import numba
+            from .spec import SCALAR_RATE_FUNCTIONS
+
+            namespace = dict(SCALAR_RATE_FUNCTIONS)
+            exec(model.kernel_source(use_exponential_form, vital), namespace)
+            namespace["_kernel"] = numba.njit(namespace["_kernel"])
+
+            state = ", ".join(f"_state[{i}, _m]" for i in range(model.n_compartments))
+            params = ", ".join(
+                f"_params[{j}, _m]" for j in range(len(model.parameter_names))
+            )
+            source = (
+                "\n".join(
+                    [
+                        "def _members(_out, _n, _t0, dt, _state, _params):",
+                        "    for _m in range(_state.shape[1]):",
+                        "        _new = _kernel("
+                        f"_out[:, :, _m], _n, _t0, dt, {state}, {params})",
+                        *[
+                            f"        _state[{i}, _m] = _new[{i}]"
+                            for i in range(model.n_compartments)
+                        ],
+                    ]
+                )
+                + "\n"
+            )
+            exec(source, namespace)
+            model._kernels[key] = numba.njit(namespace["_members"])
+        return model._kernels[key]
+
+    def stepper(
+        self,
+        model: "CompiledModel",
+        use_exponential_form: bool,
+        vital: bool,
+        arguments: List[np.ndarray],
+    ) -> Stepper:
+        if not self.is_available():
+            raise ImportError("The 'numba' backend requires numba to be installed.")
+        kernel = self._members_kernel(model, use_exponential_form, vital)
+        params = np.ascontiguousarray(np.array(arguments, dtype=float))
+
+        def step(
+            out: np.ndarray, n: int, t0: float, dt: float, state: np.ndarray
+        ) -> np.ndarray:
+            new_state = np.array(state, dtype=float)
+            kernel(out, n, t0, dt, new_state, params)
+            return new_state
+
+        return step
+
+
+BACKENDS: Dict[str, Backend] = {}
+_default_backend = "batch"
+
+
+def register_backend(backend: Backend) -> Backend:
+    """
+    Add a compute backend to the registry.
+
+    Args:
+        backend: Backend instance
+
+    Returns:
+        The registered backend
+    """
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def available_backends() -> List[str]:
+    """Return names of registered backends that can run in this environment."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def set_default_backend(name: str) -> None:
+    """
+    Select the backend used when no backend is passed to a simulation.
+
+    Args:
+        name: Registered backend name
+    """
+    global _default_backend
+    get_backend(name)
+    _default_backend = name
+
+
+def get_backend(name: Optional[str] = None) -> Backend:
+    """
+    Look up a registered backend.
+
+    Args:
+        name: Backend name, or None for the current default
+
+    Returns:
+        Backend instance
+    """
+    name = _default_backend if name is None else name
+    if name not in BACKENDS:
+        available = ", ".join(BACKENDS)
+        raise ValueError(f"Unknown backend '{name}'. Available backends: {available}")
+    backend = BACKENDS[name]
+    if not backend.is_available():
+        raise ImportError(f"Backend '{name}' is not available in this environment.")
+    return backend
+
+
+def check_backend_conformance(
+    model_type: str = "SEIRS",
+    backends: Optional[List[str]] = None,
+    tolerance: float = 1e-10,
+) -> Dict[str, float]:
+    """
+    Check that backends reproduce the reference backend's trajectories.
+
+    A small ensemble is run with both transition forms and with births and
+    deaths switched on and off.
+
+    Args:
+        model_type: Registered model name to check
+        backends: Backends to compare (all available backends if None)
+        tolerance: Allowed absolute difference (outputs are population fractions)
+
+    Returns:
+        Dictionary with the largest absolute difference per backend
+    """
+    from .spec import get_model_spec
+
+    model = get_model_spec(model_type).compiled
+    parameters = {name: np.linspace(0.1, 2.0, 4) for name in model.spec.parameters}
+    initial_infected = np.array([0.001, 0.01, 0.05, 0.1])
+
+    differences = {}
+    for name in backends or available_backends():
+        differences[name] = 0.0
+        for use_exponential_form in (False, True):
+            for mu in (0.0, 0.02):
+                runs = [
+                    model.simulate(
+                        initial_infected,
+                        {**parameters, "mu": mu},
+                        dt=0.05,
+                        max_time=20.0,
+                        use_exponential_form=use_exponential_form,
+                        backend=backend,
+                    )
+                    for backend in ("numpy", name)
+                ]
+                for column in model.columns:
+                    reference, result = runs[0][column], runs[1][column]
+                    if not np.allclose(result, reference, rtol=0.0, atol=tolerance):
+                        raise AssertionError(
+                            f"Backend '{name}' differs from 'numpy' "
+                            f"in column '{column}'."
+                        )
+                    differences[name] = max(
+                        differences[name], float(np.abs(result - reference).max())
+                    )
+    return differences
+
+
+register_backend(NumpyBackend())
+register_backend(BatchBackend())
+register_backend(NumbaBackend())
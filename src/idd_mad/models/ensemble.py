@@ -0,0 +1,150 @@
+"""Vectorized ensemble versions of the compartmental models."""
+
+import numpy as np
+from typing import Dict, Mapping, Optional, Union
+from .spec import ArrayLike, ModelSpec, get_model_spec
+from .workspace import Workspace
+
+
+def run_ensemble(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+    cull_threshold: Optional[float] = None,
+    output_interval: Optional[float] = None,
+    output_times: Optional[np.ndarray] = None,
+    backend: Optional[str] = None,
+    workspace: Optional[Workspace] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Run many discrete simulations of a registered model at once.
+
+    ``initial_infected`` and every parameter may be a scalar or a 1-D array;
+    arrays are broadcast against each other and each element defines one
+    ensemble member. All members are advanced together with one set of array
+    operations per time step.
+
+    Unlike ``run_model`` the trajectories are not culled by default, so every
+    member covers the full ``max_time`` horizon. With ``cull_threshold`` set,
+    rows more than 5 time units after the last time any member's infections
+    were at or above the threshold are dropped (see ``CompiledModel.simulate``).
+
+    With ``workspace`` set, the returned arrays are views into its buffers
+    and are overwritten by the next call; use ``Workspace.copy_out`` to keep
+    them.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu'
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+        cull_threshold: Infected fraction below which to stop early (None to disable)
+        output_interval: Time between stored rows (every step if None)
+        output_times: Times at which to store rows; overrides output_interval
+        backend: Compute backend name (the global default if None)
+        workspace: Buffers to reuse instead of allocating new arrays
+
+    Returns:
+        Dictionary with 'time' of shape (time,) and one array of shape
+        (members, time) per compartment and flow
+    """
+    spec = get_model_spec(model_type)
+    result = spec.compiled.simulate(
+        initial_infected,
+        parameters,
+        dt,
+        max_time,
+        use_exponential_form,
+        cull_threshold=cull_threshold,
+        output_interval=output_interval,
+        output_times=output_times,
+        backend=backend,
+        workspace=workspace,
+    )
+    return {
+        name: (values if name == "time" else values.T)
+        for name, values in result.items()
+    }
+
+
+def run_sir_ensemble(
+    initial_infected: ArrayLike,
+    beta: ArrayLike,
+    gamma: ArrayLike,
+    mu: ArrayLike = 0.0,
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Run many discrete SIR simulations at once.
+
+    Every argument except ``dt``, ``max_time`` and ``use_exponential_form``
+    may be a scalar or a 1-D array; see ``run_ensemble``.
+
+    Args:
+        initial_infected: Initial fraction of population infected (0-1)
+        beta: Transmission rate
+        gamma: Recovery rate
+        mu: Birth/death rate
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+
+    Returns:
+        Dictionary with 'time' of shape (time,) and 'S', 'I', 'R', 'newI',
+        'newR' of shape (members, time)
+    """
+    return run_ensemble(
+        "SIR",
+        initial_infected,
+        {"beta": beta, "gamma": gamma, "mu": mu},
+        dt,
+        max_time,
+        use_exponential_form,
+    )
+
+
+def run_seir_ensemble(
+    initial_infected: ArrayLike,
+    beta: ArrayLike,
+    sigma: ArrayLike,
+    gamma: ArrayLike,
+    mu: ArrayLike = 0.0,
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Run many discrete SEIR simulations at once.
+
+    Every argument except ``dt``, ``max_time`` and ``use_exponential_form``
+    may be a scalar or a 1-D array; see ``run_ensemble``.
+
+    Args:
+        initial_infected: Initial fraction of population infected (0-1)
+        beta: Transmission rate
+        sigma: Incubation rate
+        gamma: Recovery rate
+        mu: Birth/death rate
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+
+    Returns:
+        Dictionary with 'time' of shape (time,) and 'S', 'E', 'I', 'R',
+        'newE', 'newI', 'newR' of shape (members, time)
+    """
+    return run_ensemble(
+        "SEIR",
+        initial_infected,
+        {"beta": beta, "sigma": sigma, "gamma": gamma, "mu": mu},
+        dt,
+        max_time,
+        use_exponential_form,
+    )
@@ -0,0 +1,453 @@
+"""Exact and tau-leaping continuous-time stochastic simulation."""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Dict, List, Mapping, Sequence, Tuple, Union
+from .spec import ArrayLike, CompiledModel, ModelSpec, get_model_spec
+from .rng import RandomStreams, SeedLike
+
+SSA_METHODS = ("direct", "tau_leap")
+
+
+class StochasticTrajectories:
+    """
+    Event-driven trajectories of many replicates in padded arrays.
+
+    Replicate ``r`` has ``length[r]`` recorded rows; row 0 is the initial
+    state at ``t = 0`` and every later row follows one event (direct method)
+    or one leap (tau-leaping). Rows past ``length[r]`` are padding: times are
+    ``inf``, states repeat the last recorded state and flow counts are zero,
+    so the arrays can be used without masking.
+
+    Args:
+        time: Array of shape (replicates, rows)
+        state: Integer array of shape (replicates, rows, compartments)
+        flows: Integer array of shape (replicates, rows, flows) with the
+            number of transfers since the previous row
+        length: Number of recorded rows per replicate
+        compartments: Compartment names
+        flow_names: Flow names
+        infected: Compartments that carry the infection
+        max_time: End of the simulated interval
+    """
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        state: np.ndarray,
+        flows: np.ndarray,
+        length: np.ndarray,
+        compartments: Sequence[str],
+        flow_names: Sequence[str],
+        infected: Sequence[str],
+        max_time: float,
+    ):
+        self.time = time
+        self.state = state
+        self.flows = flows
+        self.length = length
+        self.compartments = tuple(compartments)
+        self.flow_names = tuple(flow_names)
+        self.infected = tuple(infected)
+        self.max_time = max_time
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+    def trajectory(self, replicate: int) -> Dict[str, np.ndarray]:
+        """
+        Return the unpadded trajectory of one replicate.
+
+        Args:
+            replicate: Replicate index
+
+        Returns:
+            Dictionary with 'time' and one array per compartment and flow
+        """
+        n = self.length[replicate]
+        result = {"time": self.time[replicate, :n]}
+        for i, name in enumerate(self.compartments):
+            result[name] = self.state[replicate, :n, i]
+        for k, name in enumerate(self.flow_names):
+            result[name] = self.flows[replicate, :n, k]
+        return result
+
+    @property
+    def final_state(self) -> np.ndarray:
+        """State at ``max_time``, shape (replicates, compartments)."""
+        return self.state[:, -1]
+
+    @property
+    def extinct(self) -> np.ndarray:
+        """Whether each replicate has no infected individuals left at ``max_time``."""
+        columns = [self.compartments.index(name) for name in self.infected]
+        return self.final_state[:, columns].sum(axis=1) == 0
+
+    def on_grid(self, times: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Sample the trajectories on a common time grid.
+
+        States are those in force at each time. Flow columns count transfers
+        since the previous grid time, with zeros in the first row, matching
+        the other engines.
+
+        Args:
+            times: Increasing times within [0, max_time]
+
+        Returns:
+            Dictionary with 'time' of shape (time,) and one integer array of
+            shape (replicates, time) per compartment and flow
+        """
+        times = np.asarray(times, dtype=float)
+        rows = np.empty((len(self), len(times)), dtype=int)
+        for r in range(len(self)):
+            rows[r] = (
+                np.searchsorted(self.time[r, : self.length[r]], times, side="right") - 1
+            )
+
+        state = np.take_along_axis(self.state, rows[:, :, None], axis=1)
+        cumulative = np.take_along_axis(
+            np.cumsum(self.flows, axis=1), rows[:, :, None], axis=1
+        )
+        flows = np.zeros_like(cumulative)
+        flows[:, 1:] = np.diff(cumulative, axis=1)
+
+        result = {"time": times}
+        for i, name in enumerate(self.compartments):
+            result[name] = state[:, :, i]
+        for k, name in enumerate(self.flow_names):
+            result[name] = flows[:, :, k]
+        return result
+
+    @classmethod
+    def concatenate(
+        cls, parts: List["StochasticTrajectories"]
+    ) -> "StochasticTrajectories":
+        """Join blocks of replicates, padding them to a common number of rows."""
+        n_rows = max(part.time.shape[1] for part in parts)
+        padded = [part._pad(n_rows) for part in parts]
+        first = parts[0]
+        return cls(
+            np.concatenate([p[0] for p in padded]),
+            np.concatenate([p[1] for p in padded]),
+            np.concatenate([p[2] for p in padded]),
+            np.concatenate([part.length for part in parts]),
+            first.compartments,
+            first.flow_names,
+            first.infected,
+            first.max_time,
+        )
+
+    def _pad(self, n_rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        extra = n_rows - self.time.shape[1]
+        if extra == 0:
+            return self.time, self.state, self.flows
+        time = np.pad(self.time, ((0, 0), (0, extra)), constant_values=np.inf)
+        state = np.pad(self.state, ((0, 0), (0, extra), (0, 0)), mode="edge")
+        flows = np.pad(self.flows, ((0, 0), (0, extra), (0, 0)))
+        return time, state, flows
+
+
+class _EventModel:
+    """Propensities and state changes of the events of a compiled model."""
+
+    def __init__(
+        self,
+        model: CompiledModel,
+        params: Dict[str, np.ndarray],
+        population: np.ndarray,
+    ):
+        self.model = model
+        self.params = params
+        self.population = population
+        self.vital = bool(np.any(params["mu"]))
+
+        # A death paired with a birth moves one individual to the birth compartment
+        self.death_sources = [
+            i for i in range(model.n_compartments) if i != model.birth_index
+        ]
+        changes = [model.stoichiometry[k] for k in range(model.n_flows)]
+        if self.vital:
+            for i in self.death_sources:
+                change = np.zeros(model.n_compartments)
+                change[i] -= 1
+                change[model.birth_index] += 1
+                changes.append(change)
+        self.change = np.array(changes, dtype=np.int64).T
+        self.n_events = self.change.shape[1]
+
+    def propensities(
+        self, state: np.ndarray, idx: np.ndarray, t: np.ndarray
+    ) -> np.ndarray:
+        """Event rates of shape (events, len(idx)) for the replicates ``idx``."""
+        params = {name: values[idx] for name, values in self.params.items()}
+        rates = self.model.flow_rates(state / self.population[idx], params, t)
+        propensities = rates * state[self.model.sources]
+        if self.vital:
+            deaths = params["mu"] * state[self.death_sources]
+            propensities = np.concatenate([propensities, deaths])
+        return np.maximum(propensities, 0.0)
+
+
+class _Recorder:
+    """Growing padded storage for event-driven trajectories."""
+
+    def __init__(self, initial: np.ndarray, n_flows: int):
+        n_compartments, n_replicates = initial.shape
+        capacity = 64
+        self.time = np.full((n_replicates, capacity), np.inf)
+        self.state = np.zeros((n_replicates, capacity, n_compartments), dtype=np.int64)
+        self.flows = np.zeros((n_replicates, capacity, n_flows), dtype=np.int64)
+        self.time[:, 0] = 0.0
+        self.state[:, 0] = initial.T
+        self.length = np.ones(n_replicates, dtype=int)
+
+    def record(
+        self, idx: np.ndarray, t: np.ndarray, state: np.ndarray, flows: np.ndarray
+    ) -> None:
+        rows = self.length[idx]
+        if rows.max() >= self.time.shape[1]:
+            extra = self.time.shape[1]
+            self.time = np.pad(self.time, ((0, 0), (0, extra)), constant_values=np.inf)
+            self.state = np.pad(self.state, ((0, 0), (0, extra), (0, 0)))
+            self.flows = np.pad(self.flows, ((0, 0), (0, extra), (0, 0)))
+        self.time[idx, rows] = t
+        self.state[idx, rows] = state.T
+        self.flows[idx, rows] = flows.T
+        self.length[idx] += 1
+
+    def finish(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        n_rows = int(self.length.max())
+        last = np.minimum(np.arange(n_rows), self.length[:, None] - 1)
+        state = np.take_along_axis(self.state[:, :n_rows], last[:, :, None], axis=1)
+        return self.time[:, :n_rows], state, self.flows[:, :n_rows], self.length
+
+
+def _direct_step(
+    events: _EventModel,
+    state: np.ndarray,
+    t: np.ndarray,
+    idx: np.ndarray,
+    propensities: np.ndarray,
+    rng: np.random.Generator,
+    max_time: float,
+    active: np.ndarray,
+    recorder: _Recorder,
+) -> None:
+    """Fire one exactly timed event in each replicate of ``idx``."""
+    total = propensities.sum(axis=0)
+    waiting = rng.exponential(size=len(idx)) / np.where(total > 0, total, 1.0)
+    t_new = t[idx] + waiting
+    fire = (total > 0) & (t_new <= max_time)
+    active[idx[~fire]] = False
+    if not fire.any():
+        return
+
+    idx, t_new, propensities, total = (
+        idx[fire],
+        t_new[fire],
+        propensities[:, fire],
+        total[fire],
+    )
+    threshold = rng.random(len(idx)) * total
+    event = np.minimum(
+        (np.cumsum(propensities, axis=0) < threshold).sum(axis=0), events.n_events - 1
+    )
+    state[:, idx] += events.change[:, event]
+    t[idx] = t_new
+
+    n_flows = events.model.n_flows
+    flows = np.zeros((n_flows, len(idx)), dtype=np.int64)
+    is_flow = event < n_flows
+    flows[event[is_flow], np.flatnonzero(is_flow)] = 1
+    recorder.record(idx, t_new, state[:, idx], flows)
+
+
+def _simulate_block(
+    spec: ModelSpec,
+    method: str,
+    initial_infected: np.ndarray,
+    params: Dict[str, np.ndarray],
+    population: np.ndarray,
+    max_time: float,
+    epsilon: float,
+    seed: np.random.SeedSequence,
+) -> StochasticTrajectories:
+    """Run one block of replicates in lockstep."""
+    model = spec.compiled
+    rng = np.random.Generator(np.random.PCG64(seed))
+    events = _EventModel(model, params, population)
+
+    n_replicates = len(population)
+    infected = np.round(initial_infected * population).astype(np.int64)
+    state = np.zeros((model.n_compartments, n_replicates), dtype=np.int64)
+    state[model.birth_index] = population - infected
+    state[model.seed_index] += infected
+
+    t = np.zeros(n_replicates)
+    active = np.ones(n_replicates, dtype=bool)
+    recorder = _Recorder(state, model.n_flows)
+    squared_change = events.change**2
+
+    while active.any():
+        idx = np.flatnonzero(active)
+        propensities = events.propensities(state[:, idx], idx, t[idx])
+        if method == "direct":
+            _direct_step(
+                events, state, t, idx, propensities, rng, max_time, active, recorder
+            )
+            continue
+
+        # Leap size bounds the expected relative change of every compartment
+        total = propensities.sum(axis=0)
+        drift = np.abs(events.change @ propensities)
+        variance = squared_change @ propensities
+        bound = np.maximum(epsilon * state[:, idx] / 2.0, 1.0)
+        with np.errstate(divide="ignore"):
+            tau = np.minimum(
+                np.where(drift > 0, bound / drift, np.inf).min(axis=0),
+                np.where(variance > 0, bound**2 / variance, np.inf).min(axis=0),
+            )
+        tau = np.minimum(tau, max_time - t[idx])
+
+        # Small leaps are no cheaper than exact steps, so take those exactly
+        exact = (total <= 0) | (tau * total < 10.0)
+        if exact.any():
+            _direct_step(
+                events,
+                state,
+                t,
+                idx[exact],
+                propensities[:, exact],
+                rng,
+                max_time,
+                active,
+                recorder,
+            )
+        leap = ~exact
+        if not leap.any():
+            continue
+
+        idx, tau, propensities = idx[leap], tau[leap], propensities[:, leap]
+        counts = rng.poisson(propensities * tau)
+        new_state = state[:, idx] + events.change @ counts
+        negative = (new_state < 0).any(axis=0)
+        while negative.any():
+            # Halve the leap wherever a compartment would go negative
+            tau[negative] /= 2.0
+            counts[:, negative] = rng.poisson(propensities[:, negative] * tau[negative])
+            new_state[:, negative] = (
+                state[:, idx[negative]] + events.change @ counts[:, negative]
+            )
+            negative = (new_state < 0).any(axis=0)
+
+        state[:, idx] = new_state
+        t[idx] += tau
+        recorder.record(idx, t[idx], new_state, counts[: model.n_flows])
+        active[idx[t[idx] >= max_time]] = False
+
+    infected_compartments = [model.compartments[model.seed_index]] + [
+        flow.source
+        for flow in spec.flows
+        if flow.target == model.compartments[model.seed_index]
+        and flow.source != model.compartments[model.birth_index]
+    ]
+    return StochasticTrajectories(
+        *recorder.finish(),
+        model.compartments,
+        model.flow_names,
+        infected_compartments,
+        max_time,
+    )
+
+
+def run_gillespie(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    population: ArrayLike,
+    n_replicates: int = 100,
+    max_time: float = 100.0,
+    method: str = "direct",
+    epsilon: float = 0.03,
+    seed: SeedLike = None,
+    n_workers: int = 1,
+    block_size: int = 256,
+) -> StochasticTrajectories:
+    """
+    Simulate continuous-time stochastic trajectories of a registered model.
+
+    Every flow of the model is an event whose propensity is its per-capita
+    rate (evaluated on fractions ``X / N``) times the size of its source
+    compartment; with ``mu`` set, each death is an event that moves one
+    individual to the birth compartment. ``method='direct'`` is Gillespie's
+    exact direct method. ``method='tau_leap'`` fires Poisson numbers of
+    events over leaps chosen so that no compartment is expected to change by
+    more than a fraction ``epsilon``; it falls back to exact steps when
+    leaps become too small to pay off, so extinction is still resolved.
+
+    Replicates are simulated in lockstep blocks, each with its own
+    ``RandomStreams`` stream. With ``n_workers > 1`` the blocks are spread
+    over a process pool; results are identical for any number of workers.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu'
+        population: Population size N
+        n_replicates: Number of replicates
+        max_time: End of the simulated interval
+        method: 'direct' for exact simulation or 'tau_leap'
+        epsilon: Error control for tau-leaping
+        seed: Seed for the random draws
+        n_workers: Number of worker processes
+        block_size: Replicates per block and random stream
+
+    Returns:
+        StochasticTrajectories with one padded trajectory per replicate
+    """
+    if method not in SSA_METHODS:
+        raise ValueError(
+            f"Unknown method '{method}'. Available methods: {', '.join(SSA_METHODS)}"
+        )
+    spec = get_model_spec(model_type)
+    params = spec.compiled.resolve_parameters(
+        {"initial_infected": initial_infected, "population": population, **parameters}
+    )
+    params = {
+        name: np.broadcast_to(values, (n_replicates,)) if len(values) == 1 else values
+        for name, values in params.items()
+    }
+    if any(len(values) != n_replicates for values in params.values()):
+        raise ValueError(
+            f"Parameters must be scalars or arrays of length {n_replicates}."
+        )
+    initial_infected = params.pop("initial_infected")
+    population = np.round(params.pop("population")).astype(np.int64)
+
+    streams = RandomStreams(seed, block_size)
+    jobs = []
+    for block in range(streams.n_blocks(n_replicates)):
+        replicates = streams.block_slice(block, n_replicates)
+        jobs.append(
+            (
+                spec,
+                method,
+                initial_infected[replicates],
+                {name: values[replicates] for name, values in params.items()},
+                population[replicates],
+                max_time,
+                epsilon,
+                streams.seed_for(block),
+            )
+        )
+
+    if n_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunksize = -(-len(jobs) // n_workers)
+            parts = list(
+                executor.map(_simulate_block, *zip(*jobs), chunksize=chunksize)
+            )
+    else:
+        parts = [_simulate_block(*job) for job in jobs]
+    return StochasticTrajectories.concatenate(parts)
@@ -0,0 +1,112 @@
+"""Stepping loop shared by models whose rates see mixed compartments."""
+
+import numpy as np
+from typing import Callable, Mapping
+from .spec import CompiledModel
+
+
+def simulate_mixed(
+    model: CompiledModel,
+    state: np.ndarray,
+    params: Mapping[str, np.ndarray],
+    mix: Callable[[np.ndarray], np.ndarray],
+    dt: float,
+    output_steps: np.ndarray,
+    use_exponential_form: bool = False,
+) -> np.ndarray:
+    """
+    Step a model whose state-dependent rates are evaluated on mixed compartments.
+
+    Every compartment named in a state-dependent rate expression is replaced
+    by ``mix`` of itself before the rates are evaluated; everything else
+    follows the model's flows, stoichiometry and vital dynamics exactly as
+    the well-mixed kernels do. ``state`` may have any trailing shape, such
+    as (patches,) or (age groups, members), and ``mix`` maps an array of
+    that shape to another one.
+
+    Args:
+        model: Compiled model
+        state: Initial fractions of shape (compartments, ...)
+        params: Resolved parameters broadcastable to the trailing shape
+        mix: Function applied to each mixed compartment before rates are
+            evaluated
+        dt: Time step
+        output_steps: Sorted step indices to store
+        use_exponential_form: Whether to use exponential form for transitions
+
+    Returns:
+        Array of shape (len(output_steps), columns, ...); flow columns hold
+        the amount moved since the previous stored row
+    """
+    dependent = [k for k in range(model.n_flows) if model._state_dependent[k]]
+    constant = [k for k in range(model.n_flows) if not model._state_dependent[k]]
+    mixed = sorted(
+        {
+            model.compartments.index(name)
+            for k in dependent
+            for name in model._codes[k].co_names
+            if name in model.compartments
+        }
+    )
+
+    def fraction(rates: np.ndarray) -> np.ndarray:
+        if use_exponential_form:
+            return 1.0 - np.exp(-rates * dt)
+        return rates * dt
+
+    constant_fraction = fraction(model.flow_rates(state, params, 0.0, constant))
+    vital = bool(np.any(params["mu"]))
+    death_fraction = fraction(params["mu"])
+    stoichiometry = model.stoichiometry.T
+    sources = model.sources
+
+    output = np.empty((len(output_steps), len(model.columns)) + state.shape[1:])
+    n_out = 0
+    if output_steps[0] == 0:
+        output[0, : model.n_compartments] = state
+        output[0, model.n_compartments :] = 0.0
+        n_out = 1
+
+    # Work on preallocated (rows, cells) buffers: at large sizes fresh
+    # temporaries cost more than the arithmetic
+    shape = state.shape[1:]
+    state = state.reshape(model.n_compartments, -1).copy()
+    pending = np.zeros((model.n_flows, state.shape[1]))
+    flows = np.empty_like(pending)
+    change = np.empty_like(state)
+    deaths = np.empty_like(state)
+    death_fraction = np.broadcast_to(death_fraction, shape).reshape(-1)
+    constant_fraction = np.broadcast_to(
+        constant_fraction, (len(constant),) + shape
+    ).reshape(len(constant), -1)
+
+    # Compartments outside ``mixed`` never enter a state-dependent rate, so
+    # only the mixed rows of ``rate_state`` are refreshed each step
+    rate_state = state.reshape((model.n_compartments,) + shape).copy()
+    for step in range(1, output_steps[-1] + 1):
+        for i in mixed:
+            rate_state[i] = mix(state[i].reshape(shape))
+        rates = fraction(
+            model.flow_rates(rate_state, params, (step - 1) * dt, dependent)
+        )
+        for j, k in enumerate(dependent):
+            np.multiply(state[sources[k]], rates[j].reshape(-1), out=flows[k])
+        for j, k in enumerate(constant):
+            np.multiply(state[sources[k]], constant_fraction[j], out=flows[k])
+
+        np.matmul(stoichiometry, flows, out=change)
+        if vital:
+            np.multiply(death_fraction, state, out=deaths)
+        state += change
+        if vital:
+            state -= deaths
+            state[model.birth_index] += deaths.sum(axis=0)
+        pending += flows
+
+        if step == output_steps[n_out]:
+            output[n_out, : model.n_compartments] = state.reshape((-1,) + shape)
+            output[n_out, model.n_compartments :] = pending.reshape((-1,) + shape)
+            pending[:] = 0.0
+            n_out += 1
+
+    return output
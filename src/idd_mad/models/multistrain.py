@@ -0,0 +1,198 @@
+"""Multi-strain versions of the compartmental models with cross-immunity."""
+
+import numpy as np
+from typing import Dict, Mapping, Optional
+from .spec import ArrayLike, get_model_spec, resolve_output_steps
+
+MULTI_STRAIN_MODELS = ("SIR", "SEIR", "SIRS", "SEIRS")
+
+
+def _strain_member_array(value: ArrayLike, n_strains: int, name: str) -> np.ndarray:
+    """Reshape a scalar, per-strain or (strains, members) value to two dimensions."""
+    array = np.asarray(value, dtype=float)
+    if array.ndim == 0:
+        return array.reshape(1, 1)
+    if array.ndim == 1 and len(array) == n_strains:
+        return array[:, None]
+    if array.ndim == 2 and array.shape[0] in (1, n_strains):
+        return array
+    raise ValueError(
+        f"'{name}' must be a scalar, a per-strain array of length {n_strains} "
+        f"or a (strains, members) array."
+    )
+
+
+def run_multistrain(
+    model_type: str,
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    cross_immunity: np.ndarray,
+    dt: float = 0.1,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+    output_interval: Optional[float] = None,
+    output_times: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Run co-circulating strains of an SIR-type model with cross-immunity.
+
+    Uses the status-based formulation of Gog and Grenfell (2002): ``S[k]``
+    is the fraction susceptible to strain ``k`` and ``R[k]`` the fraction
+    immune to it. Infection with strain ``j`` happens at rate
+    ``lambda[j] = beta[j] * I[j]`` and makes a fraction
+    ``cross_immunity[k, j]`` of those still susceptible to ``k`` immune to
+    it, so
+
+        dS[k]/dt = -S[k] * sum_j cross_immunity[k, j] * lambda[j] + ...
+
+    with ``cross_immunity[k, k] = 1`` sending infections with ``k`` itself
+    on to ``E[k]`` or ``I[k]``. Waning (``omega``) returns immune people to
+    susceptible, and births (``mu``) are susceptible to every strain.
+    With an identity matrix the strains are independent copies of the
+    single-strain model.
+
+    Strains and ensemble members are array axes, so a step is a handful of
+    array operations and one (strains x strains) @ (strains x members)
+    product whatever the number of strains. Parameters and
+    ``initial_infected`` may be scalars, per-strain arrays of shape
+    (strains,), or arrays of shape (strains, members) or (1, members).
+
+    Args:
+        model_type: 'SIR', 'SEIR', 'SIRS' or 'SEIRS'
+        initial_infected: Initial fraction infected with each strain
+        parameters: Dict with the model parameters and optionally 'mu'
+        cross_immunity: (strains, strains) matrix of protection against the
+            row strain given by infection with the column strain, in [0, 1]
+            with a unit diagonal
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+        output_interval: Time between stored rows (every step if None)
+        output_times: Times at which to store rows; overrides output_interval
+
+    Returns:
+        Dictionary with 'time' of shape (time,) and one array of shape
+        (members, strains, time) per compartment and flow; flows hold the
+        amount moved since the previous stored row
+    """
+    if model_type not in MULTI_STRAIN_MODELS:
+        raise ValueError(
+            f"Unknown multi-strain model '{model_type}'. "
+            f"Available models: {', '.join(MULTI_STRAIN_MODELS)}"
+        )
+    spec = get_model_spec(model_type)
+    model = spec.compiled
+    latent = "E" in model.compartments
+    waning = "omega" in spec.defaults
+
+    cross_immunity = np.asarray(cross_immunity, dtype=float)
+    if cross_immunity.ndim != 2 or cross_immunity.shape[0] != cross_immunity.shape[1]:
+        raise ValueError("Cross-immunity matrix must be square.")
+    if np.any((cross_immunity < 0) | (cross_immunity > 1)) or np.any(
+        np.diag(cross_immunity) != 1
+    ):
+        raise ValueError("Cross-immunity must lie in [0, 1] with ones on the diagonal.")
+    n_strains = len(cross_immunity)
+
+    missing = [name for name in spec.parameters if name not in parameters]
+    if missing:
+        raise ValueError(f"Missing parameters for model '{spec.name}': {missing}")
+    values = {
+        "mu": 0.0,
+        **spec.defaults,
+        **parameters,
+        "initial_infected": initial_infected,
+    }
+    arrays = {
+        name: _strain_member_array(value, n_strains, name)
+        for name, value in values.items()
+    }
+    try:
+        shape = np.broadcast_shapes(
+            (n_strains, 1), *(array.shape for array in arrays.values())
+        )
+    except ValueError:
+        raise ValueError("Per-member values must all have the same number of members.")
+    params = {name: np.broadcast_to(array, shape) for name, array in arrays.items()}
+
+    def fraction(rates: np.ndarray) -> np.ndarray:
+        if use_exponential_form:
+            return -np.expm1(-rates * dt)
+        return rates * dt
+
+    beta = params["beta"]
+    recover = fraction(params["gamma"])
+    progress = fraction(params["sigma"]) if latent else None
+    wane = fraction(params["omega"]) if waning else None
+    death = fraction(params["mu"])
+    vital = bool(np.any(params["mu"]))
+
+    # People seeded with strain j already count as protected against k
+    susceptible = np.clip(1.0 - cross_immunity @ params["initial_infected"], 0.0, None)
+    exposed = np.zeros(shape)
+    infectious = params["initial_infected"].copy()
+
+    n_steps = int(max_time / dt)
+    output_steps = resolve_output_steps(dt, n_steps, output_interval, output_times)
+    if output_steps is None:
+        output_steps = np.arange(n_steps)
+
+    output = {
+        column: np.empty((len(output_steps),) + shape) for column in model.columns
+    }
+    pending = {name: np.zeros(shape) for name in model.flow_names}
+
+    def store(row: int) -> None:
+        output["S"][row] = susceptible
+        output["I"][row] = infectious
+        output["R"][row] = 1.0 - susceptible - exposed - infectious
+        if latent:
+            output["E"][row] = exposed
+        for name, values in pending.items():
+            output[name][row] = values
+            values[:] = 0.0
+
+    n_out = 0
+    if output_steps[0] == 0:
+        store(0)
+        n_out = 1
+
+    infection = "newE" if latent else "newI"
+    for step in range(1, output_steps[-1] + 1):
+        force = beta * infectious
+        pressure = cross_immunity @ force
+        leaving = susceptible * fraction(pressure)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            infected = np.where(pressure > 0, leaving * force / pressure, 0.0)
+        recovered = infectious * recover
+
+        new_susceptible = susceptible - leaving
+        new_infectious = infectious - recovered
+        if latent:
+            progressed = exposed * progress
+            new_exposed = exposed + infected - progressed
+            new_infectious += progressed
+            pending["newI"] += progressed
+        else:
+            new_exposed = exposed
+            new_infectious += infected
+        if waning:
+            returned = (1.0 - susceptible - exposed - infectious) * wane
+            new_susceptible += returned
+            pending["newS"] += returned
+        if vital:
+            new_susceptible += death * (1.0 - susceptible)
+            new_exposed = new_exposed - death * exposed
+            new_infectious -= death * infectious
+        pending[infection] += infected
+        pending["newR"] += recovered
+        susceptible, exposed, infectious = new_susceptible, new_exposed, new_infectious
+
+        if step == output_steps[n_out]:
+            store(n_out)
+            n_out += 1
+
+    result = {"time": output_steps * dt}
+    for column in model.columns:
+        result[column] = np.moveaxis(output[column], 0, -1).transpose(1, 0, 2)
+    return result
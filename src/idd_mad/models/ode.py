@@ -0,0 +1,229 @@
+"""Adaptive-step Runge-Kutta integration of the compartmental models."""
+
+import numpy as np
+from typing import Callable, Dict, Mapping, Tuple, Union
+from .spec import ArrayLike, ModelSpec, get_model_spec
+
+# Dormand-Prince 5(4) coefficients
+_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+_A = [
+    np.array([]),
+    np.array([1 / 5]),
+    np.array([3 / 40, 9 / 40]),
+    np.array([44 / 45, -56 / 15, 32 / 9]),
+    np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+    np.array([9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]),
+]
+_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+_E = np.array(
+    [-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40]
+)
+
+# Coefficients of the fourth-order dense output polynomial
+_P = np.array(
+    [
+        [
+            1,
+            -8048581381 / 2820520608,
+            8663915743 / 2820520608,
+            -12715105075 / 11282082432,
+        ],
+        [0, 0, 0, 0],
+        [
+            0,
+            131558114200 / 32700410799,
+            -68118460800 / 10900136933,
+            87487479700 / 32700410799,
+        ],
+        [
+            0,
+            -1754552775 / 470086768,
+            14199869525 / 1410260304,
+            -10690763975 / 1880347072,
+        ],
+        [
+            0,
+            127303824393 / 49829197408,
+            -318862633887 / 49829197408,
+            701980252875 / 199316789632,
+        ],
+        [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+        [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+    ]
+)
+
+_SAFETY = 0.9
+_MIN_FACTOR = 0.2
+_MAX_FACTOR = 10.0
+
+
+def _rms(values: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(values**2)))
+
+
+def _initial_step(
+    fun: Callable[[float, np.ndarray], np.ndarray],
+    t0: float,
+    y0: np.ndarray,
+    f0: np.ndarray,
+    rtol: float,
+    atol: float,
+) -> float:
+    """Estimate a first step size from the scale of the solution and its derivatives."""
+    scale = atol + rtol * np.abs(y0)
+    d0 = _rms(y0 / scale)
+    d1 = _rms(f0 / scale)
+    h0 = 0.01 * d0 / d1 if d0 > 1e-5 and d1 > 1e-5 else 1e-6
+
+    f1 = fun(t0 + h0, y0 + h0 * f0)
+    d2 = _rms((f1 - f0) / scale) / h0
+    if max(d1, d2) <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / 5)
+    return min(100 * h0, h1)
+
+
+def dormand_prince(
+    fun: Callable[[float, np.ndarray], np.ndarray],
+    y0: np.ndarray,
+    t_eval: np.ndarray,
+    rtol: float = 1e-6,
+    atol: float = 1e-9,
+    max_step: float = np.inf,
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Integrate an ODE with the Dormand-Prince 5(4) method.
+
+    The step size is chosen by local error control and the solution is
+    evaluated at ``t_eval`` through the method's dense output, so the number
+    of steps does not depend on how many output times are requested.
+
+    Args:
+        fun: Right-hand side ``fun(t, y)`` returning an array shaped like ``y``
+        y0: Initial state at ``t_eval[0]``, of any shape
+        t_eval: Increasing output times
+        rtol: Relative tolerance
+        atol: Absolute tolerance
+        max_step: Largest allowed step size
+
+    Returns:
+        Tuple of (solution of shape (len(t_eval),) + y0.shape, solver statistics)
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    if t_eval.ndim != 1 or len(t_eval) == 0:
+        raise ValueError("t_eval must be a non-empty 1-D array.")
+    if np.any(np.diff(t_eval) < 0):
+        raise ValueError("t_eval must be increasing.")
+
+    y = np.asarray(y0, dtype=float).copy()
+    output = np.empty((len(t_eval),) + y.shape)
+    t = t_eval[0]
+    t_end = t_eval[-1]
+    next_output = int(np.searchsorted(t_eval, t, side="right"))
+    output[:next_output] = y
+
+    f = fun(t, y)
+    stats = {"n_steps": 0, "n_rejected": 0, "n_evaluations": 1}
+    if t_end == t:
+        return output, stats
+
+    h = min(_initial_step(fun, t, y, f, rtol, atol), max_step)
+    stats["n_evaluations"] += 1
+    K = np.empty((7,) + y.shape)
+
+    while t < t_end:
+        h = min(h, max_step, t_end - t)
+        K[0] = f
+        for s in range(1, 6):
+            dy = np.tensordot(_A[s], K[:s], axes=1)
+            K[s] = fun(t + _C[s] * h, y + h * dy)
+        y_new = y + h * np.tensordot(_B, K[:6], axes=1)
+        f_new = fun(t + h, y_new)
+        K[6] = f_new
+        stats["n_evaluations"] += 6
+
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error = _rms(h * np.tensordot(_E, K, axes=1) / scale)
+
+        if error > 1:
+            h *= max(_MIN_FACTOR, _SAFETY * error**-0.2)
+            stats["n_rejected"] += 1
+            continue
+
+        # Evaluate the dense output at every requested time inside the step
+        t_new = t + h if t_end - (t + h) > 1e-12 * abs(t_end) else t_end
+        stop = int(np.searchsorted(t_eval, t_new, side="right"))
+        if stop > next_output:
+            x = (t_eval[next_output:stop] - t) / h
+            powers = np.cumprod(np.repeat(x[:, None], 4, axis=1), axis=1)
+            Q = np.tensordot(_P, K, axes=(0, 0))
+            output[next_output:stop] = y + h * np.tensordot(powers, Q, axes=1)
+            next_output = stop
+
+        t, y, f = t_new, y_new, f_new
+        stats["n_steps"] += 1
+        factor = (
+            _MAX_FACTOR if error == 0 else min(_MAX_FACTOR, _SAFETY * error**-0.2)
+        )
+        h *= max(_MIN_FACTOR, factor)
+
+    return output, stats
+
+
+def simulate_ode(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    output_times: np.ndarray,
+    rtol: float = 1e-6,
+    atol: float = 1e-9,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+    """
+    Solve the continuous-time version of a registered model.
+
+    Cumulative flows are integrated alongside the compartments, so each flow
+    column holds the amount moved since the previous output time. On a grid
+    with spacing ``dt`` this matches the per-step flows of ``run_model``.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction infected, scalar or 1-D array
+        parameters: Parameter values, each a scalar or 1-D array
+        output_times: Increasing times at which to report the solution
+        rtol: Relative tolerance
+        atol: Absolute tolerance
+
+    Returns:
+        Tuple of (dictionary with 'time' of shape (time,) and one array of
+        shape (time, members) per output column, solver statistics)
+    """
+    model = get_model_spec(model_type).compiled
+    params = model.resolve_parameters(
+        {"initial_infected": initial_infected, **parameters}
+    )
+    initial_infected = params.pop("initial_infected")
+    n_compartments = model.n_compartments
+
+    def rhs(t: float, y: np.ndarray) -> np.ndarray:
+        d_state, flows = model.derivative(y[:n_compartments], params, t)
+        return np.concatenate([d_state, flows])
+
+    y0 = np.concatenate(
+        [
+            model.initial_state(initial_infected),
+            np.zeros((model.n_flows, len(initial_infected))),
+        ]
+    )
+    output_times = np.asarray(output_times, dtype=float)
+    solution, stats = dormand_prince(rhs, y0, output_times, rtol=rtol, atol=atol)
+
+    # Convert cumulative flows into amounts per output interval
+    flows = solution[:, n_compartments:]
+    flows[1:] = np.diff(flows, axis=0)
+    flows[0] = 0.0
+
+    result = {"time": output_times}
+    for i, column in enumerate(model.columns):
+        result[column] = solution[:, i]
+    return result, stats
@@ -0,0 +1,198 @@
+"""Compact containers for simulation output."""
+
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import xarray
+
+
+class SimulationResult:
+    """
+    Trajectories of one simulation stored in a single contiguous array.
+
+    Row ``k`` of ``data`` holds output column ``columns[k]`` over time, with
+    'time' first, so ``result['I']`` is a contiguous view without copying.
+    Rows past ``cull_index`` are kept in ``data`` but hidden from every view.
+    Column access, ``len`` and ``columns`` follow the DataFrame interface,
+    so plotting code can use either type; ``to_pandas`` and ``to_xarray``
+    build the other representations only when asked for.
+
+    Args:
+        data: Array of shape (columns, time)
+        columns: Output column names, starting with 'time'
+        model_type: Name of the model that produced the data
+        parameters: Parameter values used for the run
+        dt: Time step of the simulation
+        cull_index: Number of time points kept after culling (all if None)
+        solver_stats: Statistics from an adaptive solver, if one was used
+    """
+
+    __slots__ = (
+        "data",
+        "columns",
+        "model_type",
+        "parameters",
+        "dt",
+        "cull_index",
+        "solver_stats",
+        "_index",
+    )
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        columns: Sequence[str],
+        model_type: str,
+        parameters: Mapping[str, float],
+        dt: float,
+        cull_index: Optional[int] = None,
+        solver_stats: Optional[Dict[str, int]] = None,
+    ):
+        if data.ndim != 2 or data.shape[0] != len(columns):
+            raise ValueError("data must have one row per column.")
+        self.data = data
+        self.columns = tuple(columns)
+        self.model_type = model_type
+        self.parameters = dict(parameters)
+        self.dt = dt
+        self.cull_index = data.shape[1] if cull_index is None else cull_index
+        self.solver_stats = solver_stats
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    @classmethod
+    def from_columns(
+        cls,
+        time: np.ndarray,
+        values: Mapping[str, np.ndarray],
+        columns: Sequence[str],
+        **metadata,
+    ) -> "SimulationResult":
+        """
+        Copy time and per-column arrays into a new result.
+
+        Args:
+            time: Array of shape (time,)
+            values: Arrays of shape (time,) keyed by column name
+            columns: Columns to copy, in output order
+            **metadata: Remaining SimulationResult arguments
+
+        Returns:
+            SimulationResult that owns its data
+        """
+        data = np.empty((len(columns) + 1, len(time)))
+        data[0] = time
+        for i, column in enumerate(columns):
+            data[i + 1] = values[column]
+        return cls(data, ("time",) + tuple(columns), **metadata)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        try:
+            return self.data[self._index[column], : self.cull_index]
+        except KeyError:
+            raise KeyError(f"Column '{column}' not found in {self.model_type} result.")
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return self.cull_index
+
+    def __repr__(self) -> str:
+        return (
+            f"SimulationResult(model_type={self.model_type!r}, "
+            f"columns={self.columns}, n_times={len(self)})"
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Shape of the equivalent DataFrame, (time, columns)."""
+        return (len(self), len(self.columns))
+
+    def to_pandas(self, copy: bool = True) -> pd.DataFrame:
+        """
+        Return the result as a DataFrame with one column per output.
+
+        Args:
+            copy: Whether the DataFrame owns a writable copy of the data. If
+                False it wraps a read-only view of ``data`` without copying,
+                so in-place writes raise instead of changing the result.
+
+        Returns:
+            DataFrame with columns: time, compartments, and one column per flow
+        """
+        values = self.data[:, : self.cull_index].T
+        if not copy:
+            values.flags.writeable = False
+        frame = pd.DataFrame(values, columns=list(self.columns), copy=copy)
+        if self.solver_stats is not None:
+            frame.attrs["solver_stats"] = self.solver_stats
+        return frame
+
+    def to_xarray(self) -> "xarray.Dataset":
+        """
+        Return the result as an xarray Dataset indexed by time.
+
+        Returns:
+            ``xarray.Dataset`` with one variable per compartment and flow
+        """
+        import xarray as xr
+
+        time = self["time"]
+        dataset = xr.Dataset(
+            {
+                column: ("time", self[column])
+                for column in self.columns
+                if column != "time"
+            },
+            coords={"time": time},
+        )
+        dataset.attrs.update({"model_type": self.model_type, "dt": self.dt})
+        dataset.attrs.update(self.parameters)
+        return dataset
+
+
+@dataclass(frozen=True)
+class StreamChunk:
+    """
+    Block of consecutive time points yielded by a streaming simulation.
+
+    Args:
+        time: Times of the rows in this chunk, shape (n,)
+        data: Output rows of shape (n, columns, members)
+        columns: Output column names matching the second axis of ``data``
+        state: Compartment values after the last row, shape
+            (compartments, members); pass the chunk as ``resume`` to continue
+        next_row: Index of the first row of the next chunk
+    """
+
+    time: np.ndarray
+    data: np.ndarray
+    columns: Tuple[str, ...]
+    state: np.ndarray
+    next_row: int
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """Return one output column as a view of shape (n, members)."""
+        return self.data[:, self.columns.index(column)]
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Return the chunk in long format with 'time' and 'member' columns."""
+        n_rows, _, n_members = self.data.shape
+        frame = pd.DataFrame(
+            {
+                "time": np.repeat(self.time, n_members),
+                "member": np.tile(np.arange(n_members), n_rows),
+            }
+        )
+        for i, column in enumerate(self.columns):
+            frame[column] = self.data[:, i].ravel()
+        return frame
@@ -0,0 +1,169 @@
+"""Reproducible random streams for stochastic ensembles."""
+
+import zlib
+import numpy as np
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+
+class RandomStreams:
+    """
+    Independent random streams for fixed blocks of replicates.
+
+    Replicates are grouped into consecutive blocks of ``block_size``, and
+    block ``b`` always draws from the stream spawned from the root seed with
+    key ``b``, whichever process or thread simulates it and in whatever
+    order. Results therefore depend only on the seed and ``block_size``, not
+    on how blocks are distributed over workers. ``block_size=1`` gives every
+    replicate its own stream.
+
+    Args:
+        seed: Root seed; a Generator is used to draw a root seed
+        block_size: Replicates per stream
+    """
+
+    def __init__(self, seed: SeedLike = None, block_size: int = 256):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1.")
+        if isinstance(seed, np.random.Generator):
+            seed = np.random.SeedSequence(seed.integers(2**32, size=4))
+        elif not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.block_size = block_size
+
+    def n_blocks(self, n_replicates: int) -> int:
+        """Number of blocks needed for ``n_replicates`` replicates."""
+        return -(-n_replicates // self.block_size)
+
+    def block_slice(self, block: int, n_replicates: int) -> slice:
+        """Replicates that belong to ``block``."""
+        start = block * self.block_size
+        return slice(start, min(start + self.block_size, n_replicates))
+
+    def seed_for(self, block: int) -> np.random.SeedSequence:
+        """
+        Seed sequence of one block.
+
+        Equal to ``seed_sequence.spawn(n)[block]`` for a fresh root, but
+        computed directly from the block index.
+        """
+        root = self.seed_sequence
+        return np.random.SeedSequence(
+            root.entropy, spawn_key=root.spawn_key + (block,), pool_size=root.pool_size
+        )
+
+    def generator(self, block: int) -> np.random.Generator:
+        """Random number generator of one block."""
+        return np.random.Generator(np.random.PCG64(self.seed_for(block)))
+
+    def blocks(self, n_replicates: int) -> Iterator[Tuple[slice, np.random.Generator]]:
+        """Iterate over (replicate slice, generator) pairs of every block."""
+        for block in range(self.n_blocks(n_replicates)):
+            yield self.block_slice(block, n_replicates), self.generator(block)
+
+
+class CommonRandomNumbers:
+    """
+    Counter-based uniforms addressed by block, step and role.
+
+    Every draw is taken from a Philox generator whose key comes from the
+    block's seed and whose counter encodes the time step and a named role,
+    such as the individuals leaving compartment 'I'. Two scenarios run with
+    the same seed therefore use the same uniforms for the same role at the
+    same step, for each replicate, however many other draws either scenario
+    makes. Paired differences between scenarios then have much lower
+    variance than differences between independent runs.
+
+    Args:
+        seed: Root seed; a Generator is used to draw a root seed
+        block_size: Replicates per stream
+    """
+
+    def __init__(self, seed: SeedLike = None, block_size: int = 256):
+        self.streams = RandomStreams(seed, block_size)
+        self._keys: Dict[int, np.ndarray] = {}
+
+    def key(self, block: int) -> np.ndarray:
+        """Philox key of one block."""
+        if block not in self._keys:
+            self._keys[block] = self.streams.seed_for(block).generate_state(
+                2, np.uint64
+            )
+        return self._keys[block]
+
+    def at(self, block: int, step: int) -> "StepUniforms":
+        """Uniform source for one block and time step."""
+        return StepUniforms(self.key(block), step)
+
+
+class StepUniforms:
+    """
+    Uniforms of one block and time step, one independent stream per role.
+
+    Args:
+        key: Philox key of the block
+        step: Time step index
+    """
+
+    def __init__(self, key: np.ndarray, step: int):
+        self.key = key
+        self.step = step
+
+    def random(self, role: str, size: int) -> np.ndarray:
+        """
+        Uniforms in [0, 1) for ``size`` replicates.
+
+        Each replicate takes exactly one value, so replicate ``i`` always
+        receives the ``i``-th value of the role's stream.
+        """
+        # Philox advances word 0 as it draws, so the step and role go in
+        # the higher words and streams of different steps never overlap
+        counter = [0, self.step, zlib.crc32(role.encode()), 0]
+        return np.random.Generator(
+            np.random.Philox(key=self.key, counter=counter)
+        ).random(size)
+
+
+class BlockedSource:
+    """
+    Per-block random sources presented as one source for all replicates.
+
+    Lets a step draw for every replicate at once while each block of
+    replicates still takes its values from its own generator or
+    ``StepUniforms``, in the same order as when the block is stepped on its
+    own, so results do not depend on how many blocks are stepped together.
+
+    Args:
+        slices: Replicates of each block, as consecutive slices
+        sources: Generator or ``StepUniforms`` of each block
+    """
+
+    def __init__(
+        self,
+        slices: Sequence[slice],
+        sources: Sequence[Union[np.random.Generator, StepUniforms]],
+    ):
+        self.slices: List[slice] = list(slices)
+        self.sources = list(sources)
+        self.uniforms = all(isinstance(source, StepUniforms) for source in self.sources)
+
+    def binomial(self, n: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """Binomial draws, each block from its own generator."""
+        p = np.broadcast_to(p, np.shape(n))
+        counts = np.empty(np.shape(n), dtype=np.int64)
+        for replicates, source in zip(self.slices, self.sources):
+            counts[replicates] = source.binomial(n[replicates], p[replicates])
+        return counts
+
+    def random(self, role: str, size: int) -> np.ndarray:
+        """Uniforms for ``role``, each block from its own ``StepUniforms``."""
+        values = np.empty(size)
+        for replicates, source in zip(self.slices, self.sources):
+            values[replicates] = source.random(role, replicates.stop - replicates.start)
+        return values
+
+
+# Source of draws for one stochastic step
+RandomSource = Union[np.random.Generator, StepUniforms, BlockedSource]
@@ -2,7 +2,13 @@
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+from .spec import ModelSpec, get_model_spec, resolve_output_steps
+from .workspace import Workspace
+from .result import SimulationResult
+from .ode import simulate_ode
+
+SOLVER_METHODS = ('euler', 'rk45')
 
 
 def cull_dataframe(df: pd.DataFrame, cull_column: str, threshold: float = 0.001, extend_time: float = 5.0) -> pd.DataFrame:
@@ -37,12 +43,133 @@ def cull_dataframe(df: pd.DataFrame, cull_column: str, threshold: float = 0.001,
     return df
 
 
+def _cull_index(
+    time: np.ndarray,
+    values: np.ndarray,
+    threshold: float = 0.001,
+    extend_time: float = 5.0
+) -> int:
+    """Number of rows ``cull_dataframe`` would keep for these values."""
+    above = np.flatnonzero(values >= threshold)
+    if len(time) < 2 or len(above) == 0:
+        return len(values)
+    extend = int(np.round(extend_time / (time[1] - time[0])))
+    return min(above[-1] + extend, len(values) - 1) + 1
+
+
+def simulate_model(
+    model_type: Union[str, ModelSpec],
+    initial_infected: float,
+    parameters: Dict[str, float],
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+    method: str = 'euler',
+    output_interval: Optional[float] = None,
+    output_times: Optional[np.ndarray] = None,
+    backend: Optional[str] = None,
+    workspace: Optional[Workspace] = None
+) -> SimulationResult:
+    """
+    Run a simulation of any registered compartmental model.
+    
+    With ``method='euler'`` the model is stepped on a fixed grid of size
+    ``dt``. With ``method='rk45'`` the continuous-time model is solved with
+    an adaptive Dormand-Prince integrator and reported on the same grid, so
+    ``dt`` only sets the output spacing and ``use_exponential_form`` is unused.
+    
+    ``output_interval`` or ``output_times`` store fewer rows than steps taken;
+    flow columns then hold the amount moved since the previous row.
+    
+    Passing the same ``workspace`` to repeated calls reuses the simulation
+    buffers; the returned result always owns a copy of the data.
+    
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu' (death rate)
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+        method: 'euler' for fixed steps or 'rk45' for adaptive steps
+        output_interval: Time between stored rows (every step if None)
+        output_times: Times at which to store rows; overrides output_interval
+        backend: Compute backend for ``method='euler'`` (the global default if None)
+        workspace: Buffers to reuse for ``method='euler'``
+        
+    Returns:
+        SimulationResult with columns: time, compartments, and one column per flow
+    """
+    spec = get_model_spec(model_type)
+    stats = None
+    if method == 'euler':
+        # Culling happens inside the engine, which stops once the tail is done
+        result = spec.compiled.simulate(
+            initial_infected, parameters, dt, max_time, use_exponential_form,
+            cull_threshold=0.001, output_interval=output_interval,
+            output_times=output_times, backend=backend, workspace=workspace
+        )
+    elif method == 'rk45':
+        n_steps = int(max_time / dt)
+        steps = resolve_output_steps(dt, n_steps, output_interval, output_times)
+        output_times = (np.arange(n_steps) if steps is None else steps) * dt
+        result, stats = simulate_ode(spec, initial_infected, parameters, output_times)
+    else:
+        raise ValueError(
+            f"Unknown method '{method}'. "
+            f"Available methods: {', '.join(SOLVER_METHODS)}"
+        )
+    
+    # The adaptive solver covers the full horizon, so cull by index instead
+    cull_index = None
+    if stats is not None:
+        cull_index = _cull_index(result['time'], result['I'][:, 0])
+    
+    # Copy out of the simulation buffers, which may belong to a workspace
+    return SimulationResult.from_columns(
+        result['time'], {column: result[column][:, 0] for column in spec.columns},
+        spec.columns, model_type=spec.name, parameters=parameters, dt=dt,
+        cull_index=cull_index, solver_stats=stats
+    )
+
+
+def run_model(
+    model_type: Union[str, ModelSpec],
+    initial_infected: float,
+    parameters: Dict[str, float],
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+    method: str = 'euler',
+    output_interval: Optional[float] = None,
+    output_times: Optional[np.ndarray] = None,
+    backend: Optional[str] = None,
+    workspace: Optional[Workspace] = None
+) -> pd.DataFrame:
+    """
+    Run a simulation of any registered compartmental model as a DataFrame.
+    
+    Takes the same arguments as ``simulate_model`` and returns its result
+    through ``SimulationResult.to_pandas``.
+    
+    Returns:
+        DataFrame with columns: time, compartments, and one column per flow
+    """
+    return simulate_model(
+        model_type, initial_infected, parameters, dt, max_time, use_exponential_form,
+        method=method, output_interval=output_interval, output_times=output_times,
+        backend=backend, workspace=workspace
+    ).to_pandas()
+
+
 def run_sir_model(
     initial_infected: float,
     parameters: Dict[str, float],
     dt: float = 0.01,
     max_time: float = 100.0,
-    use_exponential_form: bool = False
+    use_exponential_form: bool = False,
+    output_interval: Optional[float] = None,
+    workspace: Optional[Workspace] = None
 ) -> pd.DataFrame:
     """
     Run discrete SIR model simulation.
@@ -53,63 +180,16 @@ def run_sir_model(
         dt: Time step
         max_time: Maximum simulation time
         use_exponential_form: Whether to use exponential form for transitions
+        output_interval: Time between stored rows (every step if None)
+        workspace: Buffers to reuse across repeated calls
         
     Returns:
         DataFrame with columns: time, S, I, R, newI, newR
     """
-    n_steps = int(max_time / dt)
-    time = np.arange(n_steps) * dt
-    
-    # Extract parameters
-    beta = parameters['beta']
-    gamma = parameters['gamma']
-    mu = parameters.get('mu', 0.0)
-    
-    # Initialize arrays
-    S = np.zeros(n_steps)
-    I = np.zeros(n_steps)
-    R = np.zeros(n_steps)
-    newI = np.zeros(n_steps)
-    newR = np.zeros(n_steps)
-    
-    # Initial conditions
-    S[0] = 1.0 - initial_infected
-    I[0] = initial_infected
-    R[0] = 0.0
-    
-    # Simulation loop
-    for t in range(1, n_steps):
-        if use_exponential_form:
-            new_infections = S[t-1] * (1 - np.exp(-beta * I[t-1] * dt))
-            new_recoveries = I[t-1] * (1 - np.exp(-gamma * dt))
-            s_deaths = S[t-1] * (1 - np.exp(-mu * dt))
-            i_deaths = I[t-1] * (1 - np.exp(-mu * dt))
-            r_deaths = R[t-1] * (1 - np.exp(-mu * dt))
-        else:
-            new_infections = beta * S[t-1] * I[t-1] * dt
-            new_recoveries = gamma * I[t-1] * dt
-            s_deaths = mu * S[t-1] * dt
-            i_deaths = mu * I[t-1] * dt
-            r_deaths = mu * R[t-1] * dt
-        
-        births = s_deaths + i_deaths + r_deaths
-        
-        S[t] = S[t-1] - new_infections + births - s_deaths
-        I[t] = I[t-1] + new_infections - new_recoveries - i_deaths
-        R[t] = R[t-1] + new_recoveries - r_deaths
-        newI[t] = new_infections
-        newR[t] = new_recoveries
-    
-    df = pd.DataFrame({
-        'time': time,
-        'S': S,
-        'I': I,
-        'R': R,
-        'newI': newI,
-        'newR': newR
-    })
-    
-    return cull_dataframe(df, 'I')
+    return run_model(
+        'SIR', initial_infected, parameters, dt, max_time, use_exponential_form,
+        output_interval=output_interval, workspace=workspace
+    )
 
 
 def run_seir_model(
@@ -117,7 +197,9 @@ def run_seir_model(
     parameters: Dict[str, float],
     dt: float = 0.01,
     max_time: float = 100.0,
-    use_exponential_form: bool = False
+    use_exponential_form: bool = False,
+    output_interval: Optional[float] = None,
+    workspace: Optional[Workspace] = None
 ) -> pd.DataFrame:
     """
     Run discrete SEIR model simulation.
@@ -128,72 +210,13 @@ def run_seir_model(
         dt: Time step
         max_time: Maximum simulation time
         use_exponential_form: Whether to use exponential form for transitions
+        output_interval: Time between stored rows (every step if None)
+        workspace: Buffers to reuse across repeated calls
         
     Returns:
         DataFrame with columns: time, S, E, I, R, newE, newI, newR
     """
-    n_steps = int(max_time / dt)
-    time = np.arange(n_steps) * dt
-    
-    # Extract parameters
-    beta = parameters['beta']
-    sigma = parameters['sigma']
-    gamma = parameters['gamma']
-    mu = parameters.get('mu', 0.0)
-    
-    # Initialize arrays
-    S = np.zeros(n_steps)
-    E = np.zeros(n_steps)
-    I = np.zeros(n_steps)
-    R = np.zeros(n_steps)
-    newE = np.zeros(n_steps)
-    newI = np.zeros(n_steps)
-    newR = np.zeros(n_steps)
-    
-    # Initial conditions
-    S[0] = 1.0 - initial_infected
-    E[0] = 0.0
-    I[0] = initial_infected
-    R[0] = 0.0
-    
-    # Simulation loop
-    for t in range(1, n_steps):
-        if use_exponential_form:
-            new_exposures = S[t-1] * (1 - np.exp(-beta * I[t-1] * dt))
-            new_infectious = E[t-1] * (1 - np.exp(-sigma * dt))
-            new_recoveries = I[t-1] * (1 - np.exp(-gamma * dt))
-            s_deaths = S[t-1] * (1 - np.exp(-mu * dt))
-            e_deaths = E[t-1] * (1 - np.exp(-mu * dt))
-            i_deaths = I[t-1] * (1 - np.exp(-mu * dt))
-            r_deaths = R[t-1] * (1 - np.exp(-mu * dt))
-        else:
-            new_exposures = beta * S[t-1] * I[t-1] * dt
-            new_infectious = sigma * E[t-1] * dt
-            new_recoveries = gamma * I[t-1] * dt
-            s_deaths = mu * S[t-1] * dt
-            e_deaths = mu * E[t-1] * dt
-            i_deaths = mu * I[t-1] * dt
-            r_deaths = mu * R[t-1] * dt
-        
-        births = s_deaths + e_deaths + i_deaths + r_deaths
-        
-        S[t] = S[t-1] - new_exposures + births - s_deaths
-        E[t] = E[t-1] + new_exposures - new_infectious - e_deaths
-        I[t] = I[t-1] + new_infectious - new_recoveries - i_deaths
-        R[t] = R[t-1] + new_recoveries - r_deaths
-        newE[t] = new_exposures
-        newI[t] = new_infectious
-        newR[t] = new_recoveries
-    
-    df = pd.DataFrame({
-        'time': time,
-        'S': S,
-        'E': E,
-        'I': I,
-        'R': R,
-        'newE': newE,
-        'newI': newI,
-        'newR': newR
-    })
-    
-    return cull_dataframe(df, 'I')
+    return run_model(
+        'SEIR', initial_infected, parameters, dt, max_time, use_exponential_form,
+        output_interval=output_interval, workspace=workspace
+    )
@@ -0,0 +1,1034 @@
+"""Declarative compartmental model specifications and their compiled kernels."""
+
+from dataclasses import dataclass, field
+from functools import cached_property
+import math
+import numpy as np
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from .backends import Stepper, get_backend
+from .workspace import Workspace, allocate
+from .result import StreamChunk
+
+ArrayLike = Union[float, np.ndarray]
+
+# Functions that may be used inside rate expressions
+RATE_FUNCTIONS = {
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "sin": np.sin,
+    "cos": np.cos,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "pi": np.pi,
+}
+
+# Scalar equivalents used when a single simulation runs on Python floats
+SCALAR_RATE_FUNCTIONS = {
+    "exp": math.exp,
+    "log": math.log,
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "minimum": min,
+    "maximum": max,
+    "pi": math.pi,
+}
+
+
+@dataclass(frozen=True)
+class Flow:
+    """
+    A transfer between two compartments at a per-capita rate.
+
+    Args:
+        source: Compartment the flow leaves
+        target: Compartment the flow enters
+        rate: Per-capita rate expression in terms of parameters, compartments
+            (as population fractions) and the current time ``t``
+        name: Output column that records the amount moved in each step
+    """
+
+    source: str
+    target: str
+    rate: str
+    name: str
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    Declarative description of a compartmental model.
+
+    Every model supports births and deaths through the optional parameter
+    ``mu``: each compartment loses ``mu`` per capita and the same amount is
+    born into ``birth_compartment``, so the total population is conserved.
+
+    Args:
+        name: Model name used for registry lookups
+        compartments: Ordered compartment names
+        flows: Transfers between compartments
+        parameters: Parameters that must be supplied to run the model
+        defaults: Default values for optional parameters
+        birth_compartment: Compartment that receives births
+        seed_compartment: Compartment that holds the initial infections
+        demography: Whether callers should derive ``mu`` from an average age
+        title: Plot title used by the apps
+    """
+
+    name: str
+    compartments: Tuple[str, ...]
+    flows: Tuple[Flow, ...]
+    parameters: Tuple[str, ...]
+    defaults: Mapping[str, float] = field(
+        default_factory=dict, hash=False, compare=False
+    )
+    birth_compartment: str = "S"
+    seed_compartment: str = "I"
+    demography: bool = False
+    title: Optional[str] = None
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Output columns: compartments followed by flow names."""
+        return self.compartments + tuple(flow.name for flow in self.flows)
+
+    @cached_property
+    def compiled(self) -> "CompiledModel":
+        """Stepping kernel for this specification, compiled on first use."""
+        return CompiledModel(self)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Generated kernels cannot be pickled; workers recompile on first use
+        state = dict(self.__dict__)
+        state.pop("compiled", None)
+        return state
+
+
+class CompiledModel:
+    """
+    Vectorized stepping kernel compiled from a ``ModelSpec``.
+
+    The stepping loop is generated from the stoichiometry matrix, so one step
+    is a handful of array operations regardless of how many members are
+    simulated. Rates that do not depend on the state are converted to
+    per-step fractions once, outside the loop.
+    """
+
+    def __init__(self, spec: ModelSpec):
+        self.spec = spec
+        self.compartments = spec.compartments
+        self.flow_names = tuple(flow.name for flow in spec.flows)
+        self.columns = spec.columns
+        self.n_compartments = len(spec.compartments)
+        self.n_flows = len(spec.flows)
+
+        index = {name: i for i, name in enumerate(spec.compartments)}
+        for name in (spec.birth_compartment, spec.seed_compartment):
+            if name not in index:
+                raise ValueError(
+                    f"Compartment '{name}' not found in model '{spec.name}'."
+                )
+
+        known_names = set(spec.compartments) | set(spec.parameters) | set(spec.defaults)
+        known_names |= set(RATE_FUNCTIONS) | {"mu", "t", "dt"}
+        reserved = (set(spec.compartments) | set(spec.parameters)) & {"t", "dt", "mu"}
+        if reserved:
+            raise ValueError(
+                f"Names {sorted(reserved)} are reserved in model '{spec.name}'."
+            )
+
+        self.sources = np.zeros(self.n_flows, dtype=int)
+        self.stoichiometry = np.zeros((self.n_flows, self.n_compartments))
+        self._codes = []
+        self._state_dependent = []
+
+        for k, flow in enumerate(spec.flows):
+            for name in (flow.source, flow.target):
+                if name not in index:
+                    raise ValueError(
+                        f"Compartment '{name}' not found in model '{spec.name}'."
+                    )
+            self.sources[k] = index[flow.source]
+            self.stoichiometry[k, index[flow.source]] -= 1
+            self.stoichiometry[k, index[flow.target]] += 1
+
+            code = compile(flow.rate, f"<{spec.name}:{flow.name}>", "eval")
+            unknown = set(code.co_names) - known_names
+            if unknown:
+                raise ValueError(
+                    f"Unknown names {sorted(unknown)} in rate for flow '{flow.name}'."
+                )
+            self._codes.append(code)
+            self._state_dependent.append(
+                bool(set(code.co_names) & (set(spec.compartments) | {"t"}))
+            )
+
+        self.birth_index = index[spec.birth_compartment]
+        self.seed_index = index[spec.seed_compartment]
+        self.parameter_names = tuple(
+            dict.fromkeys(spec.parameters + tuple(spec.defaults) + ("mu",))
+        )
+        self._kernels: Dict[Tuple[bool, bool, bool], Callable[..., None]] = {}
+
+    def resolve_parameters(
+        self, parameters: Mapping[str, ArrayLike]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Fill in defaults and broadcast parameters to a common member axis.
+
+        Args:
+            parameters: Parameter values, each a scalar or 1-D array
+
+        Returns:
+            Dictionary of 1-D float arrays that all have the same length
+        """
+        missing = [name for name in self.spec.parameters if name not in parameters]
+        if missing:
+            raise ValueError(
+                f"Missing parameters for model '{self.spec.name}': {missing}"
+            )
+
+        values = {"mu": 0.0, **self.spec.defaults}
+        values.update(parameters)
+        arrays = [
+            np.atleast_1d(np.asarray(value, dtype=float)) for value in values.values()
+        ]
+
+        try:
+            arrays = np.broadcast_arrays(*arrays)
+        except ValueError:
+            raise ValueError(
+                "Model parameters must be scalars or arrays of the same length."
+            )
+
+        if arrays[0].ndim != 1:
+            raise ValueError("Model parameters must be scalars or 1-D arrays.")
+
+        return dict(zip(values.keys(), arrays))
+
+    def initial_state(self, initial_infected: np.ndarray) -> np.ndarray:
+        """Build the (compartments, members) initial state from infected fractions."""
+        state = np.zeros((self.n_compartments, len(initial_infected)))
+        state[self.birth_index] = 1.0 - initial_infected
+        state[self.seed_index] += initial_infected
+        return state
+
+    def flow_rates(
+        self,
+        state: np.ndarray,
+        params: Mapping[str, np.ndarray],
+        t: float = 0.0,
+        flows: Optional[List[int]] = None,
+    ) -> np.ndarray:
+        """
+        Evaluate per-capita flow rates for a state.
+
+        Args:
+            state: Array of shape (compartments, ...)
+            params: Resolved parameter arrays
+            t: Current time
+            flows: Indices of flows to evaluate (all if None)
+
+        Returns:
+            Array of shape (len(flows), ...) with per-capita rates
+        """
+        if flows is None:
+            flows = list(range(self.n_flows))
+        namespace = dict(params)
+        namespace.update(zip(self.compartments, state))
+        namespace["t"] = t
+
+        rates = np.empty((len(flows),) + state.shape[1:])
+        for i, k in enumerate(flows):
+            rates[i] = eval(self._codes[k], RATE_FUNCTIONS, namespace)
+        return rates
+
+    def derivative(
+        self, state: np.ndarray, params: Mapping[str, np.ndarray], t: float = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Continuous-time right-hand side of the model.
+
+        Args:
+            state: Array of shape (compartments, ...)
+            params: Resolved parameter arrays
+            t: Current time
+
+        Returns:
+            Tuple of (state derivative, flows in population fraction per unit time)
+        """
+        flows = state[self.sources] * self.flow_rates(state, params, t)
+        deaths = params["mu"] * state
+        d_state = np.tensordot(self.stoichiometry.T, flows, axes=1) - deaths
+        d_state[self.birth_index] += deaths.sum(axis=0)
+        return d_state, flows
+
+    def kernel(
+        self, use_exponential_form: bool, vital: bool, scalar: bool
+    ) -> Callable[..., Tuple]:
+        """
+        Return the generated stepping loop for one model variant.
+
+        The loop body is generated from the stoichiometry matrix once per
+        variant and cached. The same source runs on Python floats for single
+        simulations and on 1-D arrays for ensembles.
+
+        Args:
+            use_exponential_form: Whether to use exponential form for transitions
+            vital: Whether to include births and deaths
+            scalar: Whether the loop runs on Python floats rather than arrays
+
+        Returns:
+            Function ``kernel(out, n, t0, dt, *state, *parameters)`` that
+            advances ``state`` from time ``t0`` by ``n`` steps, writes the
+            state and flows of each step to the rows of ``out`` (shape
+            (n, columns[, members])) and returns the final state
+        """
+        key = (use_exponential_form, vital, scalar)
+        if key not in self._kernels:
+            namespace = dict(SCALAR_RATE_FUNCTIONS if scalar else RATE_FUNCTIONS)
+            exec(self.kernel_source(use_exponential_form, vital), namespace)
+            self._kernels[key] = namespace["_kernel"]
+        return self._kernels[key]
+
+    def kernel_source(self, use_exponential_form: bool, vital: bool) -> str:
+        """Generate Python source for the stepping loop of one model variant."""
+        arguments = ", ".join(
+            ["_out", "_n", "_t0", "dt"]
+            + list(self.compartments)
+            + list(self.parameter_names)
+        )
+
+        def fraction(rate: str) -> str:
+            if use_exponential_form:
+                return f"(1 - exp(-({rate}) * dt))"
+            return f"(({rate}) * dt)"
+
+        lines = [f"def _kernel({arguments}):"]
+        for i, column in enumerate(self.columns):
+            lines.append(f"    _col_{i} = _out[:, {i}]")
+
+        # Rates that do not depend on the state are converted once
+        for k, flow in enumerate(self.spec.flows):
+            if not self._state_dependent[k]:
+                lines.append(f"    _fraction_{k} = {fraction(flow.rate)}")
+        if vital:
+            lines.append(f"    _death = {fraction('mu')}")
+
+        lines.append("    for _step in range(_n):")
+        if any("t" in code.co_names for code in self._codes):
+            lines.append("        t = _t0 + _step * dt")
+        for k, flow in enumerate(self.spec.flows):
+            rate = fraction(flow.rate) if self._state_dependent[k] else f"_fraction_{k}"
+            lines.append(f"        _flow_{k} = {flow.source} * {rate}")
+
+        updates = []
+        for i, name in enumerate(self.compartments):
+            terms = [name]
+            for k in range(self.n_flows):
+                if self.stoichiometry[k, i] > 0:
+                    terms.append(f"+ _flow_{k}")
+                elif self.stoichiometry[k, i] < 0:
+                    terms.append(f"- _flow_{k}")
+            if vital:
+                lines.append(f"        _deaths_{i} = _death * {name}")
+                terms.append(f"- _deaths_{i}")
+                if i == self.birth_index:
+                    terms.append("+ _births")
+            updates.append(" ".join(terms))
+        if vital:
+            births = " + ".join(f"_deaths_{i}" for i in range(self.n_compartments))
+            lines.append(f"        _births = {births}")
+
+        state = ", ".join(self.compartments)
+        lines.append(f"        {state}, = ({', '.join(updates)},)")
+        for i, name in enumerate(self.compartments):
+            lines.append(f"        _col_{i}[_step] = {name}")
+        for k in range(self.n_flows):
+            lines.append(f"        _col_{self.n_compartments + k}[_step] = _flow_{k}")
+        lines.append(f"    return {state},")
+        return "\n".join(lines) + "\n"
+
+    def _prepare(
+        self,
+        initial_infected: ArrayLike,
+        parameters: Mapping[str, ArrayLike],
+        use_exponential_form: bool,
+        backend: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Stepper]:
+        """Resolve inputs into an initial state and a backend stepper."""
+        params = self.resolve_parameters(
+            {"initial_infected": initial_infected, **parameters}
+        )
+        state = self.initial_state(params.pop("initial_infected"))
+        vital = bool(np.any(params["mu"]))
+        arguments = [params[name] for name in self.parameter_names]
+        stepper = get_backend(backend).stepper(
+            self, use_exponential_form, vital, arguments
+        )
+        return state, stepper
+
+    def simulate(
+        self,
+        initial_infected: ArrayLike,
+        parameters: Mapping[str, ArrayLike],
+        dt: float = 0.01,
+        max_time: float = 100.0,
+        use_exponential_form: bool = False,
+        cull_threshold: Optional[float] = None,
+        extend_time: float = 5.0,
+        cull_column: str = "I",
+        output_interval: Optional[float] = None,
+        output_times: Optional[np.ndarray] = None,
+        backend: Optional[str] = None,
+        workspace: Optional[Workspace] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Step the model forward on a fixed time grid.
+
+        With ``cull_threshold`` set, rows after the last time any member is
+        at or above the threshold in ``cull_column``, plus ``extend_time``,
+        are dropped, which keeps the same rows as ``cull_dataframe``. Models
+        whose prevalence cannot rise again stop stepping as soon as every
+        member's tail is done; models with births, time-dependent rates, or
+        another compartment feeding ``cull_column`` (a latent class or
+        waning immunity) run to ``max_time`` first. If any member never
+        reaches the threshold, every row is kept.
+
+        With ``output_interval`` or ``output_times`` set, the model is still
+        stepped every ``dt`` but only the requested rows are stored. Output
+        times are rounded to the nearest step, and each flow column holds the
+        amount moved since the previous stored row.
+
+        With ``workspace`` set, the output and scratch buffers come from the
+        workspace and the returned arrays are views into it.
+
+        Args:
+            initial_infected: Initial fraction infected, scalar or 1-D array
+            parameters: Parameter values, each a scalar or 1-D array
+            dt: Time step
+            max_time: Maximum simulation time
+            use_exponential_form: Whether to use exponential form for transitions
+            cull_threshold: Value below which to stop the simulation (None to disable)
+            extend_time: Additional time units to simulate after the threshold is
+                reached
+            cull_column: Compartment checked against the threshold
+            output_interval: Time between stored rows (every step if None)
+            output_times: Times at which to store rows; overrides output_interval
+            backend: Compute backend name (the global default if None)
+            workspace: Buffers to reuse instead of allocating new arrays
+
+        Returns:
+            Dictionary with 'time' of shape (time,) and one array of shape
+            (time, members) per output column
+        """
+        state, stepper = self._prepare(
+            initial_infected, parameters, use_exponential_form, backend
+        )
+        n_members = state.shape[1]
+        n_steps = int(max_time / dt)
+        output_steps = resolve_output_steps(dt, n_steps, output_interval, output_times)
+
+        tracker = None
+        if cull_threshold is not None:
+            if cull_column not in self.compartments:
+                raise ValueError(
+                    f"Column '{cull_column}' not found in model '{self.spec.name}'."
+                )
+            tracker = _CullTracker(
+                self.compartments.index(cull_column),
+                cull_threshold,
+                int(np.round(extend_time / dt)),
+                n_members,
+                early_stop=not self._may_rebound(parameters, cull_column),
+            )
+
+        if output_steps is None:
+            output, n_rows = self._simulate_every_step(
+                state, stepper, dt, n_steps, tracker, workspace
+            )
+            time = np.arange(n_rows) * dt
+        else:
+            output, n_rows = self._simulate_sampled(
+                state, stepper, dt, n_steps, output_steps, tracker, workspace
+            )
+            time = output_steps[:n_rows] * dt
+
+        result = {"time": time}
+        for i, column in enumerate(self.columns):
+            result[column] = output[:n_rows, i]
+        return result
+
+    def stream(
+        self,
+        initial_infected: ArrayLike,
+        parameters: Mapping[str, ArrayLike],
+        dt: float = 0.01,
+        chunk_size: int = 1000,
+        max_time: Optional[float] = None,
+        use_exponential_form: bool = False,
+        backend: Optional[str] = None,
+        resume: Optional[StreamChunk] = None,
+        copy: bool = False,
+    ) -> Iterator[StreamChunk]:
+        """
+        Step the model forward and yield the output in fixed-size chunks.
+
+        One chunk buffer is reused for the whole run, so memory does not grow
+        with the number of steps. Rows match those of ``simulate`` without
+        culling; stop early by leaving the loop.
+
+        Args:
+            initial_infected: Initial fraction infected, scalar or 1-D array
+            parameters: Parameter values, each a scalar or 1-D array
+            dt: Time step
+            chunk_size: Rows per yielded chunk
+            max_time: Time at which to stop (never stop if None)
+            use_exponential_form: Whether to use exponential form for transitions
+            backend: Compute backend name (the global default if None)
+            resume: Chunk from an earlier stream of the same model and
+                parameters to continue from; ``initial_infected`` then only
+                sets the number of members
+            copy: Whether each chunk gets its own arrays rather than views of
+                the shared buffer, which the next chunk overwrites
+
+        Yields:
+            StreamChunk for each block of ``chunk_size`` rows
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        state, stepper = self._prepare(
+            initial_infected, parameters, use_exponential_form, backend
+        )
+        row = 0
+        if resume is not None:
+            if resume.state.shape != state.shape:
+                raise ValueError(
+                    "Cannot resume from a chunk with a different number of members."
+                )
+            state, row = resume.state, resume.next_row
+        n_steps = None if max_time is None else int(max_time / dt)
+        buffer = np.empty((chunk_size, len(self.columns), state.shape[1]))
+
+        while n_steps is None or row < n_steps:
+            n = chunk_size if n_steps is None else min(chunk_size, n_steps - row)
+            chunk = buffer[:n]
+            if row == 0:
+                chunk[0, : self.n_compartments] = state
+                chunk[0, self.n_compartments :] = 0.0
+                state = stepper(chunk[1:], n - 1, 0.0, dt, state)
+            else:
+                state = stepper(chunk, n, (row - 1) * dt, dt, state)
+
+            yield StreamChunk(
+                time=np.arange(row, row + n) * dt,
+                data=chunk.copy() if copy else chunk,
+                columns=self.columns,
+                state=state.copy(),
+                next_row=row + n,
+            )
+            row += n
+
+    def _scratch_rows(self, n_members: int, n_steps: int) -> int:
+        """Rows per reusable scratch chunk, capped at about 8 MB."""
+        return max(
+            1,
+            min(
+                self.cull_chunk_size,
+                2**20 // (len(self.columns) * n_members),
+                n_steps,
+            ),
+        )
+
+    def _simulate_every_step(
+        self,
+        state: np.ndarray,
+        stepper: Stepper,
+        dt: float,
+        n_steps: int,
+        tracker: Optional["_CullTracker"],
+        workspace: Optional[Workspace],
+    ) -> Tuple[np.ndarray, int]:
+        """Run the kernel directly into the output buffer, storing every step."""
+        n_members = state.shape[1]
+        if tracker is None:
+            chunk_size = capacity = n_steps
+        else:
+            chunk_size = self.cull_chunk_size
+            capacity = min(n_steps, 4 * chunk_size)
+
+        # Output is stored time-major so that each step writes contiguous rows
+        # Every row after the first is fully written by the kernel
+        output = allocate(workspace, "output", (capacity, len(self.columns), n_members))
+        output[0, : self.n_compartments] = state
+        output[0, self.n_compartments :] = 0.0
+        n_rows = min(n_steps, 1)
+        if tracker is not None:
+            n_rows = tracker.update(output[:n_rows], 0) or n_rows
+
+        while n_rows < n_steps:
+            n = min(chunk_size, n_steps - n_rows)
+            if n_rows + n > capacity:
+                # Grow geometrically so buffers track the steps actually taken
+                capacity = min(n_steps, max(2 * capacity, n_rows + n))
+                grown = allocate(workspace, "output", (capacity,) + output.shape[1:])
+                # A workspace buffer that is already large enough keeps rows in place
+                if not np.may_share_memory(grown, output):
+                    grown[:n_rows] = output[:n_rows]
+                output = grown
+
+            state = stepper(
+                output[n_rows : n_rows + n], n, (n_rows - 1) * dt, dt, state
+            )
+            start = n_rows
+            n_rows += n
+
+            if tracker is not None:
+                stop = tracker.update(output[start:n_rows], start)
+                if stop is not None:
+                    n_rows = stop
+                    break
+
+        if tracker is not None:
+            n_rows = tracker.rows_to_keep(n_rows)
+        return output, n_rows
+
+    def _simulate_sampled(
+        self,
+        state: np.ndarray,
+        stepper: Stepper,
+        dt: float,
+        n_steps: int,
+        output_steps: np.ndarray,
+        tracker: Optional["_CullTracker"],
+        workspace: Optional[Workspace],
+    ) -> Tuple[np.ndarray, int]:
+        """Run the kernel through a scratch chunk, storing only the requested steps."""
+        n_members = state.shape[1]
+        n_compartments = self.n_compartments
+
+        output = allocate(
+            workspace, "output", (len(output_steps), len(self.columns), n_members)
+        )
+        scratch = allocate(
+            workspace,
+            "scratch",
+            (self._scratch_rows(n_members, n_steps), len(self.columns), n_members),
+        )
+        scratch[0, :n_compartments] = state
+        n_out = 0
+        if output_steps[0] == 0:
+            output[0, :n_compartments] = state
+            output[0, n_compartments:] = 0.0
+            n_out = 1
+        stop = tracker.update(scratch[:1], 0) if tracker is not None else None
+
+        # Flows accumulated since the last stored row
+        pending = np.zeros((self.n_flows, n_members))
+        step = 1
+        while stop is None and step < n_steps and n_out < len(output_steps):
+            n = min(len(scratch), n_steps - step)
+            chunk = scratch[:n]
+            state = stepper(chunk, n, (step - 1) * dt, dt, state)
+
+            flows = chunk[:, n_compartments:]
+            end = int(np.searchsorted(output_steps, step + n))
+            if end > n_out:
+                rows = output_steps[n_out:end] - step
+                cumulative = np.cumsum(flows, axis=0)
+                taken = cumulative[rows]
+                output[n_out:end, :n_compartments] = chunk[rows, :n_compartments]
+                output[n_out, n_compartments:] = pending + taken[0]
+                output[n_out + 1 : end, n_compartments:] = np.diff(taken, axis=0)
+                pending = cumulative[-1] - taken[-1]
+                n_out = end
+            else:
+                pending += flows.sum(axis=0)
+
+            if tracker is not None:
+                stop = tracker.update(chunk, step)
+            step += n
+
+        if tracker is not None:
+            if stop is None:
+                stop = tracker.rows_to_keep(min(step, n_steps))
+            n_out = min(n_out, int(np.searchsorted(output_steps, stop)))
+        return output, n_out
+
+    def summarize(
+        self,
+        initial_infected: ArrayLike,
+        parameters: Mapping[str, ArrayLike],
+        dt: float = 0.01,
+        max_time: float = 100.0,
+        use_exponential_form: bool = False,
+        threshold: float = 0.001,
+        extend_time: Optional[float] = 5.0,
+        column: str = "I",
+        backend: Optional[str] = None,
+        workspace: Optional[Workspace] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Step the model forward keeping only running summary statistics.
+
+        The kernel writes into one scratch chunk that is reused for the whole
+        run, so memory does not grow with ``max_time / dt``.
+
+        Args:
+            initial_infected: Initial fraction infected, scalar or 1-D array
+            parameters: Parameter values, each a scalar or 1-D array
+            dt: Time step
+            max_time: Maximum simulation time
+            use_exponential_form: Whether to use exponential form for transitions
+            threshold: Prevalence that marks the start and end of the epidemic
+            extend_time: Time to keep stepping after every member has dropped
+                below the threshold (None to always run to ``max_time``)
+            column: Compartment that holds prevalence
+            backend: Compute backend name (the global default if None)
+            workspace: Buffers to reuse for the scratch chunk
+
+        Returns:
+            Dictionary of per-member arrays: 'peak_prevalence', 'peak_time',
+            'attack_rate', 'start_time', 'end_time', 'final_time'
+        """
+        if column not in self.compartments:
+            raise ValueError(
+                f"Column '{column}' not found in model '{self.spec.name}'."
+            )
+        state, stepper = self._prepare(
+            initial_infected, parameters, use_exponential_form, backend
+        )
+        n_members = state.shape[1]
+        n_steps = int(max_time / dt)
+        column_index = self.compartments.index(column)
+
+        extend = n_steps if extend_time is None else int(np.round(extend_time / dt))
+        early_stop = extend_time is not None and not self._may_rebound(
+            parameters, column
+        )
+        scratch = allocate(
+            workspace,
+            "scratch",
+            (self._scratch_rows(n_members, n_steps), len(self.columns), n_members),
+        )
+
+        initial = state.copy()
+        stats, n_rows, tracker = self._summary_pass(
+            state,
+            stepper,
+            dt,
+            n_steps,
+            column_index,
+            threshold,
+            extend,
+            early_stop,
+            scratch,
+        )
+        if extend_time is not None and not early_stop:
+            # Prevalence may have risen again, so the cull row is only known
+            # at the end; repeat the run up to it
+            keep = tracker.rows_to_keep(n_rows)
+            if keep < n_rows:
+                stats, n_rows, tracker = self._summary_pass(
+                    initial,
+                    stepper,
+                    dt,
+                    keep,
+                    column_index,
+                    threshold,
+                    extend,
+                    False,
+                    scratch,
+                )
+
+        peak, peak_row, attack, first_above = stats
+        last_above = tracker.last_above
+        ended = (last_above >= 0) & (last_above < n_rows - 1)
+        return {
+            "peak_prevalence": peak,
+            "peak_time": peak_row * dt,
+            "attack_rate": attack,
+            "start_time": np.where(first_above >= 0, first_above * dt, np.nan),
+            "end_time": np.where(ended, (last_above + 1) * dt, np.nan),
+            "final_time": np.full(n_members, (n_rows - 1) * dt),
+        }
+
+    def _summary_pass(
+        self,
+        state: np.ndarray,
+        stepper: Stepper,
+        dt: float,
+        n_steps: int,
+        column_index: int,
+        threshold: float,
+        extend: int,
+        early_stop: bool,
+        scratch: np.ndarray,
+    ) -> Tuple[Tuple[np.ndarray, ...], int, "_CullTracker"]:
+        """Accumulate summary statistics over at most ``n_steps`` rows."""
+        n_members = state.shape[1]
+        infection_columns = [self.n_compartments + k for k in self.infection_flows]
+        peak = state[column_index].copy()
+        peak_row = np.zeros(n_members, dtype=int)
+        attack = np.zeros(n_members)
+        first_above = np.where(peak >= threshold, 0, -1)
+        tracker = _CullTracker(column_index, threshold, extend, n_members, early_stop)
+
+        scratch[0, : self.n_compartments] = state
+        tracker.update(scratch[:1], 0)
+        n_rows = min(n_steps, 1)
+        while n_rows < n_steps:
+            n = min(len(scratch), n_steps - n_rows)
+            chunk = scratch[:n]
+            state = stepper(chunk, n, (n_rows - 1) * dt, dt, state)
+
+            # Rows past the cull row do not count towards the summary
+            stop = tracker.update(chunk, n_rows)
+            if stop is not None:
+                chunk = chunk[: stop - n_rows]
+
+            prevalence = chunk[:, column_index]
+            chunk_peak = prevalence.max(axis=0)
+            higher = chunk_peak > peak
+            peak = np.where(higher, chunk_peak, peak)
+            peak_row = np.where(higher, n_rows + prevalence.argmax(axis=0), peak_row)
+            attack += chunk[:, infection_columns].sum(axis=(0, 1))
+
+            above = prevalence >= threshold
+            starts = (first_above < 0) & above.any(axis=0)
+            first_above = np.where(starts, n_rows + above.argmax(axis=0), first_above)
+
+            n_rows += len(chunk)
+            if stop is not None:
+                break
+
+        return (peak, peak_row, attack, first_above), n_rows, tracker
+
+    @property
+    def infection_flows(self) -> List[int]:
+        """Indices of state-dependent flows leaving the birth compartment."""
+        return [
+            k
+            for k, flow in enumerate(self.spec.flows)
+            if self.sources[k] == self.birth_index and self._state_dependent[k]
+        ]
+
+    def _may_rebound(self, parameters: Mapping[str, ArrayLike], column: str) -> bool:
+        """
+        Whether ``column`` can rise again after falling below a threshold.
+
+        Births, time-dependent rates and any compartment other than the birth
+        compartment that feeds ``column`` (a latent class such as E, or
+        immunity that wanes back into S) can all push prevalence up again
+        after it has dropped, so runs of such models are never cut short.
+        """
+        mu = parameters.get("mu", self.spec.defaults.get("mu", 0.0))
+        if self.spec.demography or bool(np.any(np.asarray(mu, dtype=float))):
+            return True
+        if any("t" in code.co_names for code in self._codes):
+            return True
+
+        upstream = {column}
+        while True:
+            sources = {
+                flow.source for flow in self.spec.flows if flow.target in upstream
+            }
+            if sources <= upstream:
+                break
+            upstream |= sources
+        return bool(upstream - {column, self.spec.birth_compartment})
+
+    # Steps per kernel call when checking for early termination
+    cull_chunk_size = 256
+
+
+def resolve_output_steps(
+    dt: float,
+    n_steps: int,
+    output_interval: Optional[float] = None,
+    output_times: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
+    """
+    Convert output times or an output interval into stored step indices.
+
+    Args:
+        dt: Time step
+        n_steps: Number of steps in the simulation
+        output_interval: Time between stored rows
+        output_times: Times at which to store rows; overrides output_interval
+
+    Returns:
+        Sorted step indices, or None when every step is stored
+    """
+    if output_times is not None:
+        steps = np.unique(
+            np.round(np.asarray(output_times, dtype=float) / dt).astype(int)
+        )
+        if len(steps) == 0 or steps[0] < 0 or steps[-1] >= n_steps:
+            raise ValueError("output_times must lie within the simulated time range.")
+        return steps
+    if output_interval is not None:
+        stride = int(np.round(output_interval / dt))
+        if stride < 1:
+            raise ValueError("output_interval must be at least dt.")
+        if stride > 1:
+            return np.arange(0, n_steps, stride)
+    return None
+
+
+class _CullTracker:
+    """
+    Track threshold exceedances to cull rows as ``cull_dataframe`` does.
+
+    With ``early_stop`` the run may stop once every member has finished its
+    post-threshold tail, which is only safe when the tracked compartment
+    cannot rise above the threshold again. Otherwise the run continues to
+    the end and ``rows_to_keep`` cuts it after the last exceedance.
+    """
+
+    def __init__(
+        self,
+        column: int,
+        threshold: float,
+        extend: int,
+        n_members: int,
+        early_stop: bool = True,
+    ):
+        self.column = column
+        self.threshold = threshold
+        self.extend = extend
+        self.early_stop = early_stop
+        self.last_above = np.full(n_members, -1)
+
+    def update(self, rows: np.ndarray, offset: int) -> Optional[int]:
+        """
+        Record threshold exceedances in a block of output rows.
+
+        Args:
+            rows: Output rows of shape (n, columns, members)
+            offset: Row index of the first row in the block
+
+        Returns:
+            Number of rows to keep once early stopping is allowed and every
+            member is done, otherwise None
+        """
+        stop = offset + len(rows)
+        above = rows[:, self.column] >= self.threshold
+        seen = above.any(axis=0)
+        last = stop - 1 - np.argmax(above[::-1], axis=0)
+        self.last_above = np.where(seen, last, self.last_above)
+
+        keep_until = self.last_above + self.extend
+        if (
+            self.early_stop
+            and np.all(self.last_above >= 0)
+            and np.all(keep_until < stop)
+        ):
+            return int(keep_until.max()) + 1
+        return None
+
+    def rows_to_keep(self, n_rows: int) -> int:
+        """Rows kept out of ``n_rows``: up to the last exceedance plus the tail."""
+        if np.any(self.last_above < 0):
+            return n_rows
+        return min(int(self.last_above.max()) + self.extend + 1, n_rows)
+
+
+MODEL_REGISTRY: Dict[str, ModelSpec] = {}
+
+
+def register_model(spec: ModelSpec) -> ModelSpec:
+    """
+    Add a model specification to the registry.
+
+    Args:
+        spec: Model specification to register
+
+    Returns:
+        The registered specification
+    """
+    spec.compiled  # Validate the specification eagerly
+    MODEL_REGISTRY[spec.name.upper()] = spec
+    return spec
+
+
+def get_model_spec(model_type: Union[str, ModelSpec]) -> ModelSpec:
+    """
+    Look up a registered model specification.
+
+    Args:
+        model_type: Registered model name (case-insensitive) or a ModelSpec
+
+    Returns:
+        Model specification
+    """
+    if isinstance(model_type, ModelSpec):
+        return model_type
+    try:
+        return MODEL_REGISTRY[model_type.upper()]
+    except KeyError:
+        available = ", ".join(MODEL_REGISTRY)
+        raise ValueError(
+            f"Unsupported model type: {model_type}. Available models: {available}"
+        )
+
+
+SIR = register_model(
+    ModelSpec(
+        name="SIR",
+        compartments=("S", "I", "R"),
+        flows=(
+            Flow("S", "I", "beta * I", "newI"),
+            Flow("I", "R", "gamma", "newR"),
+        ),
+        parameters=("beta", "gamma"),
+        title="Susceptible, Infectious, and Recovered Populations",
+    )
+)
+
+SIRS = register_model(
+    ModelSpec(
+        name="SIRS",
+        compartments=("S", "I", "R"),
+        flows=(
+            Flow("S", "I", "beta * I", "newI"),
+            Flow("I", "R", "gamma", "newR"),
+            Flow("R", "S", "omega", "newS"),
+        ),
+        parameters=("beta", "gamma"),
+        defaults={"omega": 0.0},
+        title="SIRS Model Simulation",
+    )
+)
+
+SEIR = register_model(
+    ModelSpec(
+        name="SEIR",
+        compartments=("S", "E", "I", "R"),
+        flows=(
+            Flow("S", "E", "beta * I", "newE"),
+            Flow("E", "I", "sigma", "newI"),
+            Flow("I", "R", "gamma", "newR"),
+        ),
+        parameters=("beta", "sigma", "gamma"),
+        title="SEIR Model Simulation",
+    )
+)
+
+SEIRS = register_model(
+    ModelSpec(
+        name="SEIRS",
+        compartments=("S", "E", "I", "R"),
+        flows=(
+            Flow("S", "E", "beta * I", "newE"),
+            Flow("E", "I", "sigma", "newI"),
+            Flow("I", "R", "gamma", "newR"),
+            Flow("R", "S", "omega", "newS"),
+        ),
+        parameters=("beta", "sigma", "gamma"),
+        defaults={"omega": 0.0},
+        demography=True,
+        title="SEIRS Model Simulation",
+    )
+)
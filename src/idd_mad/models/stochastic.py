@@ -0,0 +1,455 @@
+"""Chain-binomial stochastic versions of the compartmental models."""
+
+import numpy as np
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+from .spec import ArrayLike, ModelSpec, get_model_spec
+from .rng import (
+    BlockedSource,
+    CommonRandomNumbers,
+    RandomSource,
+    RandomStreams,
+    SeedLike,
+    StepUniforms,
+)
+
+# Means above which common-random-number binomial draws use a normal approximation
+_INVERSION_MEAN_LIMIT = 100.0
+
+
+def _normal_quantile(u: np.ndarray) -> np.ndarray:
+    """Standard normal quantile (Acklam's approximation, relative error < 1.2e-9)."""
+    a = (
+        -3.969683028665376e01,
+        2.209460984245205e02,
+        -2.759285104469687e02,
+        1.383577518672690e02,
+        -3.066479806614716e01,
+        2.506628277459239e00,
+    )
+    b = (
+        -5.447609879822406e01,
+        1.615858368580409e02,
+        -1.556989798598866e02,
+        6.680131188771972e01,
+        -1.328068155288572e01,
+    )
+    c = (
+        -7.784894002430293e-03,
+        -3.223964580411365e-01,
+        -2.400758277161838e00,
+        -2.549732539343734e00,
+        4.374664141464968e00,
+        2.938163982698783e00,
+    )
+    d = (
+        7.784695709041462e-03,
+        3.224671290700398e-01,
+        2.445134137142996e00,
+        3.754408661907416e00,
+    )
+
+    u = np.clip(u, 1e-300, 1 - 1e-16)
+    tail = np.minimum(u, 1 - u)
+    q = np.sqrt(-2 * np.log(tail))
+    outer = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / (
+        (((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1
+    )
+    outer = np.where(u < 0.5, outer, -outer)
+    r = (u - 0.5) ** 2
+    central = (
+        (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5])
+        * (u - 0.5)
+        / (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+    )
+    return np.where(tail < 0.02425, outer, central)
+
+
+def _inverse_binomial(u: np.ndarray, n: np.ndarray, p: np.ndarray) -> np.ndarray:
+    """
+    Binomial draws by inversion of one uniform per replicate.
+
+    Exact for means up to ``_INVERSION_MEAN_LIMIT``; larger means use the
+    normal approximation with continuity correction. The result is
+    non-decreasing in ``u``, so equal uniforms give closely matched counts
+    in paired scenarios.
+    """
+    n = np.asarray(n, dtype=np.int64)
+    p = np.clip(np.broadcast_to(p, n.shape), 0.0, 1.0)
+    flip = p > 0.5
+    q = np.where(flip, 1.0 - p, p)
+    v = np.where(flip, 1.0 - u, u)
+    mean = n * q
+    counts = np.zeros(n.shape, dtype=np.int64)
+
+    exact = np.flatnonzero((mean <= _INVERSION_MEAN_LIMIT) & (n > 0) & (q > 0))
+    if len(exact):
+        n_e, q_e, v_e = n[exact], q[exact], v[exact]
+        ratio = q_e / (1.0 - q_e)
+        pmf = (1.0 - q_e) ** n_e
+        cdf = pmf.copy()
+        k = np.zeros(len(exact), dtype=np.int64)
+        active = np.flatnonzero(v_e >= cdf)
+        while len(active):
+            pmf[active] *= (n_e[active] - k[active]) / (k[active] + 1.0) * ratio[active]
+            cdf[active] += pmf[active]
+            k[active] += 1
+            active = active[(v_e[active] >= cdf[active]) & (k[active] < n_e[active])]
+        counts[exact] = k
+
+    approximate = np.flatnonzero(mean > _INVERSION_MEAN_LIMIT)
+    if len(approximate):
+        m = mean[approximate]
+        sd = np.sqrt(m * (1.0 - q[approximate]))
+        draws = np.floor(m + sd * _normal_quantile(v[approximate]) + 0.5)
+        counts[approximate] = np.clip(draws, 0, n[approximate]).astype(np.int64)
+
+    return np.where(flip, n - counts, counts)
+
+
+class ChainBinomialModel:
+    """
+    Discrete-time stochastic model with integer compartments.
+
+    In each step every individual leaves its compartment with probability
+    ``1 - exp(-H * dt)``, where ``H`` is the sum of the per-capita rates of
+    all flows out of that compartment (plus ``mu`` when births and deaths are
+    on). Those leaving are split between the competing flows in proportion
+    to their rates, so each compartment loses at most its own size. Rates
+    are evaluated on population fractions ``X / N``, as in the deterministic
+    models. Reported cases are drawn as ``newC ~ Binomial(report flow, rho)``.
+
+    All replicates are stepped together; parameters, ``population`` and
+    ``rho`` may be scalars or arrays with one value per replicate. ``step``
+    exposes a single transition for samplers that need to intervene between
+    steps, such as ABC or particle filters.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        parameters: Dict with the model parameters and optionally 'mu'
+        population: Population size N
+        rho: Reporting probability
+        dt: Time step
+        report_column: Flow whose counts are thinned into reported cases
+        stochastic: Whether to draw transitions; if False the expected
+            counts are rounded, as in the R likelihood templates, and only
+            reporting is random
+    """
+
+    def __init__(
+        self,
+        model_type: Union[str, ModelSpec],
+        parameters: Mapping[str, ArrayLike],
+        population: ArrayLike,
+        rho: ArrayLike = 1.0,
+        dt: float = 1.0,
+        report_column: str = "newI",
+        stochastic: bool = True,
+    ):
+        self.model = get_model_spec(model_type).compiled
+        if report_column not in self.model.flow_names:
+            raise ValueError(
+                f"Flow '{report_column}' not found in model '{self.model.spec.name}'."
+            )
+
+        params = self.model.resolve_parameters(
+            {"population": population, "rho": rho, **parameters}
+        )
+        self.population = np.round(params.pop("population")).astype(np.int64)
+        self.rho = params.pop("rho")
+        if np.any(self.population < 1) or np.any((self.rho < 0) | (self.rho > 1)):
+            raise ValueError("population must be positive and rho must lie in [0, 1].")
+        self.params = params
+        self.dt = dt
+        self.report_index = self.model.flow_names.index(report_column)
+        self.stochastic = stochastic
+        self.vital = bool(np.any(params["mu"]))
+
+        # Flows grouped by source compartment for the competing-risk draws
+        self._outflows: List[Tuple[int, List[int]]] = [
+            (i, [k for k in range(self.model.n_flows) if self.model.sources[k] == i])
+            for i in range(self.model.n_compartments)
+        ]
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Output columns: compartments, flows and reported cases."""
+        return self.model.columns + ("newC",)
+
+    def _broadcast(
+        self,
+        values: np.ndarray,
+        n_replicates: int,
+        replicates: Optional[Union[slice, np.ndarray]] = None,
+    ) -> np.ndarray:
+        if replicates is not None and len(values) > 1:
+            values = values[replicates]
+        if len(values) not in (1, n_replicates):
+            raise ValueError(
+                f"Parameters have {len(values)} values but {n_replicates} replicates "
+                "were requested."
+            )
+        return np.broadcast_to(values, (n_replicates,))
+
+    def initial_state(
+        self, initial_infected: ArrayLike, n_replicates: int
+    ) -> np.ndarray:
+        """
+        Build the integer initial state.
+
+        Args:
+            initial_infected: Initial fraction infected, scalar or per replicate
+            n_replicates: Number of replicates
+
+        Returns:
+            Array of shape (compartments, replicates) with ``round(i0 * N)``
+            in the seed compartment and the rest of N in the birth compartment
+        """
+        population = self._broadcast(self.population, n_replicates)
+        infected = np.round(
+            np.broadcast_to(initial_infected, (n_replicates,)) * population
+        )
+        state = np.zeros((self.model.n_compartments, n_replicates), dtype=np.int64)
+        state[self.model.birth_index] = population - infected
+        state[self.model.seed_index] += infected.astype(np.int64)
+        return state
+
+    def _draw(
+        self,
+        rng: RandomSource,
+        n: np.ndarray,
+        p: np.ndarray,
+        role: str,
+        stochastic: Optional[bool] = None,
+    ) -> np.ndarray:
+        if not (self.stochastic if stochastic is None else stochastic):
+            return np.round(n * p).astype(np.int64)
+        if isinstance(rng, StepUniforms) or (
+            isinstance(rng, BlockedSource) and rng.uniforms
+        ):
+            return _inverse_binomial(rng.random(role, len(n)), n, p)
+        return rng.binomial(n, p)
+
+    def step(
+        self,
+        state: np.ndarray,
+        rng: RandomSource,
+        t: float = 0.0,
+        replicates: Optional[Union[slice, np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Advance every replicate by one time step.
+
+        Args:
+            state: Integer array of shape (compartments, replicates)
+            rng: Random number generator, the ``StepUniforms`` of this
+                step for common random numbers, or a ``BlockedSource`` of
+                either kind for several blocks
+            t: Time at the start of the step
+            replicates: Replicates held in ``state`` as a slice or index
+                array, used to pick their values of per-replicate
+                parameters (all if None)
+
+        Returns:
+            Tuple of (new state, flows of shape (flows, replicates),
+            reported cases of shape (replicates,))
+        """
+        n_replicates = state.shape[1]
+        params = {
+            name: self._broadcast(values, n_replicates, replicates)
+            for name, values in self.params.items()
+        }
+        population = self._broadcast(self.population, n_replicates, replicates)
+        rates = self.model.flow_rates(state / population, params, t)
+        mu = params["mu"]
+
+        flows = np.zeros((self.model.n_flows, n_replicates), dtype=np.int64)
+        deaths = np.zeros_like(state)
+        for i, outflows in self._outflows:
+            source_name = self.model.compartments[i]
+            hazards = [rates[k] for k in outflows]
+            roles = [
+                f"{source_name} to {self.model.spec.flows[k].target}" for k in outflows
+            ]
+            if self.vital:
+                hazards.append(mu)
+                roles.append(f"{source_name} death")
+            if not hazards:
+                continue
+            total = np.sum(hazards, axis=0)
+            leaving = self._draw(
+                rng, state[i], 1.0 - np.exp(-total * self.dt), f"{source_name} leave"
+            )
+
+            # Split those leaving between competing flows one at a time
+            remaining_hazard = total
+            for j, hazard in enumerate(hazards):
+                if j == len(hazards) - 1:
+                    counts = leaving
+                else:
+                    share = np.divide(
+                        hazard,
+                        remaining_hazard,
+                        out=np.zeros(n_replicates),
+                        where=remaining_hazard > 0,
+                    )
+                    counts = self._draw(
+                        rng, leaving, np.clip(share, 0.0, 1.0), roles[j]
+                    )
+                    leaving = leaving - counts
+                    remaining_hazard = remaining_hazard - hazard
+                if j < len(outflows):
+                    flows[outflows[j]] = counts
+                else:
+                    deaths[i] = counts
+
+        new_state = (
+            state + (self.model.stoichiometry.T.astype(np.int64) @ flows) - deaths
+        )
+        new_state[self.model.birth_index] += deaths.sum(axis=0)
+        reported = self._draw(
+            rng,
+            flows[self.report_index],
+            self._broadcast(self.rho, n_replicates, replicates),
+            "report",
+            stochastic=True,
+        )
+        return new_state, flows, reported
+
+    def simulate(
+        self,
+        initial_infected: ArrayLike,
+        n_replicates: int,
+        max_time: float = 20.0,
+        seed: SeedLike = None,
+        block_size: int = 256,
+        common_random_numbers: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Run all replicates from ``t = 0`` to ``max_time`` inclusive.
+
+        Row ``k`` holds the state at time ``k * dt`` and the flows and reported
+        cases of the step that ended there; row 0 has zero flows. (The R
+        templates store the same counts one row earlier, at the step's start.)
+
+        Every step updates all replicates with one set of array operations.
+        Blocks of ``block_size`` replicates only decide where random numbers
+        come from: each block draws from its own ``RandomStreams`` stream, so
+        a block's trajectories depend only on ``seed``, ``block_size``, the
+        block index and the replicates in that block, never on other
+        blocks. A replicate in a full block is therefore reproduced by any
+        run with at least as many replicates. The last block may be partial,
+        and its draws change with ``n_replicates``. The per-block draws are
+        the one remaining loop over blocks, so very small blocks make each
+        step slower.
+
+        With ``common_random_numbers`` every binomial draw inverts a uniform
+        taken from a ``CommonRandomNumbers`` stream keyed by block, step and
+        role (e.g. the individuals leaving 'S'), so runs of different models
+        or parameters with the same seed share their randomness replicate by
+        replicate. Each replicate then takes its own uniforms, so its
+        trajectory depends only on ``seed``, ``block_size``, its index and
+        its parameters, whatever the value of ``n_replicates``. Draws with
+        means above 100 then use a normal approximation.
+
+        Args:
+            initial_infected: Initial fraction infected, scalar or per replicate
+            n_replicates: Number of replicates
+            max_time: Last simulated time
+            seed: Seed or generator for the random draws
+            block_size: Replicates per random stream
+            common_random_numbers: Whether to draw from counter-based
+                streams aligned across scenarios
+
+        Returns:
+            Dictionary with 'time' of shape (time,) and one int64 array of
+            shape (replicates, time) per compartment, flow and 'newC'
+        """
+        streams = RandomStreams(seed, block_size)
+        common = (
+            CommonRandomNumbers(seed, block_size) if common_random_numbers else None
+        )
+        n_times = int(np.round(max_time / self.dt)) + 1
+        n_compartments = self.model.n_compartments
+
+        # Time-major so that each step writes one contiguous block
+        output = np.zeros((n_times, len(self.columns), n_replicates), dtype=np.int64)
+        initial = self.initial_state(initial_infected, n_replicates)
+        output[0, :n_compartments] = initial
+        blocks = range(streams.n_blocks(n_replicates))
+        slices = [streams.block_slice(block, n_replicates) for block in blocks]
+        source = BlockedSource(slices, [streams.generator(block) for block in blocks])
+        state = initial
+        for row in range(1, n_times):
+            if common is not None:
+                source = BlockedSource(
+                    slices, [common.at(block, row) for block in blocks]
+                )
+            state, flows, reported = self.step(state, source, (row - 1) * self.dt)
+            output[row, :n_compartments] = state
+            output[row, n_compartments:-1] = flows
+            output[row, -1] = reported
+
+        result = {"time": np.arange(n_times) * self.dt}
+        for i, column in enumerate(self.columns):
+            result[column] = output[:, i].T
+        return result
+
+
+def run_chain_binomial(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    population: ArrayLike,
+    n_replicates: int = 1000,
+    rho: ArrayLike = 1.0,
+    dt: float = 1.0,
+    max_time: float = 20.0,
+    seed: SeedLike = None,
+    report_column: str = "newI",
+    stochastic: bool = True,
+    block_size: int = 256,
+    common_random_numbers: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Run many chain-binomial replicates of a registered model at once.
+
+    The default settings follow ``run_SIR`` in the R likelihood templates:
+    weekly steps, a 20 week horizon and reporting of new infections.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu'
+        population: Population size N
+        n_replicates: Number of replicates
+        rho: Reporting probability
+        dt: Time step
+        max_time: Last simulated time
+        seed: Seed or generator for the random draws
+        report_column: Flow whose counts are thinned into reported cases
+        stochastic: Whether to draw transitions (False rounds expected counts)
+        block_size: Replicates per random stream
+        common_random_numbers: Whether to share random numbers with other
+            runs of the same seed (see ``ChainBinomialModel.simulate``)
+
+    Returns:
+        Dictionary with 'time' of shape (time,) and one int64 array of shape
+        (replicates, time) per compartment, flow and 'newC'
+    """
+    model = ChainBinomialModel(
+        model_type,
+        parameters,
+        population,
+        rho=rho,
+        dt=dt,
+        report_column=report_column,
+        stochastic=stochastic,
+    )
+    return model.simulate(
+        initial_infected,
+        n_replicates,
+        max_time,
+        seed,
+        block_size,
+        common_random_numbers,
+    )
@@ -0,0 +1,59 @@
+"""Streaming interface for long or open-ended simulations."""
+
+from typing import Iterator, Mapping, Optional, Union
+from .spec import ArrayLike, ModelSpec, get_model_spec
+from .result import StreamChunk
+
+
+def stream_model(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    dt: float = 0.01,
+    chunk_size: int = 1000,
+    max_time: Optional[float] = None,
+    use_exponential_form: bool = False,
+    backend: Optional[str] = None,
+    resume: Optional[StreamChunk] = None,
+    copy: bool = False,
+) -> Iterator[StreamChunk]:
+    """
+    Run a registered model as a generator of fixed-size output chunks.
+
+    Memory use is one chunk regardless of run length. Each chunk carries the
+    state after its last row, so a stopped stream can be continued later by
+    passing the last chunk as ``resume``. Single runs and ensembles are both
+    supported; inputs broadcast as in ``run_ensemble``.
+
+    Example:
+        for chunk in stream_model('SEIRS', 0.01, params, max_time=5000.0):
+            np.save(f"seirs_{chunk.next_row}.npy", chunk.data)
+            if chunk['I'].max() < 1e-6:
+                break
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu'
+        dt: Time step
+        chunk_size: Rows per yielded chunk
+        max_time: Time at which to stop (never stop if None)
+        use_exponential_form: Whether to use exponential form for transitions
+        backend: Compute backend name (the global default if None)
+        resume: Last chunk of an earlier stream to continue from
+        copy: Whether chunks own their arrays instead of sharing one buffer
+
+    Returns:
+        Iterator of StreamChunk objects
+    """
+    return get_model_spec(model_type).compiled.stream(
+        initial_infected,
+        parameters,
+        dt,
+        chunk_size,
+        max_time,
+        use_exponential_form,
+        backend=backend,
+        resume=resume,
+        copy=copy,
+    )
@@ -0,0 +1,171 @@
+"""Summary statistics of epidemic simulations computed while stepping."""
+
+from dataclasses import dataclass, fields
+import numpy as np
+from typing import Mapping, Optional, Union
+from .spec import ArrayLike, ModelSpec, get_model_spec
+from .workspace import Workspace
+
+
+@dataclass(frozen=True)
+class EpidemicSummary:
+    """
+    Compact record of an epidemic simulation.
+
+    Each field is a float for a single run or a 1-D array with one entry per
+    ensemble member. Times are NaN when the event did not happen.
+
+    Args:
+        peak_prevalence: Largest infected fraction
+        peak_time: Time at which the peak occurred
+        attack_rate: Cumulative new infections per capita
+        start_time: First time prevalence reached the threshold
+        end_time: Time prevalence last fell below the threshold
+        duration: Time between start_time and end_time
+        final_time: Time of the last simulated step
+    """
+
+    peak_prevalence: Union[float, np.ndarray]
+    peak_time: Union[float, np.ndarray]
+    attack_rate: Union[float, np.ndarray]
+    start_time: Union[float, np.ndarray]
+    end_time: Union[float, np.ndarray]
+    duration: Union[float, np.ndarray]
+    final_time: Union[float, np.ndarray]
+
+    def to_records(self) -> np.ndarray:
+        """Return the summary as a structured array with one record per run."""
+        names = [field.name for field in fields(self)]
+        columns = [np.atleast_1d(getattr(self, name)) for name in names]
+        records = np.empty(len(columns[0]), dtype=[(name, float) for name in names])
+        for name, values in zip(names, columns):
+            records[name] = values
+        return records
+
+
+def _summarize(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    dt: float,
+    max_time: float,
+    use_exponential_form: bool,
+    threshold: float,
+    extend_time: Optional[float],
+    backend: Optional[str],
+    workspace: Optional[Workspace],
+    scalar: bool,
+) -> EpidemicSummary:
+    stats = get_model_spec(model_type).compiled.summarize(
+        initial_infected,
+        parameters,
+        dt,
+        max_time,
+        use_exponential_form,
+        threshold=threshold,
+        extend_time=extend_time,
+        backend=backend,
+        workspace=workspace,
+    )
+    stats["duration"] = stats["end_time"] - stats["start_time"]
+    if scalar:
+        stats = {name: float(values[0]) for name, values in stats.items()}
+    return EpidemicSummary(**stats)
+
+
+def summarize_model(
+    model_type: Union[str, ModelSpec],
+    initial_infected: float,
+    parameters: Mapping[str, float],
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+    threshold: float = 0.001,
+    extend_time: Optional[float] = 5.0,
+    backend: Optional[str] = None,
+    workspace: Optional[Workspace] = None,
+) -> EpidemicSummary:
+    """
+    Run a simulation and return only its summary statistics.
+
+    No trajectory arrays or DataFrame are built. The run stops ``extend_time``
+    after prevalence falls below ``threshold``, as ``run_model`` does.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu'
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+        threshold: Prevalence that marks the start and end of the epidemic
+        extend_time: Time to keep stepping after prevalence falls below the
+            threshold (None to always run to ``max_time``)
+        backend: Compute backend name (the global default if None)
+        workspace: Buffers to reuse across repeated calls
+
+    Returns:
+        EpidemicSummary with float fields
+    """
+    return _summarize(
+        model_type,
+        initial_infected,
+        parameters,
+        dt,
+        max_time,
+        use_exponential_form,
+        threshold,
+        extend_time,
+        backend,
+        workspace,
+        scalar=True,
+    )
+
+
+def summarize_ensemble(
+    model_type: Union[str, ModelSpec],
+    initial_infected: ArrayLike,
+    parameters: Mapping[str, ArrayLike],
+    dt: float = 0.01,
+    max_time: float = 100.0,
+    use_exponential_form: bool = False,
+    threshold: float = 0.001,
+    extend_time: Optional[float] = 5.0,
+    backend: Optional[str] = None,
+    workspace: Optional[Workspace] = None,
+) -> EpidemicSummary:
+    """
+    Run an ensemble and return only per-member summary statistics.
+
+    Inputs broadcast as in ``run_ensemble``. Memory use is independent of
+    ``max_time / dt``; the run stops once every member has finished.
+
+    Args:
+        model_type: Registered model name (e.g. 'SIR', 'SEIRS') or a ModelSpec
+        initial_infected: Initial fraction of population infected (0-1)
+        parameters: Dict with the model parameters and optionally 'mu'
+        dt: Time step
+        max_time: Maximum simulation time
+        use_exponential_form: Whether to use exponential form for transitions
+        threshold: Prevalence that marks the start and end of the epidemic
+        extend_time: Time to keep stepping after every member has fallen below
+            the threshold (None to always run to ``max_time``)
+        backend: Compute backend name (the global default if None)
+        workspace: Buffers to reuse across repeated calls
+
+    Returns:
+        EpidemicSummary with one array entry per member
+    """
+    return _summarize(
+        model_type,
+        initial_infected,
+        parameters,
+        dt,
+        max_time,
+        use_exponential_form,
+        threshold,
+        extend_time,
+        backend,
+        workspace,
+        scalar=False,
+    )
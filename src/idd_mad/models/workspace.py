@@ -0,0 +1,71 @@
+"""Reusable buffers for repeated simulations."""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+class Workspace:
+    """
+    Arena of preallocated buffers shared by successive simulations.
+
+    Engines that receive a workspace take their output and scratch buffers
+    from it instead of allocating new arrays, so calibration and sweep loops
+    that run the same shapes many times reuse the same memory. Buffers only
+    grow; a smaller request is served from the front of a larger buffer.
+
+    Arrays returned by an engine that used a workspace are views into it and
+    are overwritten by the next call with the same workspace. Use
+    ``copy_out`` to keep them.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def array(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Return an uninitialized C-contiguous float array backed by a named buffer.
+
+        Args:
+            name: Buffer name; each name owns separate storage
+            shape: Shape of the returned array
+
+        Returns:
+            Array view of the buffer with the requested shape
+        """
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of all buffers in bytes."""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self) -> None:
+        """Release all buffers."""
+        self._buffers.clear()
+
+    @staticmethod
+    def copy_out(result: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Copy a result dictionary out of the workspace.
+
+        Args:
+            result: Dictionary of arrays returned by an engine
+
+        Returns:
+            Dictionary of arrays that own their memory
+        """
+        return {name: np.array(values) for name, values in result.items()}
+
+
+def allocate(
+    workspace: Optional[Workspace], name: str, shape: Tuple[int, ...]
+) -> np.ndarray:
+    """Take an uninitialized array from ``workspace``, or allocate one if it is None."""
+    if workspace is None:
+        return np.empty(shape)
+    return workspace.array(name, shape)
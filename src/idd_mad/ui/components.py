@@ -64,7 +64,7 @@ def model_parameter_set(model_type: str, param_values: Dict[str, float], prefix:
     Create parameter inputs for different epidemiological models.
     
     Args:
-        model_type: One of 'SIR', 'SEIR', 'SEIRS'
+        model_type: One of 'SIR', 'SIRS', 'SEIR', 'SEIRS'
         param_values: Dictionary of current parameter values
         prefix: Prefix for parameter IDs
     """
@@ -94,6 +94,14 @@ def model_parameter_set(model_type: str, param_values: Dict[str, float], prefix:
         )
     )
     
+    if model_type.upper() in ['SIRS', 'SEIRS']:
+        base_params.append(
+            parameter_input_with_sync(
+                f"{prefix}_omega", "Waning Rate (ω)", 0, 2, 
+                param_values.get('omega', 0), step=0.01
+            )
+        )
+    
     if model_type.upper() == 'SEIRS':
         base_params.append(
             parameter_input_with_sync(
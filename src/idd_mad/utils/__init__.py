@@ -2,5 +2,6 @@
 
 from .calculations import ModelCalculator
 from .sync import create_parameter_sync_functions
+from .reducers import QuantileReducer
 
-__all__ = ['ModelCalculator', 'create_parameter_sync_functions']
\ No newline at end of file
+__all__ = ['ModelCalculator', 'create_parameter_sync_functions', 'QuantileReducer']
\ No newline at end of file
@@ -1,8 +1,11 @@
 """Calculation utilities for epidemiological models."""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import numpy as np
 import pandas as pd
-from ..models.sir import run_sir_model, run_seir_model
+from ..models.sir import simulate_model
+from ..models.ensemble import run_ensemble
+from ..models.spec import ArrayLike, get_model_spec
 
 
 class ModelCalculator:
@@ -15,7 +18,8 @@ class ModelCalculator:
         gamma: float, 
         dt: float = 0.01,
         mu: float = 0.0,
-        use_exponential_form: bool = False
+        use_exponential_form: bool = False,
+        output_interval: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Calculate SIR model data from parameters.
@@ -27,9 +31,11 @@ class ModelCalculator:
             dt: Time step
             mu: Birth/death rate
             use_exponential_form: Whether to use exponential transitions
+            output_interval: Time between stored rows (every step if None)
             
         Returns:
-            Dictionary with model results and metadata
+            Dictionary with model results and metadata; 'model_df' is a
+            DataFrame and 'result' the SimulationResult it came from
         """
         i_0 = i_0_percent / 100
         parameters = {
@@ -38,16 +44,19 @@ class ModelCalculator:
             'mu': mu
         }
         
-        model_df = run_sir_model(
+        result = simulate_model(
+            'SIR',
             initial_infected=i_0,
             parameters=parameters,
             dt=dt,
-            use_exponential_form=use_exponential_form
+            use_exponential_form=use_exponential_form,
+            output_interval=output_interval
         )
         
         return {
             'model_type': 'SIR',
-            'model_df': model_df,
+            'model_df': result.to_pandas(),
+            'result': result,
             'parameters': parameters,
             'initial_infected_percent': i_0_percent,
             'title1': "Susceptible, Infectious, and Recovered Populations",
@@ -62,7 +71,8 @@ class ModelCalculator:
         gamma: float,
         dt: float = 0.01,
         mu: float = 0.0,
-        use_exponential_form: bool = False
+        use_exponential_form: bool = False,
+        output_interval: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Calculate SEIR model data from parameters.
@@ -75,9 +85,11 @@ class ModelCalculator:
             dt: Time step
             mu: Birth/death rate
             use_exponential_form: Whether to use exponential transitions
+            output_interval: Time between stored rows (every step if None)
             
         Returns:
-            Dictionary with model results and metadata
+            Dictionary with model results and metadata; 'model_df' is a
+            DataFrame and 'result' the SimulationResult it came from
         """
         i_0 = i_0_percent / 100
         parameters = {
@@ -87,22 +99,53 @@ class ModelCalculator:
             'mu': mu
         }
         
-        model_df = run_seir_model(
+        result = simulate_model(
+            'SEIR',
             initial_infected=i_0,
             parameters=parameters,
             dt=dt,
-            use_exponential_form=use_exponential_form
+            use_exponential_form=use_exponential_form,
+            output_interval=output_interval
         )
         
         return {
             'model_type': 'SEIR',
-            'model_df': model_df,
+            'model_df': result.to_pandas(),
+            'result': result,
             'parameters': parameters,
             'initial_infected_percent': i_0_percent,
             'title1': "SEIR Model Simulation", 
             'title2': "New Infections"
         }
     
+    @staticmethod
+    def _model_parameters(
+        model_type: str,
+        beta: ArrayLike,
+        gamma: ArrayLike,
+        sigma: ArrayLike,
+        omega: ArrayLike,
+        average_age: ArrayLike
+    ) -> Dict[str, ArrayLike]:
+        """Collect the parameters a registered model needs from the app inputs."""
+        spec = get_model_spec(model_type)
+        available = {'beta': beta, 'gamma': gamma, 'sigma': sigma, 'omega': omega}
+        parameters = {
+            name: available[name]
+            for name in spec.parameters + tuple(spec.defaults)
+            if name in available
+        }
+        
+        # Calculate mu from average age for models with births and deaths
+        if spec.demography:
+            average_age = np.asarray(average_age, dtype=float)
+            safe_age = np.where(average_age > 0, average_age, 1.0)
+            mu = np.where(average_age > 0, 1.0 / safe_age, 0.0)
+            parameters['mu'] = float(mu) if mu.ndim == 0 else mu
+        else:
+            parameters['mu'] = 0.0
+        return parameters
+    
     @staticmethod
     def calculate_model_data(
         model_type: str,
@@ -112,13 +155,16 @@ class ModelCalculator:
         sigma: float = 1.0,
         average_age: float = 70.0,
         dt: float = 0.01,
-        use_exponential_form: bool = False
+        use_exponential_form: bool = False,
+        omega: float = 0.0,
+        method: str = 'euler',
+        output_interval: Optional[float] = None
     ) -> Dict[str, Any]:
         """
-        Calculate model data for any supported model type.
+        Calculate model data for any registered model type.
         
         Args:
-            model_type: 'SIR', 'SEIR', or 'SEIRS'
+            model_type: Registered model name, e.g. 'SIR', 'SEIR', or 'SEIRS'
             i_0_percent: Initial percentage infected (0-100)
             beta: Transmission rate
             gamma: Recovery rate
@@ -126,30 +172,94 @@ class ModelCalculator:
             average_age: Average age for birth/death rate (for SEIRS)
             dt: Time step
             use_exponential_form: Whether to use exponential transitions
+            omega: Waning immunity rate (for SIRS/SEIRS)
+            method: 'euler' for fixed steps or 'rk45' for adaptive steps
+            output_interval: Time between stored rows (every step if None)
             
         Returns:
-            Dictionary with model results and metadata
+            Dictionary with model results and metadata; 'model_df' is a
+            DataFrame and 'result' the SimulationResult it came from
         """
-        # Calculate mu from average age
-        mu = 1.0 / average_age if average_age > 0 else 0.0
+        spec = get_model_spec(model_type)
+        parameters = ModelCalculator._model_parameters(
+            spec.name, beta, gamma, sigma, omega, average_age
+        )
         
-        if model_type.upper() == 'SIR':
-            return ModelCalculator.calculate_sir_data(
-                i_0_percent, beta, gamma, dt, 
-                mu=(mu if model_type.upper() == 'SIRS' else 0.0),
-                use_exponential_form=use_exponential_form
-            )
-        elif model_type.upper() in ['SEIR', 'SEIRS']:
-            result = ModelCalculator.calculate_seir_data(
-                i_0_percent, beta, sigma, gamma, dt,
-                mu=(mu if model_type.upper() == 'SEIRS' else 0.0),
-                use_exponential_form=use_exponential_form
-            )
-            result['model_type'] = model_type.upper()
-            result['title1'] = f"{model_type.upper()} Model Simulation"
-            return result
-        else:
-            raise ValueError(f"Unsupported model type: {model_type}")
+        result = simulate_model(
+            spec,
+            initial_infected=i_0_percent / 100,
+            parameters=parameters,
+            dt=dt,
+            use_exponential_form=use_exponential_form,
+            method=method,
+            output_interval=output_interval
+        )
+        
+        return {
+            'model_type': spec.name,
+            'model_df': result.to_pandas(),
+            'result': result,
+            'parameters': parameters,
+            'initial_infected_percent': i_0_percent,
+            'title1': spec.title or f"{spec.name} Model Simulation",
+            'title2': "New Infections"
+        }
+    
+    @staticmethod
+    def calculate_ensemble_data(
+        model_type: str,
+        i_0_percent: ArrayLike,
+        beta: ArrayLike,
+        gamma: ArrayLike,
+        sigma: ArrayLike = 1.0,
+        average_age: ArrayLike = 70.0,
+        dt: float = 0.01,
+        use_exponential_form: bool = False,
+        omega: ArrayLike = 0.0,
+        output_interval: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate many scenarios of a model in a single vectorized run.
+        
+        Parameters may be scalars or 1-D arrays; arrays are broadcast against
+        each other and each element defines one scenario.
+        
+        Args:
+            model_type: Registered model name, e.g. 'SIR', 'SEIR', or 'SEIRS'
+            i_0_percent: Initial percentage infected (0-100)
+            beta: Transmission rate
+            gamma: Recovery rate
+            sigma: Incubation rate (for SEIR/SEIRS)
+            average_age: Average age for birth/death rate (for SEIRS)
+            dt: Time step
+            use_exponential_form: Whether to use exponential transitions
+            omega: Waning immunity rate (for SIRS/SEIRS)
+            output_interval: Time between stored rows (every step if None)
+            
+        Returns:
+            Dictionary with ensemble arrays of shape (members, time) and metadata
+        """
+        spec = get_model_spec(model_type)
+        parameters = ModelCalculator._model_parameters(
+            spec.name, beta, gamma, sigma, omega, average_age
+        )
+        
+        ensemble = run_ensemble(
+            spec,
+            initial_infected=np.asarray(i_0_percent, dtype=float) / 100,
+            parameters=parameters,
+            dt=dt,
+            use_exponential_form=use_exponential_form,
+            output_interval=output_interval
+        )
+        
+        return {
+            'model_type': spec.name,
+            'ensemble': ensemble,
+            'parameters': parameters,
+            'initial_infected_percent': i_0_percent,
+            'n_members': ensemble['I'].shape[0]
+        }
     
     @staticmethod
     def get_basic_reproduction_number(beta: float, gamma: float) -> float:
@@ -0,0 +1,207 @@
+"""Streaming summaries of large simulation ensembles."""
+
+import numpy as np
+from typing import Dict, Sequence, Union
+
+
+class QuantileReducer:
+    """
+    Per-time-point quantiles and moments of an ensemble, updated chunk by chunk.
+
+    Each time point keeps a fixed-bin histogram over ``[lower, upper]`` (plus
+    one underflow and one overflow bin) and running count, mean, variance,
+    minimum and maximum. Memory depends only on ``n_times`` and ``n_bins``,
+    never on the number of members. Quantiles are interpolated within bins,
+    so they are accurate to about ``(upper - lower) / n_bins`` inside the
+    range; beyond it they only interpolate towards the observed extremes.
+
+    Chunks may hold any subset of members and any run of consecutive time
+    points, so the reducer can consume ensemble blocks or streamed chunks.
+    Reducers filled in different processes combine with ``merge``.
+
+    Args:
+        n_times: Number of time points
+        lower: Lower edge of the histogram range
+        upper: Upper edge of the histogram range
+        n_bins: Number of histogram bins
+    """
+
+    def __init__(
+        self, n_times: int, lower: float = 0.0, upper: float = 1.0, n_bins: int = 1000
+    ):
+        if not upper > lower:
+            raise ValueError("upper must be greater than lower.")
+        self.n_times = n_times
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.n_bins = n_bins
+        self.counts = np.zeros((n_times, n_bins + 2), dtype=np.int64)
+        self.count = np.zeros(n_times, dtype=np.int64)
+        self.mean = np.zeros(n_times)
+        self._m2 = np.zeros(n_times)
+        self.min = np.full(n_times, np.inf)
+        self.max = np.full(n_times, -np.inf)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the reducer's arrays."""
+        return sum(
+            array.nbytes
+            for array in (
+                self.counts,
+                self.count,
+                self.mean,
+                self._m2,
+                self.min,
+                self.max,
+            )
+        )
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance at each time point."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.count > 1, self._m2 / (self.count - 1), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Sample standard deviation at each time point."""
+        return np.sqrt(self.variance)
+
+    def _combine_moments(
+        self, rows: slice, count: np.ndarray, mean: np.ndarray, m2: np.ndarray
+    ) -> None:
+        """Merge another set of moments into ``rows`` (Chan et al.)."""
+        total = self.count[rows] + count
+        delta = mean - self.mean[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(total > 0, count / total, 0.0)
+        self._m2[rows] += m2 + delta**2 * self.count[rows] * weight
+        self.mean[rows] += delta * weight
+        self.count[rows] = total
+
+    def update(self, values: np.ndarray, start: int = 0) -> "QuantileReducer":
+        """
+        Add a chunk of trajectories.
+
+        Args:
+            values: Array of shape (members, times) for time points
+                ``start`` to ``start + times``
+            start: Index of the first time point in ``values``
+
+        Returns:
+            The reducer, for chaining
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        n_members, n_times = values.shape
+        rows = slice(start, start + n_times)
+        if start < 0 or start + n_times > self.n_times:
+            raise ValueError(
+                f"Time points {start}-{start + n_times} are outside 0-{self.n_times}."
+            )
+        if n_members == 0:
+            return self
+
+        width = (self.upper - self.lower) / self.n_bins
+        bins = np.floor((values - self.lower) / width).astype(np.int64) + 1
+        np.clip(bins, 0, self.n_bins + 1, out=bins)
+        bins += np.arange(n_times) * (self.n_bins + 2)
+        self.counts[rows] += np.bincount(
+            bins.ravel(), minlength=n_times * (self.n_bins + 2)
+        ).reshape(n_times, self.n_bins + 2)
+
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        self._combine_moments(rows, np.full(n_times, n_members), mean, m2)
+        np.minimum(self.min[rows], values.min(axis=0), out=self.min[rows])
+        np.maximum(self.max[rows], values.max(axis=0), out=self.max[rows])
+        return self
+
+    def merge(self, other: "QuantileReducer") -> "QuantileReducer":
+        """
+        Add the members summarized by another reducer with the same bins.
+
+        Args:
+            other: Reducer over the same time points and histogram range
+
+        Returns:
+            The reducer, for chaining
+        """
+        if (other.n_times, other.lower, other.upper, other.n_bins) != (
+            self.n_times,
+            self.lower,
+            self.upper,
+            self.n_bins,
+        ):
+            raise ValueError(
+                "Only reducers with the same time points and bins can be merged."
+            )
+        self.counts += other.counts
+        self._combine_moments(slice(None), other.count, other.mean, other._m2)
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        return self
+
+    def quantile(self, q: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Estimate quantiles at every time point.
+
+        Args:
+            q: Probability or sequence of probabilities in [0, 1]
+
+        Returns:
+            Array of shape (n_times,) for a scalar ``q``, else (len(q), n_times)
+        """
+        probabilities = np.atleast_1d(np.asarray(q, dtype=float))
+        if np.any((probabilities < 0) | (probabilities > 1)):
+            raise ValueError("Quantile probabilities must lie in [0, 1].")
+
+        width = (self.upper - self.lower) / self.n_bins
+        cumulative = np.cumsum(self.counts, axis=1)
+        times = np.arange(self.n_times)
+        result = np.empty((len(probabilities), self.n_times))
+        for i, p in enumerate(probabilities):
+            target = p * self.count
+            index = np.minimum(
+                (cumulative < target[:, None]).sum(axis=1), self.n_bins + 1
+            )
+            below = np.where(index > 0, cumulative[times, index - 1], 0)
+            in_bin = self.counts[times, index]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fraction = np.clip(
+                    np.where(in_bin > 0, (target - below) / in_bin, 0.0), 0.0, 1.0
+                )
+
+            # Underflow and overflow bins reach to the observed extremes, and
+            # no bin reaches beyond them
+            left = np.where(index == 0, self.min, self.lower + (index - 1) * width)
+            right = np.where(
+                index == self.n_bins + 1, self.max, self.lower + index * width
+            )
+            left = np.clip(left, self.min, self.max)
+            right = np.clip(right, self.min, self.max)
+            result[i] = left + fraction * (right - left)
+        result[:, self.count == 0] = np.nan
+        return result[0] if np.ndim(q) == 0 else result
+
+    def bands(self, levels: Sequence[float] = (0.5, 0.95)) -> Dict[str, np.ndarray]:
+        """
+        Median and central intervals for a fan chart.
+
+        Args:
+            levels: Coverage of each central interval
+
+        Returns:
+            Dictionary with 'median', 'mean' and 'lower_XX' / 'upper_XX'
+            arrays of shape (n_times,) for every level XX in percent
+        """
+        probabilities = [0.5]
+        for level in levels:
+            probabilities += [(1 - level) / 2, (1 + level) / 2]
+        values = self.quantile(probabilities)
+        bands = {"median": values[0], "mean": self.mean.copy()}
+        for i, level in enumerate(levels):
+            label = f"{100 * level:g}"
+            bands[f"lower_{label}"] = values[1 + 2 * i]
+            bands[f"upper_{label}"] = values[2 + 2 * i]
+        return bands
@@ -4,12 +4,17 @@ import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List, Union
 from .colors import get_epidemiology_colors
+from ..models.result import SimulationResult
+from ..models.spec import get_model_spec
+
+# Anything with DataFrame-style column access to 'time' and the compartments
+ResultLike = Union[pd.DataFrame, SimulationResult]
 
 
 def plot_sir_model(
-    df: pd.DataFrame, 
+    df: ResultLike, 
     title: str = "SIR Model Simulation",
     figsize: Tuple[int, int] = (10, 4),
     show_new_infections: bool = True
@@ -18,7 +23,7 @@ def plot_sir_model(
     Create a plot for SIR model results.
     
     Args:
-        df: DataFrame with columns: time, S, I, R, newI
+        df: DataFrame or SimulationResult with columns: time, S, I, R, newI
         title: Title for the main plot
         figsize: Figure size tuple
         show_new_infections: Whether to show new infections subplot
@@ -45,8 +50,8 @@ def plot_sir_model(
     ax1.set_xlim(df['time'].min(), df['time'].max())
     
     # Dynamic y-limits
-    lower_limit = min(0, df[['S', 'I', 'R']].min().min())
-    upper_limit = max(1, df[['S', 'I', 'R']].max().max())
+    lower_limit = min([0] + [df[column].min() for column in ['S', 'I', 'R']])
+    upper_limit = max([1] + [df[column].max() for column in ['S', 'I', 'R']])
     ax1.set_ylim(lower_limit, upper_limit)
     ax1.yaxis.set_major_formatter(ticker.FormatStrFormatter('%.2f'))
     ax1.legend(loc='best')
@@ -68,7 +73,7 @@ def plot_sir_model(
 
 
 def plot_seir_model(
-    df: pd.DataFrame, 
+    df: ResultLike, 
     title: str = "SEIR Model Simulation",
     figsize: Tuple[int, int] = (10, 4),
     show_new_infections: bool = True
@@ -77,7 +82,7 @@ def plot_seir_model(
     Create a plot for SEIR model results.
     
     Args:
-        df: DataFrame with columns: time, S, E, I, R, newI
+        df: DataFrame or SimulationResult with columns: time, S, E, I, R, newI
         title: Title for the main plot
         figsize: Figure size tuple
         show_new_infections: Whether to show new infections subplot
@@ -110,8 +115,8 @@ def plot_seir_model(
     if 'E' in df.columns:
         columns_to_check.append('E')
     
-    lower_limit = min(0, df[columns_to_check].min().min())
-    upper_limit = max(1, df[columns_to_check].max().max())
+    lower_limit = min([0] + [df[column].min() for column in columns_to_check])
+    upper_limit = max([1] + [df[column].max() for column in columns_to_check])
     ax1.set_ylim(lower_limit, upper_limit)
     ax1.yaxis.set_major_formatter(ticker.FormatStrFormatter('%.2f'))
     ax1.legend(loc='best')
@@ -133,7 +138,7 @@ def plot_seir_model(
 
 
 def create_epidemiology_figure(
-    df: pd.DataFrame,
+    df: ResultLike,
     model_type: str,
     title: Optional[str] = None,
     figsize: Tuple[int, int] = (10, 4),
@@ -143,8 +148,8 @@ def create_epidemiology_figure(
     Create a figure for epidemiological model results.
     
     Args:
-        df: DataFrame with simulation results
-        model_type: Type of model ('SIR', 'SEIR', 'SEIRS')
+        df: DataFrame or SimulationResult with simulation results
+        model_type: Registered model name (e.g. 'SIR', 'SIRS', 'SEIR', 'SEIRS')
         title: Custom title (auto-generated if None)
         figsize: Figure size tuple
         show_new_infections: Whether to show new infections subplot
@@ -155,12 +160,11 @@ def create_epidemiology_figure(
     if title is None:
         title = f"{model_type} Model Simulation"
     
-    if model_type.upper() == 'SIR':
-        return plot_sir_model(df, title, figsize, show_new_infections)
-    elif model_type.upper() in ['SEIR', 'SEIRS']:
+    # Models with a latent class get the SEIR layout, the rest the SIR one
+    spec = get_model_spec(model_type)
+    if 'E' in spec.compartments:
         return plot_seir_model(df, title, figsize, show_new_infections)
-    else:
-        raise ValueError(f"Unknown model type: {model_type}")
+    return plot_sir_model(df, title, figsize, show_new_infections)
 
 
 def create_multi_panel_figure(
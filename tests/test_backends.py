@@ -0,0 +1,16 @@
+"""Conformance of the compute backends with the reference 'numpy' backend."""
+
+import pytest
+from idd_mad.models.backends import available_backends, check_backend_conformance
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("model_type", ["SIR", "SEIR", "SEIRS"])
+def test_backend_matches_numpy(backend: str, model_type: str) -> None:
+    differences = check_backend_conformance(model_type, backends=[backend])
+    assert set(differences) == {backend}
+    assert differences[backend] <= 1e-10
+
+
+def test_reference_backends_are_available() -> None:
+    assert {"numpy", "batch"} <= set(available_backends())
@@ -0,0 +1,49 @@
+"""Culled simulations keep the same rows as ``cull_dataframe`` on a full run."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from idd_mad.models import run_model
+from idd_mad.models.sir import cull_dataframe
+from idd_mad.models.spec import get_model_spec
+
+CASES = [
+    ("SIR", {"beta": 2, "gamma": 1}),
+    ("SIR", {"beta": 2, "gamma": 1, "mu": 0.01}),
+    ("SEIR", {"beta": 2, "gamma": 1, "sigma": 1}),
+    # A slow latent class feeds a second wave long after I first drops
+    ("SEIR", {"beta": 20, "gamma": 2, "sigma": 0.01}),
+    ("SIRS", {"beta": 2, "gamma": 1, "omega": 0.05}),
+    ("SEIRS", {"beta": 2, "gamma": 1, "sigma": 1, "omega": 0.1}),
+]
+
+
+def full_run(model_type: str, parameters: dict) -> pd.DataFrame:
+    result = get_model_spec(model_type).compiled.simulate(
+        0.01, parameters, max_time=100
+    )
+    return pd.DataFrame(
+        {
+            column: values[:, 0] if values.ndim > 1 else values
+            for column, values in result.items()
+        }
+    )
+
+
+@pytest.mark.parametrize("model_type, parameters", CASES)
+def test_run_model_matches_cull_dataframe(model_type: str, parameters: dict) -> None:
+    expected = cull_dataframe(full_run(model_type, parameters), "I")
+    result = run_model(model_type, 0.01, parameters)
+    assert len(result) == len(expected)
+    np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize("model_type, parameters", CASES)
+def test_summary_matches_culled_run(model_type: str, parameters: dict) -> None:
+    model = get_model_spec(model_type).compiled
+    expected = cull_dataframe(full_run(model_type, parameters), "I")
+    infections = model.columns[model.n_compartments + model.infection_flows[0]]
+    summary = model.summarize(0.01, parameters)
+    assert summary["final_time"][0] == pytest.approx(expected["time"].iloc[-1])
+    assert summary["attack_rate"][0] == pytest.approx(expected[infections].sum())
+    assert summary["peak_prevalence"][0] == pytest.approx(expected["I"].max())
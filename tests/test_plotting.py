@@ -0,0 +1,20 @@
+"""Figures for every registered model."""
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import pytest  # noqa: E402
+from idd_mad.models.spec import MODEL_REGISTRY  # noqa: E402
+from idd_mad.utils.calculations import ModelCalculator  # noqa: E402
+from idd_mad.visualization.plotting import create_epidemiology_figure  # noqa: E402
+
+
+@pytest.mark.parametrize("model_type", list(MODEL_REGISTRY))
+def test_figure_plots_every_compartment(model_type: str) -> None:
+    data = ModelCalculator.calculate_model_data(model_type, 1, 2, 1, omega=0.1)
+    figure = create_epidemiology_figure(data["result"], data["model_type"])
+    labels = [line.get_label() for line in figure.axes[0].lines]
+    assert len(labels) == len(MODEL_REGISTRY[model_type].compartments)
+    plt.close(figure)
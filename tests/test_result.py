@@ -0,0 +1,33 @@
+"""DataFrame views of SimulationResult."""
+
+import numpy as np
+import pytest
+from idd_mad.models import run_model, run_seir_model, run_sir_model, simulate_model
+
+PARAMETERS = {"beta": 2, "gamma": 1, "sigma": 1}
+
+
+def test_public_runners_return_writable_frames() -> None:
+    for frame in (
+        run_sir_model(0.01, PARAMETERS),
+        run_seir_model(0.01, PARAMETERS),
+        run_model("SEIRS", 0.01, PARAMETERS),
+    ):
+        frame.loc[0, "I"] = 0.5
+        assert frame.loc[0, "I"] == 0.5
+
+
+def test_copied_frame_does_not_change_result() -> None:
+    result = simulate_model("SIR", 0.01, PARAMETERS)
+    frame = result.to_pandas()
+    frame.loc[0, "I"] = 0.5
+    assert result["I"][0] == 0.01
+
+
+def test_view_is_read_only() -> None:
+    result = simulate_model("SIR", 0.01, PARAMETERS)
+    frame = result.to_pandas(copy=False)
+    assert np.shares_memory(frame["I"].to_numpy(), result.data)
+    with pytest.raises(ValueError):
+        frame["I"].to_numpy()[0] = 0.5
+    assert result["I"][0] == 0.01
@@ -0,0 +1,42 @@
+"""Common-random-number streams."""
+
+import numpy as np
+from idd_mad.models.rng import CommonRandomNumbers
+from idd_mad.models.stochastic import run_chain_binomial
+
+
+def test_step_streams_do_not_overlap() -> None:
+    streams = CommonRandomNumbers(seed=1)
+    draws = [streams.at(0, step).random("S leave", 256) for step in range(8)]
+    for step in range(1, 8):
+        assert len(np.intersect1d(draws[step - 1], draws[step])) == 0
+
+
+def test_role_streams_are_independent_and_reproducible() -> None:
+    streams = CommonRandomNumbers(seed=1)
+    leave = streams.at(3, 5).random("S leave", 64)
+    assert len(np.intersect1d(leave, streams.at(3, 5).random("I leave", 64))) == 0
+    np.testing.assert_array_equal(
+        leave, CommonRandomNumbers(seed=1).at(3, 5).random("S leave", 64)
+    )
+
+
+def test_chain_binomial_blocks_do_not_depend_on_replicate_count() -> None:
+    def infectious(n_replicates: int, common_random_numbers: bool) -> np.ndarray:
+        return run_chain_binomial(
+            "SIR",
+            0.01,
+            {"beta": 2, "gamma": 1},
+            1000,
+            n_replicates=n_replicates,
+            seed=1,
+            block_size=64,
+            common_random_numbers=common_random_numbers,
+        )["I"]
+
+    # Full blocks are reproduced by larger runs
+    np.testing.assert_array_equal(
+        infectious(100, False)[:64], infectious(256, False)[:64]
+    )
+    # With common random numbers every replicate is, partial blocks included
+    np.testing.assert_array_equal(infectious(100, True), infectious(256, True)[:100])